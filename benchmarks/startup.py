@@ -0,0 +1,122 @@
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Цель замера -> (импортируемый модуль, модули, которые не должны загружаться при импорте)
+TARGETS = {
+    "gui": ("src.ui.file_selection", ["matplotlib", "numpy"]),
+    "cli": ("src.cli", ["tkinter", "tkinterdnd2", "PIL", "matplotlib"]),
+    "analysis": ("src.models.fastq_plots", ["matplotlib", "tkinter"]),
+}
+
+# Допустимое замедление относительно сохранённого базового замера
+DEFAULT_TOLERANCE = 1.5
+# Базовый замер в репозитории (получен через --save); он зависит от машины,
+# поэтому на другой машине базовый замер нужно сохранить заново
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "startup_baseline.json"
+
+PROBE = """
+import sys, time, json
+start = time.perf_counter()
+try:
+    import {module}
+except ImportError as e:
+    print(json.dumps({{"skipped": str(e)}}))
+    sys.exit(0)
+elapsed = time.perf_counter() - start
+loaded = [m for m in {forbidden!r} if m in sys.modules]
+print(json.dumps({{"seconds": elapsed, "loaded": loaded}}))
+"""
+
+
+def measure(module: str, forbidden: list[str], repeats: int) -> dict:
+    """
+    Замеряет время импорта модуля в отдельных процессах интерпретатора.
+
+    Args:
+        module (str): Имя импортируемого модуля.
+        forbidden (list[str]): Модули, которые не должны загружаться при импорте.
+        repeats (int): Количество запусков; в результат идёт медиана.
+
+    Returns:
+        dict: Медианное время импорта, время запуска процесса и список лишних модулей.
+    """
+    import_times = []
+    process_times = []
+    loaded = []
+    for _ in range(repeats):
+        code = PROBE.format(module=module, forbidden=forbidden)
+        start = time.perf_counter()
+        completed = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT,
+                                   capture_output=True, text=True, check=True)
+        process_times.append(time.perf_counter() - start)
+        probe = json.loads(completed.stdout.strip().splitlines()[-1])
+        if "skipped" in probe:
+            return {"skipped": probe["skipped"]}
+        import_times.append(probe["seconds"])
+        loaded = probe["loaded"]
+
+    return {
+        "import_seconds": statistics.median(import_times),
+        "process_seconds": statistics.median(process_times),
+        "unexpected_modules": loaded,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Замеряет время запуска GUI и консольного режима и проверяет отложенную загрузку модулей.
+
+    Returns:
+        int: 0 — регрессий нет, 1 — загружены лишние модули или время превысило базовое.
+    """
+    parser = argparse.ArgumentParser(description="Замер времени запуска FastQClite.")
+    parser.add_argument("--repeats", type=int, default=5, help="количество запусков на цель")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE,
+                        help="JSON с базовым замером для сравнения (по умолчанию: %(default)s)")
+    parser.add_argument("--no-baseline", action="store_true", help="не сравнивать с базовым замером")
+    parser.add_argument("--save", type=Path, help="сохранить результаты в JSON")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="допустимое замедление относительно базового замера")
+    args = parser.parse_args(argv)
+
+    results = {name: measure(module, forbidden, args.repeats)
+               for name, (module, forbidden) in TARGETS.items()}
+    baseline = {}
+    if not args.no_baseline and args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+        print(f"Базовый замер: {args.baseline}")
+
+    failed = False
+    for name, result in results.items():
+        if "skipped" in result:
+            print(f"{name:10s} пропущено: {result['skipped']}")
+            continue
+        line = f"{name:10s} импорт {result['import_seconds'] * 1000:8.1f} мс, " \
+               f"процесс {result['process_seconds'] * 1000:8.1f} мс"
+        reference = baseline.get(name, {}).get("import_seconds")
+        if reference:
+            ratio = result["import_seconds"] / reference
+            line += f" ({ratio:.2f}× от базового)"
+            if ratio > args.tolerance:
+                failed = True
+                line += " — РЕГРЕССИЯ"
+        if result["unexpected_modules"]:
+            failed = True
+            line += f" — загружены лишние модули: {', '.join(result['unexpected_modules'])}"
+        print(line)
+
+    if args.save:
+        args.save.write_text(json.dumps(results, indent=2))
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+import argparse
+import gzip
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+# Версия генератора входит в имя файла: при изменении алгоритма старые файлы не используются
+GENERATOR_VERSION = 1
+DEFAULT_SEED = 12345
+
+# Примерное количество нуклеотидов, генерируемых за одну итерацию
+BLOCK_BASES = 1024 * 1024
+
+# Приблизительный размер несжатых данных для каждого размера набора (байты)
+SIZES = {
+    "small": 2 * 1024 * 1024,
+    "medium": 32 * 1024 * 1024,
+    "large": 256 * 1024 * 1024,
+}
+
+# Нуклеотиды с небольшой долей N: индекс — случайное число 0–199
+NUCLEOTIDES = np.frombuffer(b"ACGT" * 50, dtype=np.uint8).copy()
+NUCLEOTIDES[:2] = ord("N")
+
+
+@dataclass(frozen=True)
+class Profile:
+    """
+    Профиль синтетических данных.
+
+    Attributes:
+        min_length (int): Минимальная длина рида.
+        max_length (int): Максимальная длина рида.
+        log_normal (bool): Длины из логнормального распределения (длинные риды) вместо равномерного.
+        compressed (bool): Сохранять файл в gzip.
+    """
+    min_length: int
+    max_length: int
+    log_normal: bool = False
+    compressed: bool = False
+
+    def lengths(self, rng: np.random.Generator, count: int) -> np.ndarray:
+        """Генерирует длины ридов."""
+        if self.min_length == self.max_length:
+            return np.full(count, self.min_length, dtype=np.int64)
+        if self.log_normal:
+            values = rng.lognormal(np.log(np.sqrt(self.min_length * self.max_length)), 0.6, count)
+            return np.clip(values, self.min_length, self.max_length).astype(np.int64)
+        return rng.integers(self.min_length, self.max_length + 1, count)
+
+
+PROFILES = {
+    "short": Profile(150, 150),
+    "long": Profile(500, 50000, log_normal=True),
+    "variable": Profile(35, 251),
+    "gz": Profile(150, 150, compressed=True),
+}
+
+
+def generate_block(rng: np.random.Generator, profile: Profile, first_index: int, count: int) -> bytes:
+    """
+    Генерирует блок записей FASTQ.
+
+    Качество падает к концу рида со случайным шумом, как у типичных данных Illumina.
+
+    Args:
+        rng (np.random.Generator): Генератор случайных чисел.
+        profile (Profile): Профиль данных.
+        first_index (int): Номер первого рида блока (для заголовков).
+        count (int): Количество ридов.
+
+    Returns:
+        bytes: Записи FASTQ.
+    """
+    lengths = profile.lengths(rng, count)
+    total = int(lengths.sum())
+    offsets = np.concatenate(([0], np.cumsum(lengths)))
+
+    sequences = NUCLEOTIDES[rng.integers(0, len(NUCLEOTIDES), total)]
+    positions = np.arange(total) - np.repeat(offsets[:-1], lengths)
+    relative = positions / np.repeat(lengths, lengths)
+    qualities = 38 - 18 * relative ** 2 + rng.normal(0, 3, total)
+    qualities = (np.clip(qualities, 2, 41) + 33).astype(np.uint8)
+
+    sequence_bytes = sequences.tobytes()
+    quality_bytes = qualities.tobytes()
+    parts = []
+    for i in range(count):
+        start, end = int(offsets[i]), int(offsets[i + 1])
+        parts.append(b"@synthetic.%d length=%d\n%b\n+\n%b\n" % (
+            first_index + i, end - start, sequence_bytes[start:end], quality_bytes[start:end]))
+    return b"".join(parts)
+
+
+def generate(path: str | Path, profile: Profile, target_bytes: int, seed: int = DEFAULT_SEED) -> int:
+    """
+    Записывает детерминированный синтетический FASTQ-файл.
+
+    При одинаковых профиле, размере и seed содержимое файла всегда одинаково
+    (в заголовок gzip не записываются имя файла и время модификации).
+
+    Args:
+        path (str | Path): Путь к создаваемому файлу.
+        profile (Profile): Профиль данных.
+        target_bytes (int): Приблизительный размер несжатых данных.
+        seed (int): Начальное значение генератора случайных чисел.
+
+    Returns:
+        int: Количество записанных ридов.
+    """
+    rng = np.random.default_rng(seed)
+    path = Path(path)
+    written = 0
+    reads = 0
+    with open(path, "wb") as raw:
+        stream = gzip.GzipFile(filename="", fileobj=raw, mode="wb", mtime=0) if profile.compressed else raw
+        try:
+            while written < target_bytes:
+                block = generate_block(rng, profile, reads, max(16, BLOCK_BASES // profile.max_length))
+                stream.write(block)
+                written += len(block)
+                reads += block.count(b"\n") // 4
+        finally:
+            if stream is not raw:
+                stream.close()
+    return reads
+
+
+def dataset_path(data_dir: Path, profile_name: str, size_name: str, seed: int = DEFAULT_SEED) -> Path:
+    """Возвращает путь к файлу набора данных (имя включает версию генератора и seed)."""
+    suffix = ".fastq.gz" if PROFILES[profile_name].compressed else ".fastq"
+    return data_dir / f"{profile_name}-{size_name}-v{GENERATOR_VERSION}-s{seed}{suffix}"
+
+
+def ensure_dataset(data_dir: Path, profile_name: str, size_name: str, seed: int = DEFAULT_SEED) -> Path:
+    """
+    Возвращает путь к набору данных, создавая файл, если его ещё нет.
+
+    Файл сначала пишется во временный, поэтому прерванная генерация не оставляет
+    неполный набор данных.
+    """
+    path = dataset_path(data_dir, profile_name, size_name, seed)
+    if not path.exists():
+        data_dir.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_name(path.name + ".tmp")
+        generate(temporary, PROFILES[profile_name], SIZES[size_name], seed)
+        temporary.replace(path)
+    return path
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Создает синтетический FASTQ-файл из командной строки."""
+    parser = argparse.ArgumentParser(description="Генератор синтетических FASTQ-файлов.")
+    parser.add_argument("output", type=Path, help="путь к создаваемому файлу")
+    parser.add_argument("--profile", choices=PROFILES, default="short", help="профиль данных")
+    parser.add_argument("--size", choices=SIZES, default="small", help="размер набора")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="начальное значение генератора")
+    args = parser.parse_args(argv)
+
+    reads = generate(args.output, PROFILES[args.profile], SIZES[args.size], args.seed)
+    print(f"{args.output}: {reads} ридов")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
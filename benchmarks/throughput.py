@@ -0,0 +1,203 @@
+import argparse
+import gc
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import numpy as np  # noqa: E402
+
+from synthetic_fastq import PROFILES, SIZES, DEFAULT_SEED, ensure_dataset  # noqa: E402
+from src.models.fastq_reader import FastqReader  # noqa: E402
+from src.models.fastq_plots import run_analysis  # noqa: E402
+from src.models.metric_module import registered_metrics  # noqa: E402
+
+# Допустимое ухудшение времени и пиковой памяти относительно базового замера
+DEFAULT_TOLERANCE = 1.25
+DEFAULT_DATA_DIR = Path(tempfile.gettempdir()) / "fastqclite-bench"
+# Базовый замер в репозитории (наборы small, получен через --save); он зависит от машины,
+# поэтому на другой машине базовый замер нужно сохранить заново
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+
+def parse_records(path: Path) -> int:
+    """Построчное чтение read() с обращением к качеству каждой записи."""
+    reads = 0
+    with FastqReader(path) as reader:
+        for record in reader.read():
+            record.quality
+            reads += 1
+    return reads
+
+
+def parse_batches(path: Path) -> int:
+    """Пакетное чтение read_batches(), используемое анализом."""
+    with FastqReader(path) as reader:
+        return sum(len(batch) for batch in reader.read_batches())
+
+
+def analyze(path: Path) -> int:
+    """Полный однопроцессный анализ без кэша."""
+    return run_analysis(path)['total_sequences']
+
+
+def build_figures(result: dict[str, Any]) -> int:
+    """Построение и отрисовка всех графиков по готовым результатам анализа."""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    for metric in registered_metrics():
+        if metric.view != "figure":
+            continue
+        figure = metric.create_figure(result.get(metric.result_key), "#3E5F8A")
+        FigureCanvasAgg(figure).draw()
+    return result['total_sequences']
+
+
+# Этап -> (подготовка аргумента по пути к файлу, замеряемая функция)
+STAGES: dict[str, tuple[Callable[[Path], Any], Callable[[Any], int]]] = {
+    "parse_records": (lambda path: path, parse_records),
+    "parse_batches": (lambda path: path, parse_batches),
+    "analysis": (lambda path: path, analyze),
+    "figures": (lambda path: run_analysis(path), build_figures),
+}
+
+
+def measure(stage: str, path: Path, repeats: int) -> dict[str, float]:
+    """
+    Замеряет один этап на одном наборе данных.
+
+    Время — медиана repeats запусков. Пиковая память замеряется отдельным запуском
+    под tracemalloc (он замедляет код на Python и искажал бы время). Учитываются
+    выделения Python и NumPy; страницы файла, отображённого в память, не учитываются.
+
+    Returns:
+        dict[str, float]: Время, риды/с, МБ/с (по размеру файла на диске) и пиковая память.
+    """
+    prepare, run = STAGES[stage]
+    argument = prepare(path)
+
+    times = []
+    reads = 0
+    for _ in range(repeats):
+        gc.collect()
+        start = time.perf_counter()
+        reads = run(argument)
+        times.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    run(argument)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    seconds = statistics.median(times)
+    megabytes = path.stat().st_size / 1024 / 1024
+    return {
+        "seconds": seconds,
+        "reads": reads,
+        "reads_per_second": reads / seconds,
+        "mb_per_second": megabytes / seconds,
+        "peak_memory_mb": peak / 1024 / 1024,
+    }
+
+
+def compare(name: str, result: dict[str, float], reference: dict[str, float] | None,
+            tolerance: float) -> tuple[str, bool]:
+    """
+    Форматирует строку отчёта и сравнивает замер с базовым.
+
+    Returns:
+        tuple[str, bool]: Строка отчёта и признак регрессии.
+    """
+    line = (f"{name:28s} {result['seconds'] * 1000:9.1f} мс {result['reads_per_second']:12.0f} ридов/с "
+            f"{result['mb_per_second']:8.1f} МБ/с {result['peak_memory_mb']:8.1f} МБ")
+    if not reference:
+        return line, False
+
+    time_ratio = result["seconds"] / reference["seconds"]
+    memory_ratio = result["peak_memory_mb"] / max(reference["peak_memory_mb"], 0.1)
+    line += f"  (время {time_ratio:.2f}×, память {memory_ratio:.2f}×)"
+    regression = time_ratio > tolerance or memory_ratio > tolerance
+    if regression:
+        line += " — РЕГРЕССИЯ"
+    return line, regression
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Замеряет производительность чтения, анализа и построения графиков на синтетических данных.
+
+    Returns:
+        int: 0 — регрессий нет, 1 — время или память превысили базовый замер.
+    """
+    parser = argparse.ArgumentParser(description="Замер производительности FastQClite на синтетических FASTQ.")
+    parser.add_argument("--profiles", nargs="+", choices=PROFILES, default=list(PROFILES),
+                        help="профили данных (по умолчанию: все)")
+    parser.add_argument("--sizes", nargs="+", choices=SIZES, default=["small", "medium"],
+                        help="размеры наборов (по умолчанию: small medium)")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES),
+                        help="замеряемые этапы (по умолчанию: все)")
+    parser.add_argument("--repeats", type=int, default=3, help="количество запусков на замер")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="начальное значение генератора")
+    parser.add_argument("--data-dir", type=Path, default=DEFAULT_DATA_DIR,
+                        help="каталог для сгенерированных файлов (по умолчанию: %(default)s)")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE,
+                        help="JSON с базовым замером для сравнения (по умолчанию: %(default)s)")
+    parser.add_argument("--no-baseline", action="store_true", help="не сравнивать с базовым замером")
+    parser.add_argument("--save", type=Path, help="сохранить результаты в JSON")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="допустимое ухудшение времени и памяти относительно базового замера")
+    args = parser.parse_args(argv)
+
+    import matplotlib
+    matplotlib.use("Agg")
+
+    baseline = {}
+    if not args.no_baseline and args.baseline.exists():
+        report = json.loads(args.baseline.read_text())
+        baseline = report["results"]
+        environment = report.get("environment", {})
+        print(f"Базовый замер: {args.baseline} (Python {environment.get('python', '?')}, "
+              f"NumPy {environment.get('numpy', '?')}, {environment.get('machine', '?')})", flush=True)
+    results: dict[str, dict[str, dict[str, float]]] = {}
+    failed = False
+
+    for size in args.sizes:
+        for profile in args.profiles:
+            dataset = f"{profile}-{size}"
+            path = ensure_dataset(args.data_dir, profile, size, args.seed)
+            results[dataset] = {}
+            for stage in args.stages:
+                result = measure(stage, path, args.repeats)
+                results[dataset][stage] = result
+                line, regression = compare(f"{dataset}/{stage}", result,
+                                           baseline.get(dataset, {}).get(stage), args.tolerance)
+                failed |= regression
+                print(line, flush=True)
+
+    if args.save:
+        report = {
+            "environment": {
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "machine": platform.machine(),
+                "system": platform.system(),
+                "seed": args.seed,
+            },
+            "results": results,
+        }
+        args.save.write_text(json.dumps(report, indent=2))
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
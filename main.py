@@ -1,5 +1,6 @@
 import sys
 import os
+import multiprocessing
 from pathlib import Path
 
 def get_resource_path(relative_path):
@@ -37,18 +38,21 @@ if current_dir not in sys.path:
 project_root = Path(__file__).resolve().parent
 sys.path.insert(0, str(project_root))
 
-try:
-    from src.ui.file_selection import FileSelection
-except ImportError as e:
-    print(f"Ошибка: Не удалось импортировать FileSelection из src.ui.file_selection.")
-    print(f"Убедитесь, что файл 'file_selection.py' находится в каталоге '{project_root / 'src' / 'ui'}'")
-    print(f"Подробности ошибки: {e}", file=sys.stderr)
-    sys.exit(1)
-
-def main():
+def run_gui():
     """
-    Основная функция для инициализации и запуска приложения FastQClite.
+    Запускает графическое приложение FastQClite.
+
+    Модули интерфейса (tkinter, tkinterdnd2, PIL) импортируются только здесь,
+    чтобы консольный режим их не загружал.
     """
+    try:
+        from src.ui.file_selection import FileSelection
+    except ImportError as e:
+        print(f"Ошибка: Не удалось импортировать FileSelection из src.ui.file_selection.")
+        print(f"Убедитесь, что файл 'file_selection.py' находится в каталоге '{project_root / 'src' / 'ui'}'")
+        print(f"Подробности ошибки: {e}", file=sys.stderr)
+        sys.exit(1)
+
     print("Запуск приложения FastQClite...")
     try:
         app = FileSelection(get_resource_path)
@@ -57,5 +61,21 @@ def main():
         print(f"Произошла непредвиденная ошибка во время выполнения приложения: {e}", file=sys.stderr)
         sys.exit(1)
 
+def main():
+    """
+    Основная функция для инициализации и запуска приложения FastQClite.
+
+    Без аргументов запускается графический интерфейс. Если переданы аргументы
+    командной строки (пути к FASTQ-файлам и опции), выполняется консольный анализ
+    без дисплея — см. src/cli.py или `python main.py --help`.
+    """
+    if len(sys.argv) > 1:
+        from src.cli import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
+
+    run_gui()
+
 if __name__ == "__main__":
+    # Необходимо для пула процессов в упакованном PyInstaller приложении
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
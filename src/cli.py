@@ -0,0 +1,310 @@
+import argparse
+import functools
+import json
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from .models.fastq_plots import run_analysis
+from .models.fastq_reader import STDIN_PATH, is_stream
+from .models.follow_analysis import run_follow_analysis, DEFAULT_POLL_INTERVAL
+from .models.metric_module import registered_metrics
+from .models.duplication import SequenceDuplication, DEFAULT_MEMORY_LIMIT
+from .models.contamination import AdapterContent, load_adapters
+from .models.results_cache import ResultsCache
+from .models.checkpoint import CheckpointStore
+from .models.record_index import RecordIndex
+from .models.profiler import Profiler
+
+FASTQ_SUFFIXES = (".gz", ".fastq", ".fq")
+# Через сколько секунд без новых записей заканчивается слежение за файлом (--follow)
+DEFAULT_FOLLOW_IDLE = 60.0
+ACCENT_COLOR = "#3E5F8A"
+
+
+def use_agg_backend():
+    """
+    Переключает matplotlib на бэкенд Agg.
+
+    Консольный режим не должен зависеть от дисплея и не импортирует tkinter и tkinterdnd2.
+    matplotlib (а вместе с ним PIL) загружается только если нужно сохранять графики.
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+
+
+def output_stem(file_path: Path) -> str:
+    """Возвращает имя файла без расширений FASTQ (.fastq, .fq, .gz); для стандартного ввода — 'stdin'."""
+    if str(file_path) == STDIN_PATH:
+        return "stdin"
+    name = file_path.name
+    while name.lower().endswith(FASTQ_SUFFIXES):
+        name = name[:name.rfind(".")]
+    return name or file_path.name
+
+
+def output_stems(file_paths: list[Path]) -> list[str]:
+    """
+    Возвращает имена выходных файлов для набора входных файлов, не совпадающие между собой.
+
+    Если у нескольких файлов одинаковое имя без расширений FASTQ (runA/s.fastq и runB/s.fastq),
+    к нему добавляется имя каталога (runA_s, runB_s); если и этого недостаточно
+    (runB/s.fastq и runB/s.fq) — номер (runB_s, runB_s_2). Регистр букв не учитывается:
+    файловая система может его не различать.
+
+    Args:
+        file_paths (list[Path]): Входные файлы в порядке обработки.
+
+    Returns:
+        list[str]: Имена для метрик и графиков в том же порядке.
+    """
+    stems = [output_stem(file_path) for file_path in file_paths]
+    counts = Counter(stem.casefold() for stem in stems)
+    stems = [f"{file_path.resolve().parent.name}_{stem}"
+             if counts[stem.casefold()] > 1 and str(file_path) != STDIN_PATH else stem
+             for file_path, stem in zip(file_paths, stems)]
+
+    used = set()
+    unique = []
+    for stem in stems:
+        candidate, number = stem, 1
+        while candidate.casefold() in used:
+            number += 1
+            candidate = f"{stem}_{number}"
+        used.add(candidate.casefold())
+        unique.append(candidate)
+    return unique
+
+
+def save_table(table: tuple[list[str], list[tuple]], path: Path):
+    """Сохраняет таблицу модуля метрики (см. MetricModule.create_table) в файл TSV."""
+    headings, rows = table
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\t".join(headings) + "\n")
+        for row in rows:
+            f.write("\t".join(str(value) for value in row) + "\n")
+
+
+def save_metrics(path: Path, file_path: Path, result: dict):
+    """
+    Сохраняет метрики в JSON. Файл заменяется атомарно, поэтому читающий его процесс
+    (например, мониторинг промежуточных результатов) не увидит записанный наполовину файл.
+    """
+    temporary = path.with_name(path.name + ".tmp")
+    with open(temporary, "w", encoding="utf-8") as f:
+        json.dump({'file': str(file_path), **result}, f, ensure_ascii=False, indent=2)
+    os.replace(temporary, path)
+
+
+def report_interim(file_path: Path, metrics_path: Path, result: dict):
+    """Сохраняет промежуточные метрики и выводит краткую сводку в stderr."""
+    save_metrics(metrics_path, file_path, result)
+    summary = result.get('quality_summary') or {}
+    line = f"{file_path}: {result['total_sequences']:,} ридов".replace(",", " ")
+    if 'mean_quality' in summary:
+        line += f", среднее качество {summary['mean_quality']:.1f}"
+    print(f"Промежуточно: {line} -> {metrics_path}", file=sys.stderr, flush=True)
+
+
+def analyze_file(file_path: str | Path, output_dir: str | Path,
+                 formats: list[str], workers: int = 1, use_cache: bool = False,
+                 duplication_memory: int | None = None,
+                 adapters: dict[str, str] | None = None,
+                 interim_interval: float = 0,
+                 follow_idle: float | None = None,
+                 checkpoint_interval: float = 0,
+                 build_index: bool = False,
+                 stem: str | None = None) -> Path:
+    """
+    Анализирует один FASTQ-файл и сохраняет метрики и графики.
+
+    В JSON с метриками ключ 'diagnostics' содержит время этапов анализа, построения
+    и сохранения графиков (см. Profiler.report).
+
+    Args:
+        file_path (str | Path): Путь к FASTQ-файлу, именованному каналу или '-' для стандартного ввода.
+        output_dir (str | Path): Каталог для результатов.
+        formats (list[str]): Форматы графиков (например, ["png", "svg"]). Пустой список —
+            графики не сохраняются.
+        workers (int): Количество процессов для анализа несжатого файла.
+        use_cache (bool): Использовать кэш результатов (~/.cache/fastqclite).
+        duplication_memory (int | None): Ограничение памяти оценки дупликации в байтах
+            (см. SequenceDuplication). None — значение по умолчанию.
+        adapters (dict[str, str] | None): Библиотека адаптеров: название -> последовательность.
+            None — библиотека по умолчанию.
+        interim_interval (float): Период (в секундах) сохранения промежуточных метрик
+            (с ключом 'partial': True) в тот же JSON-файл и вывода сводки в stderr.
+            0 — промежуточные результаты не выводятся.
+        follow_idle (float | None): Следить за дописываемым файлом (см. run_follow_analysis),
+            пока он растёт; слежение заканчивается, если новых записей нет follow_idle секунд.
+            Промежуточные метрики выводятся после каждой проверки (с периодом interim_interval,
+            если он задан). None — обычный анализ.
+        checkpoint_interval (float): Период (в секундах) сохранения контрольных точек
+            (~/.cache/fastqclite/checkpoints, см. CheckpointStore). Если предыдущий запуск
+            был прерван, анализ продолжается с его последней контрольной точки.
+            0 — контрольные точки не используются.
+        build_index (bool): Построить индекс записей (<файл>.fqi, см. RecordIndex), если его
+            ещё нет. С индексом gzip-файл анализируется в workers процессов.
+        stem (str | None): Имя для файлов результатов (см. output_stems). None — имя входного
+            файла без расширений FASTQ.
+
+    Returns:
+        Path: Путь к сохранённому JSON-файлу с метриками.
+    """
+    file_path = Path(file_path)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    stem = stem or output_stem(file_path)
+    metrics_path = output_dir / f"{stem}.metrics.json"
+
+    if duplication_memory is not None:
+        SequenceDuplication.memory_limit = duplication_memory
+    if adapters is not None:
+        AdapterContent.adapters = adapters
+
+    profiler = Profiler()
+    snapshot_callback = None
+    if interim_interval > 0 or follow_idle is not None:
+        snapshot_callback = functools.partial(report_interim, file_path, metrics_path)
+
+    if build_index and follow_idle is None and not is_stream(file_path):
+        with profiler.stage("index"):
+            RecordIndex.load_or_build(file_path)
+
+    if follow_idle is not None:
+        result = run_follow_analysis(file_path, poll_interval=interim_interval or DEFAULT_POLL_INTERVAL,
+                                     idle_timeout=follow_idle, snapshot_callback=snapshot_callback,
+                                     profiler=profiler)
+        follow = result['follow']
+        if follow['incomplete_tail']:
+            print(f"Предупреждение: {file_path}: последние {follow['file_size'] - follow['offset']} байт "
+                  f"не учтены ({follow['incomplete_tail']})", file=sys.stderr)
+    else:
+        result = run_analysis(file_path, workers=workers, cache=ResultsCache() if use_cache else None,
+                              snapshot_callback=snapshot_callback, snapshot_interval=interim_interval,
+                              profiler=profiler,
+                              checkpoints=CheckpointStore() if checkpoint_interval > 0 else None,
+                              checkpoint_interval=checkpoint_interval)
+
+    if formats:
+        use_agg_backend()
+    # Графики модулей метрик сохраняются как <имя>.<модуль>.<формат>, таблицы — как <имя>.<модуль>.tsv
+    for metric in registered_metrics():
+        if metric.view == "table":
+            save_table(metric.create_table(result.get(metric.result_key)),
+                       output_dir / f"{stem}.{metric.name}.tsv")
+            continue
+        if not formats:
+            continue
+        figure = metric.create_figure(result.get(metric.result_key), ACCENT_COLOR, profiler=profiler)
+        for fmt in formats:
+            with profiler.stage("render"):
+                figure.savefig(output_dir / f"{stem}.{metric.name}.{fmt}", format=fmt)
+
+    result['diagnostics'] = profiler.report()
+    save_metrics(metrics_path, file_path, result)
+    return metrics_path
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Создает парсер аргументов командной строки."""
+    parser = argparse.ArgumentParser(
+        prog="fastqclite",
+        description="Анализ качества FASTQ-файлов без графического интерфейса.")
+    parser.add_argument("files", nargs="+", type=Path,
+                        help="FASTQ-файлы (.fastq, .fq, допускается сжатие gzip) или именованные каналы; "
+                             "«-» — чтение из стандартного ввода")
+    parser.add_argument("-o", "--output-dir", type=Path, default=Path("fastqclite_results"),
+                        help="каталог для метрик и графиков (по умолчанию: %(default)s)")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="количество файлов, обрабатываемых одновременно (по умолчанию: %(default)s)")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="количество процессов на один несжатый файл (по умолчанию: %(default)s)")
+    parser.add_argument("-f", "--formats", nargs="+", choices=["png", "svg"], default=["png"],
+                        help="форматы графиков (по умолчанию: png)")
+    parser.add_argument("--cache", action="store_true",
+                        help="использовать кэш результатов в ~/.cache/fastqclite")
+    parser.add_argument("--duplication-memory", type=float, default=DEFAULT_MEMORY_LIMIT / 1024 / 1024,
+                        metavar="MB",
+                        help="память на оценку дупликации в каждом процессе, МБ (по умолчанию: %(default)g)")
+    parser.add_argument("--adapters", type=Path, metavar="FILE",
+                        help="библиотека адаптеров в формате FastQC: «название<TAB>последовательность»")
+    parser.add_argument("--no-plots", action="store_true",
+                        help="сохранять только метрики в JSON, без графиков")
+    parser.add_argument("--interim", type=float, default=0, metavar="SECONDS",
+                        help="каждые SECONDS секунд сохранять промежуточные метрики в JSON и выводить "
+                             "сводку в stderr (для мониторинга длинных конвейеров; по умолчанию выключено)")
+    parser.add_argument("--follow", action="store_true",
+                        help="следить за несжатыми файлами, которые ещё дописываются: учитывать новые "
+                             "записи по мере появления и выводить промежуточные метрики")
+    parser.add_argument("--follow-idle", type=float, default=DEFAULT_FOLLOW_IDLE, metavar="SECONDS",
+                        help="закончить слежение, если файл не растёт SECONDS секунд (по умолчанию: %(default)g)")
+    parser.add_argument("--checkpoint", type=float, default=0, metavar="SECONDS",
+                        help="каждые SECONDS секунд сохранять контрольную точку анализа в "
+                             "~/.cache/fastqclite/checkpoints; повторный запуск прерванного анализа "
+                             "продолжается с неё (кроме BGZF и многочленных gzip, которые распаковываются "
+                             "в несколько потоков; по умолчанию выключено)")
+    parser.add_argument("--index", action="store_true",
+                        help="построить (один раз) индекс записей <файл>.fqi: с ним gzip-файлы "
+                             "анализируются в --workers процессов, а выборка для оценки берётся по всему файлу")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Точка входа консольного режима.
+
+    Args:
+        argv (list[str] | None): Аргументы командной строки (без имени программы).
+
+    Returns:
+        int: Код возврата: 0 — все файлы обработаны, 1 — при обработке были ошибки.
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.no_plots:
+        args.formats = []
+    duplication_memory = int(args.duplication_memory * 1024 * 1024)
+    follow_idle = args.follow_idle if args.follow else None
+    adapters = None
+    if args.adapters:
+        try:
+            adapters = load_adapters(args.adapters)
+        except (OSError, ValueError) as e:
+            parser.error(f"не удалось прочитать библиотеку адаптеров {args.adapters}: {e}")
+    stdin_count = sum(str(file_path) == STDIN_PATH for file_path in args.files)
+    if stdin_count > 1:
+        parser.error("стандартный ввод («-») можно указать только один раз")
+    # Одинаковые имена перезаписали бы результаты друг друга (а при -j > 1 — одновременно)
+    stems = output_stems(args.files)
+    failed = 0
+
+    # Процессы пула не наследуют стандартный ввод, поэтому с «-» файлы обрабатываются по очереди
+    if args.jobs <= 1 or len(args.files) == 1 or stdin_count:
+        for file_path, stem in zip(args.files, stems):
+            try:
+                metrics_path = analyze_file(file_path, args.output_dir, args.formats, args.workers, args.cache,
+                                            duplication_memory, adapters, args.interim, follow_idle,
+                                            args.checkpoint, args.index, stem)
+                print(f"Готово: {file_path} -> {metrics_path}")
+            except Exception as e:
+                failed += 1
+                print(f"Ошибка при анализе {file_path}: {e}", file=sys.stderr)
+        return 1 if failed else 0
+
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        futures = {executor.submit(analyze_file, file_path, args.output_dir, args.formats,
+                                   args.workers, args.cache, duplication_memory, adapters,
+                                   args.interim, follow_idle, args.checkpoint, args.index, stem): file_path
+                   for file_path, stem in zip(args.files, stems)}
+        for future in as_completed(futures):
+            file_path = futures[future]
+            try:
+                print(f"Готово: {file_path} -> {future.result()}")
+            except Exception as e:
+                failed += 1
+                print(f"Ошибка при анализе {file_path}: {e}", file=sys.stderr)
+
+    return 1 if failed else 0
@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from typing import Iterator
-from .record import Record, SequenceRecord
+from .record import Record, BaseSequenceRecord
 from pathlib import Path
 
 
@@ -83,7 +83,8 @@ class SequenceReader(Reader):
     """
     Абстрактный класс для чтения последовательностей (например, FASTA или FASTQ).
 
-    Наследуется от Reader и специализируется на работе с SequenceRecord.
+    Наследуется от Reader и специализируется на работе с записями последовательностей
+    (BaseSequenceRecord: SequenceRecord, FastqRecord).
 
     Attributes:
         filepath (Path): Путь к файлу с последовательностями.
@@ -100,15 +101,15 @@ class SequenceReader(Reader):
         super().__init__(filepath)
 
     @abstractmethod
-    def read(self) -> Iterator[SequenceRecord]:
+    def read(self) -> Iterator[BaseSequenceRecord]:
         """
         Абстрактный метод для чтения последовательностей из файла.
 
-        Должен возвращать итератор по объектам SequenceRecord,
+        Должен возвращать итератор по объектам BaseSequenceRecord,
         каждый из которых содержит идентификатор, последовательность и, возможно, качество (для FASTQ).
 
         Yields:
-            SequenceRecord: Объект, представляющий одну биологическую последовательность.
+            BaseSequenceRecord: Объект, представляющий одну биологическую последовательность.
 
         Raises:
             NotImplementedError: Если метод не реализован в подклассе.
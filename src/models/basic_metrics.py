@@ -0,0 +1,232 @@
+from typing import Any, Dict, TYPE_CHECKING
+import numpy as np
+
+from .metric_module import (MetricModule, PositionalMetric, register_metric, grow_rows,
+                            batch_padding, batch_base_codes, batch_position_bins, bin_positions,
+                            position_bin_count, position_bins, BASES, POSITION_BIN_STARTS)
+from .profiler import Profiler, NULL_PROFILER
+
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+    from .fastq_reader import FastqBatch
+
+# Максимальное значение Phred+33 (ASCII '~' = 126)
+PHRED_MAX = 93
+PHRED_LEVELS = PHRED_MAX + 1
+
+
+@register_metric
+class LengthDistribution(MetricModule):
+    """
+    Распределение длин ридов.
+
+    Длины группируются в те же интервалы, что и позиции (см. POSITION_BIN_STARTS): короткие
+    риды учитываются точно, а гистограмма длинных ридов (Nanopore, PacBio) имеет
+    логарифмически растущие интервалы и ограниченный размер. Суммарная длина учитывается
+    точно.
+
+    Attributes:
+        counts (np.ndarray): Гистограмма длин: индекс — интервал длин, значение — число ридов.
+        total_length (int): Суммарная длина учтённых ридов.
+    """
+
+    name = "length"
+    title = "Распределение длин последовательностей"
+    result_key = "length_distribution"
+
+    def __init__(self):
+        """Инициализирует пустую гистограмму."""
+        self.counts = np.zeros(PositionalMetric.INITIAL_LENGTH + 1, dtype=np.int64)
+        self.total_length = 0
+
+    def update_batch(self, batch: "FastqBatch"):
+        """Добавляет длины ридов пакета."""
+        histogram = np.bincount(position_bins(batch.lengths))
+        self.counts = grow_rows(self.counts, len(histogram))
+        self.counts[:len(histogram)] += histogram
+        self.total_length += int(batch.lengths.sum())
+
+    def merge(self, other: "LengthDistribution"):
+        """Складывает гистограммы длин."""
+        self.counts = grow_rows(self.counts, len(other.counts))
+        self.counts[:len(other.counts)] += other.counts
+        self.total_length += other.total_length
+
+    def finalize(self) -> Dict[str, Any]:
+        """
+        Возвращает пары длина → число ридов для непустых интервалов длин и среднюю длину.
+
+        Для интервалов шире одной длины указывается начало интервала.
+        """
+        bins = np.flatnonzero(self.counts)
+        total = int(self.counts.sum())
+        return {self.result_key: {
+            'lengths': POSITION_BIN_STARTS[bins].tolist(),
+            'counts': self.counts[bins].tolist(),
+            'mean_length': self.total_length / total if total else 0.0
+        }}
+
+    def get_state(self) -> Dict[str, np.ndarray]:
+        """Возвращает гистограмму, обрезанную по максимальной длине, и суммарную длину."""
+        nonzero = np.flatnonzero(self.counts)
+        return {'counts': self.counts[:nonzero[-1] + 1 if nonzero.size else 1],
+                'total_length': np.array(self.total_length, dtype=np.int64)}
+
+    def set_state(self, state: Dict[str, np.ndarray]):
+        """Восстанавливает гистограмму."""
+        self.counts = np.array(state['counts'], dtype=np.int64)
+        self.total_length = int(state['total_length'])
+
+    @classmethod
+    def create_figure(cls, data: Any, accent_color: str, partial: bool = False,
+                      profiler: Profiler = NULL_PROFILER) -> "Figure":
+        """Строит гистограмму длин (см. create_figure_length)."""
+        from .fastq_plots import create_figure_length
+        return create_figure_length(data, accent_color, partial=partial, profiler=profiler)
+
+
+@register_metric
+class PerBaseQuality(PositionalMetric):
+    """
+    Распределение качества по позициям в риде (позиция × Phred 0–93).
+
+    Помимо данных графика формирует сводку качества по всем основаниям ('quality_summary').
+    """
+
+    name = "quality"
+    title = "Среднее качество по каждой позиции в риде"
+    result_key = "mean_qualities_data"
+    columns = PHRED_LEVELS
+
+    def _count(self, batch: "FastqBatch") -> np.ndarray:
+        """
+        Считает оценки качества по интервалам позиций через np.bincount по всей матрице пакета.
+
+        Нулевое дополнение попадает в ячейки (интервал, Q0) и затем вычитается.
+        """
+        bins = position_bin_count(batch.qualities.shape[1])
+        offsets = batch_position_bins(batch) * PHRED_LEVELS
+        counts = np.bincount((batch.qualities + offsets).ravel(),
+                             minlength=bins * PHRED_LEVELS).reshape(bins, PHRED_LEVELS)
+        counts[:, 0] -= bin_positions(batch_padding(batch))
+        return counts
+
+    def coverage(self) -> np.ndarray:
+        """Возвращает количество оснований в каждом интервале позиций (для отдельных позиций — покрытие)."""
+        return self.counts[:self.bins].sum(axis=1)
+
+    def mean_qualities(self) -> np.ndarray:
+        """Возвращает среднее качество для каждого интервала позиций."""
+        counts = self.counts[:self.bins]
+        totals = counts.sum(axis=1)
+        weighted = counts @ np.arange(PHRED_LEVELS)
+        return np.divide(weighted, totals, out=np.zeros(len(totals)), where=totals > 0)
+
+    def quality_quantile(self, q: float) -> np.ndarray:
+        """
+        Вычисляет квантиль качества для каждого интервала позиций по гистограмме.
+
+        Использует ту же линейную интерполяцию, что и np.percentile, поэтому
+        результат совпадает с расчётом по полному списку оценок.
+
+        Args:
+            q (float): Квантиль в диапазоне [0, 1] (0.5 — медиана).
+
+        Returns:
+            np.ndarray: Значение квантиля для каждого интервала позиций.
+        """
+        counts = self.counts[:self.bins]
+        cumulative = np.cumsum(counts, axis=1)
+        totals = cumulative[:, -1]
+
+        rank = np.maximum(totals - 1, 0) * q
+        lower_rank = np.floor(rank)
+        upper_rank = np.minimum(lower_rank + 1, np.maximum(totals - 1, 0))
+
+        # Значение k-го по порядку элемента — число уровней, где накопленная сумма <= k
+        lower = (cumulative <= lower_rank[:, None]).sum(axis=1)
+        upper = (cumulative <= upper_rank[:, None]).sum(axis=1)
+        return lower + (upper - lower) * (rank - lower_rank)
+
+    def quality_fraction_at_least(self, threshold: int) -> float:
+        """Возвращает долю всех оснований с качеством не ниже threshold (например, Q20/Q30)."""
+        total = self.counts.sum()
+        if total == 0:
+            return 0.0
+        return float(self.counts[:, threshold:].sum() / total)
+
+    def finalize(self) -> Dict[str, Any]:
+        """Возвращает среднее, медиану и квартили по позициям и сводку качества."""
+        mean_qualities_data = None
+        if self.max_length:
+            mean_qualities_data = {
+                'positions': self.positions(),
+                'mean_qualities': self.mean_qualities().tolist(),
+                'median_qualities': self.quality_quantile(0.5).tolist(),
+                'lower_quartiles': self.quality_quantile(0.25).tolist(),
+                'upper_quartiles': self.quality_quantile(0.75).tolist()
+            }
+
+        total_bases = int(self.counts.sum())
+        quality_summary = {
+            'total_bases': total_bases,
+            'mean_quality': float(self.counts.sum(axis=0) @ np.arange(PHRED_LEVELS) / total_bases)
+            if total_bases else 0.0,
+            'q20_fraction': self.quality_fraction_at_least(20),
+            'q30_fraction': self.quality_fraction_at_least(30)
+        }
+        return {self.result_key: mean_qualities_data, 'quality_summary': quality_summary}
+
+    @classmethod
+    def create_figure(cls, data: Any, accent_color: str, partial: bool = False,
+                      profiler: Profiler = NULL_PROFILER) -> "Figure":
+        """Строит график среднего качества по позициям (см. create_figure_quality)."""
+        from .fastq_plots import create_figure_quality
+        return create_figure_quality(data, accent_color, partial=partial, profiler=profiler)
+
+
+@register_metric
+class PerBaseContent(PositionalMetric):
+    """Нуклеотидный состав по позициям в риде (позиция × A, C, G, T, N)."""
+
+    name = "content"
+    title = "Процентное содержание каждого нуклеотида по позициям"
+    result_key = "base_content_data"
+    columns = len(BASES)
+
+    def _count(self, batch: "FastqBatch") -> np.ndarray:
+        """Считает нуклеотиды по интервалам позиций; нулевое дополнение попадает в N и вычитается."""
+        bins = position_bin_count(batch.sequences.shape[1])
+        offsets = batch_position_bins(batch) * len(BASES)
+        counts = np.bincount((batch_base_codes(batch) + offsets).ravel(),
+                             minlength=bins * len(BASES)).reshape(bins, len(BASES))
+        counts[:, BASES.index("N")] -= bin_positions(batch_padding(batch))
+        return counts
+
+    def finalize(self) -> Dict[str, Any]:
+        """Возвращает процентное содержание нуклеотидов по позициям."""
+        if not self.max_length:
+            return {self.result_key: None}
+
+        counts = self.counts[:self.bins]
+        # Как и прежде, доли A/T/G/C считаются от определённых нуклеотидов,
+        # а доля N — от всех оснований в позиции
+        acgt_totals = counts[:, :4].sum(axis=1)
+        all_totals = counts.sum(axis=1)
+        base_content_data = {'positions': self.positions()}
+        for base in ['A', 'T', 'G', 'C']:
+            column = counts[:, BASES.index(base)]
+            base_content_data[base] = np.divide(
+                column * 100, acgt_totals,
+                out=np.zeros(len(column)), where=acgt_totals > 0).tolist()
+        base_content_data['N'] = np.divide(
+            counts[:, BASES.index("N")] * 100, all_totals,
+            out=np.zeros(len(all_totals)), where=all_totals > 0).tolist()
+        return {self.result_key: base_content_data}
+
+    @classmethod
+    def create_figure(cls, data: Any, accent_color: str, partial: bool = False,
+                      profiler: Profiler = NULL_PROFILER) -> "Figure":
+        """Строит график нуклеотидного состава (см. create_figure_content)."""
+        from .fastq_plots import create_figure_content
+        return create_figure_content(data, accent_color, partial=partial, profiler=profiler)
@@ -0,0 +1,179 @@
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List
+from .fastq_plots import AnalysisCancelled, run_analysis
+from .parallel_analysis import default_workers
+from .results_cache import ResultsCache
+from .stats_accumulator import apply_metric_settings, metric_settings
+
+# Расширения FASTQ-файлов, отбираемых из каталогов
+FASTQ_EXTENSIONS = (".fastq", ".fq", ".fastq.gz", ".fq.gz")
+
+# Период проверки отмены и сообщений процессов-обработчиков (секунды)
+POLL_INTERVAL = 0.2
+
+# Очередь сообщений и событие отмены процесса-обработчика (задаются инициализатором пула)
+_status_queue = None
+_cancel_event = None
+
+
+def collect_fastq_files(paths: Iterable[str | Path]) -> List[Path]:
+    """
+    Собирает список FASTQ-файлов для анализа.
+
+    Файлы берутся как есть, из каталогов (включая вложенные) отбираются файлы
+    с расширениями FASTQ_EXTENSIONS. Повторы удаляются, порядок сохраняется.
+
+    Args:
+        paths (Iterable[str | Path]): Пути к файлам и каталогам.
+
+    Returns:
+        List[Path]: Пути к файлам.
+    """
+    files: Dict[Path, None] = {}
+    for path in map(Path, paths):
+        if path.is_dir():
+            found = (item for item in path.rglob("*")
+                     if item.is_file() and item.name.lower().endswith(FASTQ_EXTENSIONS))
+            files.update(dict.fromkeys(sorted(found)))
+        else:
+            files[path] = None
+    return list(files)
+
+
+def summarize_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Сокращает результаты анализа файла до сводки для таблицы и общих графиков.
+
+    Args:
+        result (Dict[str, Any]): Результаты run_analysis.
+
+    Returns:
+        Dict[str, Any]: Сводные показатели ('total_sequences', 'mean_length',
+            'min_length', 'max_length', 'mean_quality', 'q30_percent', 'gc_percent',
+            'percent_unique', 'max_adapter_percent'; None — показатель недоступен)
+            и кривые 'quality_curve' (среднее качество по позициям) и 'gc_curve'
+            (доля ридов по GC-составу, %).
+    """
+    lengths = result.get('length_distribution') or {'lengths': [], 'counts': []}
+    quality = result.get('mean_qualities_data')
+    quality_summary = result.get('quality_summary') or {}
+    gc = result.get('gc_content')
+    duplication = result.get('duplication')
+    adapters = result.get('adapter_content')
+
+    gc_curve = None
+    if gc is not None:
+        total = sum(gc['counts'])
+        gc_curve = {'percents': gc['percents'],
+                    'fractions': [count * 100 / total for count in gc['counts']]}
+
+    return {
+        'total_sequences': result['total_sequences'],
+        'mean_length': lengths.get('mean_length'),
+        'min_length': lengths['lengths'][0] if lengths['lengths'] else None,
+        'max_length': lengths['lengths'][-1] if lengths['lengths'] else None,
+        'mean_quality': quality_summary.get('mean_quality'),
+        'q30_percent': quality_summary['q30_fraction'] * 100 if 'q30_fraction' in quality_summary else None,
+        'gc_percent': gc['mean_gc'] if gc is not None else None,
+        'percent_unique': duplication['percent_unique'] if duplication is not None else None,
+        'max_adapter_percent': max((max(values, default=0.0) for values in adapters['adapters'].values()),
+                                   default=0.0) if adapters is not None else None,
+        'quality_curve': {'positions': quality['positions'], 'mean_qualities': quality['mean_qualities']}
+        if quality is not None else None,
+        'gc_curve': gc_curve
+    }
+
+
+def _init_batch_worker(status_queue, cancel_event, settings):
+    """
+    Инициализатор процесса-обработчика: сохраняет очередь сообщений и событие отмены
+    и устанавливает настройки модулей метрик основного процесса (см. metric_settings).
+    """
+    global _status_queue, _cancel_event
+    _status_queue = status_queue
+    _cancel_event = cancel_event
+    apply_metric_settings(settings)
+
+
+def _analyze_for_summary(index: int, file_path: Path, use_cache: bool) -> Dict[str, Any] | None:
+    """
+    Анализирует один файл набора в процессе-обработчике.
+
+    Полные результаты сохраняются в кэш, поэтому готовый файл затем открывается
+    в окне статистики без повторного чтения.
+
+    Returns:
+        Dict[str, Any] | None: Сводка (см. summarize_result) или None, если анализ отменён.
+    """
+    if _cancel_event is not None and _cancel_event.is_set():
+        return None
+    if _status_queue is not None:
+        _status_queue.put(index)
+    try:
+        result = run_analysis(file_path, cache=ResultsCache() if use_cache else None,
+                              cancel_event=_cancel_event)
+    except AnalysisCancelled:
+        return None
+    return summarize_result(result)
+
+
+def run_batch_analysis(files: List[str | Path],
+                       result_callback: Callable[[int, Dict[str, Any] | None, Exception | None], None],
+                       started_callback: Callable[[int], None] | None = None,
+                       cancel_event: threading.Event | None = None,
+                       workers: int | None = None,
+                       use_cache: bool = True):
+    """
+    Анализирует набор файлов в пуле из не более чем workers процессов.
+
+    Каждый файл анализируется целиком в одном процессе (см. run_analysis), а результаты
+    сообщаются по мере готовности, в порядке завершения. Отмена останавливает и файлы,
+    анализ которых уже начался; результаты готовых файлов сохраняются.
+
+    Args:
+        files (List[str | Path]): Пути к FASTQ-файлам.
+        result_callback (Callable): Вызывается для каждого завершённого файла с аргументами
+            (номер файла в files, сводка summarize_result или None, ошибка или None).
+        started_callback (Callable | None): Вызывается с номером файла, когда начинается его анализ.
+        cancel_event (threading.Event | None): Событие отмены.
+        workers (int | None): Количество процессов. None — число ядер.
+        use_cache (bool): Брать результаты из кэша и сохранять их в кэш.
+
+    Raises:
+        AnalysisCancelled: Если анализ был отменён через cancel_event.
+    """
+    if not files:
+        return
+    workers = max(1, min(workers or default_workers(), len(files)))
+    context = multiprocessing.get_context()
+    worker_cancel = context.Event()
+    status_queue = context.Queue()
+
+    def drain_started():
+        try:
+            while True:
+                index = status_queue.get_nowait()
+                if started_callback:
+                    started_callback(index)
+        except queue.Empty:
+            pass
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_batch_worker,
+                             initargs=(status_queue, worker_cancel, metric_settings())) as executor:
+        futures = {executor.submit(_analyze_for_summary, index, Path(path), use_cache): index
+                   for index, path in enumerate(files)}
+        pending = set(futures)
+        while pending:
+            if cancel_event is not None and cancel_event.is_set():
+                worker_cancel.set()
+                executor.shutdown(wait=True, cancel_futures=True)
+                raise AnalysisCancelled()
+            done, pending = wait(pending, timeout=POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            drain_started()
+            for future in done:
+                error = future.exception()
+                result_callback(futures[future], None if error else future.result(), error)
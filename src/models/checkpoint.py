@@ -0,0 +1,141 @@
+import os
+import time
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, Tuple
+import numpy as np
+from .gzip_index import AccessPoint
+from .results_cache import default_cache_dir, file_fingerprint
+from .stats_accumulator import StatsAccumulator
+
+# Период сохранения контрольных точек анализа по умолчанию (секунды)
+DEFAULT_CHECKPOINT_INTERVAL = 60.0
+# Сколько контрольных точек хранится (остальные, самые старые, удаляются при сохранении)
+MAX_CHECKPOINTS = 16
+# Контрольные точки старше этого срока (секунды) удаляются при сохранении
+MAX_CHECKPOINT_AGE = 7 * 24 * 3600
+
+
+def default_checkpoint_dir() -> Path:
+    """Возвращает каталог контрольных точек по умолчанию (подкаталог checkpoints каталога кэша)."""
+    return default_cache_dir() / "checkpoints"
+
+
+class CheckpointStore:
+    """
+    Контрольные точки долгого анализа на диске: состояние накопителя статистики и позиция
+    чтения (FastqReader.resume_position), с которой анализ можно продолжить после сбоя,
+    закрытия окна или остановки узла.
+
+    Для gzip вместе с позицией сохраняется точка доступа (до 32 КБ окна распаковки),
+    поэтому продолжение не требует распаковки файла с начала. Запись привязана к файлу
+    так же, как запись кэша (см. file_fingerprint): если файл изменился, она не используется.
+
+    Точки прерванных и не продолженных анализов остаются в каталоге, поэтому при каждом
+    сохранении удаляются точки старше MAX_CHECKPOINT_AGE и самые старые сверх MAX_CHECKPOINTS.
+
+    Attributes:
+        directory (Path): Каталог контрольных точек.
+    """
+
+    def __init__(self, directory: str | Path | None = None):
+        """
+        Инициализирует хранилище.
+
+        Args:
+            directory (str | Path | None): Каталог контрольных точек. None — каталог по умолчанию.
+        """
+        self.directory = Path(directory) if directory else default_checkpoint_dir()
+
+    def _entry_path(self, file_path: str | Path) -> Path:
+        """Возвращает путь к файлу контрольной точки для FASTQ-файла."""
+        return self.directory / f"{file_fingerprint(file_path)}.npz"
+
+    def save(self, file_path: str | Path, accumulator: StatsAccumulator, position: Dict[str, Any]):
+        """
+        Сохраняет контрольную точку, заменяя предыдущую.
+
+        Ошибки записи игнорируются: без контрольной точки анализ просто придётся начать заново.
+
+        Args:
+            file_path (str | Path): Путь к FASTQ-файлу.
+            accumulator (StatsAccumulator): Статистика по записям до позиции.
+            position (Dict[str, Any]): Позиция чтения (FastqReader.resume_position).
+        """
+        state = accumulator.get_state()
+        state['resume_offset'] = np.array(position['offset'], dtype=np.int64)
+        if 'point' in position:
+            point = position['point']
+            state['resume_chunk_end'] = np.array(position['chunk_end'], dtype=np.int64)
+            state['resume_point'] = np.array([point.uncompressed, point.compressed, point.bits], dtype=np.int64)
+            state['resume_window'] = np.frombuffer(point.window, dtype=np.uint8)
+
+        entry = self._entry_path(file_path)
+        # Пишем во временный файл и переименовываем, чтобы не оставить повреждённую запись
+        temporary = entry.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(temporary, "wb") as f:
+                np.savez_compressed(f, **state)
+            os.replace(temporary, entry)
+        except OSError:
+            temporary.unlink(missing_ok=True)
+            return
+
+        self._prune()
+
+    def _prune(self):
+        """Удаляет устаревшие контрольные точки и самые старые сверх MAX_CHECKPOINTS."""
+        entries = []
+        for entry in self.directory.glob("*.npz"):
+            try:
+                entries.append((entry.stat().st_mtime, entry))
+            except OSError:
+                continue
+
+        entries.sort(reverse=True)
+        oldest = time.time() - MAX_CHECKPOINT_AGE
+        for index, (mtime, entry) in enumerate(entries):
+            if index >= MAX_CHECKPOINTS or mtime < oldest:
+                try:
+                    entry.unlink()
+                except OSError:
+                    pass
+
+    def load(self, file_path: str | Path) -> Tuple[StatsAccumulator, Dict[str, Any]] | None:
+        """
+        Загружает контрольную точку файла.
+
+        Args:
+            file_path (str | Path): Путь к FASTQ-файлу.
+
+        Returns:
+            Tuple[StatsAccumulator, Dict[str, Any]] | None: Накопитель и позиция для аргумента
+                resume в FastqReader.read_batches или None, если контрольной точки нет
+                (или она повреждена).
+        """
+        try:
+            with np.load(self._entry_path(file_path)) as data:
+                state = dict(data)
+            position = {'offset': int(state.pop('resume_offset'))}
+            if 'resume_point' in state:
+                uncompressed, compressed, bits = state.pop('resume_point').tolist()
+                window = state.pop('resume_window').tobytes()
+                position['chunk_end'] = int(state.pop('resume_chunk_end'))
+                position['point'] = AccessPoint(uncompressed, compressed, bits, window)
+            accumulator = StatsAccumulator.from_state(state)
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            return None
+        return accumulator, position
+
+    def remove(self, file_path: str | Path):
+        """
+        Удаляет контрольную точку файла (после завершения анализа).
+
+        Args:
+            file_path (str | Path): Путь к FASTQ-файлу.
+        """
+        try:
+            self._entry_path(file_path).unlink(missing_ok=True)
+        except OSError:
+            pass
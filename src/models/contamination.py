@@ -0,0 +1,383 @@
+from pathlib import Path
+from typing import Any, Dict, List, Tuple, TYPE_CHECKING
+import numpy as np
+
+from .metric_module import (MetricModule, PositionalMetric, register_metric, batch_base_codes,
+                            batch_distinct_sequences, batch_position_bins, batch_sequence_text,
+                            position_bin_count, BASES)
+from .profiler import Profiler, NULL_PROFILER
+
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+    from .fastq_reader import FastqBatch
+
+# Длина k-мера, по которому ищутся адаптеры (как в FastQC)
+ADAPTER_KMER = 12
+
+# Библиотека адаптеров по умолчанию (список FastQC): название -> последовательность
+DEFAULT_ADAPTERS = {
+    "Illumina Universal Adapter": "AGATCGGAAGAG",
+    "Illumina Small RNA 3' Adapter": "TGGAATTCTCGG",
+    "Illumina Small RNA 5' Adapter": "GATCGTCGGACT",
+    "Nextera Transposase Sequence": "CTGTCTCTTATA",
+    "SOLID Small RNA Adapter": "CGCCTTGGCCGT",
+    "PolyA": "AAAAAAAAAAAA",
+    "PolyG": "GGGGGGGGGGGG",
+}
+
+# Количество счётчиков в сводке частых последовательностей по умолчанию
+DEFAULT_TOP_CAPACITY = 4096
+# Порог доли ридов, начиная с которого последовательность считается сверхпредставленной (%)
+OVERREPRESENTED_PERCENT = 0.1
+
+
+def load_adapters(file_path: str | Path) -> Dict[str, str]:
+    """
+    Читает библиотеку адаптеров в формате FastQC: «название<TAB>последовательность».
+
+    Пустые строки и строки, начинающиеся с '#', пропускаются.
+
+    Args:
+        file_path (str | Path): Путь к файлу библиотеки.
+
+    Returns:
+        Dict[str, str]: Название адаптера -> последовательность (прописными буквами).
+
+    Raises:
+        ValueError: Если строка не содержит последовательности, последовательность короче
+            ADAPTER_KMER или содержит символы, отличные от A, C, G, T.
+    """
+    adapters = {}
+    with open(file_path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            name, _, sequence = line.rpartition("\t")
+            name, sequence = name.strip(), sequence.strip().upper()
+            if not name:
+                raise ValueError(f"Строка {line_number}: ожидается «название<TAB>последовательность»")
+            if len(sequence) < ADAPTER_KMER or set(sequence) - set("ACGT"):
+                raise ValueError(f"Строка {line_number}: последовательность адаптера должна состоять "
+                                 f"из A, C, G, T и быть не короче {ADAPTER_KMER} нуклеотидов")
+            adapters[name] = sequence
+    return adapters
+
+
+def encode_kmer(sequence: str) -> int:
+    """Кодирует k-мер из A, C, G, T двумя битами на нуклеотид (индекс в BASES)."""
+    code = 0
+    for base in sequence:
+        code = (code << 2) | BASES.index(base)
+    return code
+
+
+def _sliding_windows(values: np.ndarray, k: int, combine) -> np.ndarray:
+    """
+    Сворачивает окна длины k по строкам матрицы удвоением окна.
+
+    Окна длины 2s получаются из двух окон длины s, поэтому нужно около log2(k) проходов
+    по матрице вместо k. combine(left, right, size) объединяет окно с окном длины size,
+    которое следует за ним.
+    """
+    windows = {1: values}
+    size = 1
+    while size * 2 <= k:
+        previous = windows[size]
+        windows[size * 2] = combine(previous[:, :-size], previous[:, size:], size)
+        size *= 2
+    result = windows[size]
+    for part in sorted(windows, reverse=True):
+        if size + part <= k:
+            result = combine(result[:, :-part], windows[part][:, size:], part)
+            size += part
+    return result
+
+
+def kmer_codes(codes: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Вычисляет коды k-меров (k ≤ 15), начинающихся в каждой позиции матрицы нуклеотидов.
+
+    Args:
+        codes (np.ndarray): Матрица индексов нуклеотидов (см. batch_base_codes).
+        k (int): Длина k-мера.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Коды int32 (см. encode_kmer) и маска k-меров,
+            содержащих N или нулевое дополнение (их коды недействительны).
+    """
+    kmers = _sliding_windows((codes & 3).astype(np.int32), k,
+                             lambda left, right, size: (left << (2 * size)) | right)
+    invalid = _sliding_windows(codes == BASES.index("N"), k,
+                               lambda left, right, size: left | right)
+    return kmers, invalid
+
+
+@register_metric
+class AdapterContent(PositionalMetric):
+    """
+    Накопленная доля ридов с адаптером по позициям (как Adapter Content в FastQC).
+
+    Адаптер ищется по первым ADAPTER_KMER нуклеотидам его последовательности. Для всех
+    позиций всех ридов пакета k-меры упаковываются в целочисленные коды (см. kmer_codes),
+    после чего кандидаты на совпадение со всеми адаптерами библиотеки отбираются одним
+    обращением к таблице по младшим 16 битам кода и проверяются точно — вместо отдельного
+    прохода str.find на каждый адаптер. Для каждого рида и адаптера учитывается первая
+    позиция совпадения.
+
+    Attributes:
+        adapters (Dict[str, str]): Библиотека адаптеров: название -> последовательность.
+            Задаётся для класса до анализа (см. load_adapters).
+        counts (np.ndarray): Матрица (интервал позиций × адаптер): число ридов, в которых
+            адаптер впервые найден в этом интервале.
+        total_reads (int): Количество учтённых ридов.
+    """
+
+    name = "adapter_content"
+    title = "Содержание адаптеров по позициям"
+    result_key = "adapter_content"
+    adapters: Dict[str, str] = DEFAULT_ADAPTERS
+    setting_attributes = ("adapters",)
+
+    def __init__(self):
+        """Инициализирует пустую матрицу и коды k-меров адаптеров."""
+        self.columns = len(self.adapters)
+        super().__init__()
+        self.total_reads = 0
+        codes = np.array([encode_kmer(sequence[:ADAPTER_KMER]) for sequence in self.adapters.values()],
+                         dtype=np.int32)
+        self._order = np.argsort(codes, kind="stable")
+        self._sorted_codes = codes[self._order]
+        # Фильтр кандидатов: таблица из 2^16 флагов по младшим битам кодов адаптеров
+        self._prefilter = np.zeros(1 << 16, dtype=bool)
+        self._prefilter[codes & 0xFFFF] = True
+
+    def update_batch(self, batch: "FastqBatch"):
+        """Добавляет первые позиции адаптеров в ридах пакета."""
+        self.total_reads += len(batch)
+        if batch.sequences.shape[1] >= ADAPTER_KMER:
+            super().update_batch(batch)
+
+    def _count(self, batch: "FastqBatch") -> np.ndarray:
+        """Находит в ридах пакета k-меры адаптеров и считает первые позиции совпадений."""
+        codes = batch_base_codes(batch)
+        bins = position_bin_count(codes.shape[1])
+        kmers, invalid = kmer_codes(codes, ADAPTER_KMER)
+
+        rows, positions = np.nonzero(self._prefilter.take(kmers & 0xFFFF))
+        candidates = kmers[rows, positions]
+        index = np.minimum(np.searchsorted(self._sorted_codes, candidates), len(self._sorted_codes) - 1)
+        matched = (self._sorted_codes[index] == candidates) & ~invalid[rows, positions]
+        rows, positions = rows[matched], positions[matched]
+        adapters = self._order[index[matched]]
+
+        # np.nonzero перечисляет совпадения по строкам слева направо, поэтому первое
+        # вхождение пары (рид, адаптер) — самая левая позиция
+        pairs = rows.astype(np.int64) * self.columns + adapters
+        _, first = np.unique(pairs, return_index=True)
+        position_bins = batch_position_bins(batch)[positions[first]]
+        return np.bincount(position_bins * self.columns + adapters[first],
+                           minlength=bins * self.columns).reshape(bins, self.columns)
+
+    def merge(self, other: "AdapterContent"):
+        """Складывает матрицы и количество ридов."""
+        super().merge(other)
+        self.total_reads += other.total_reads
+
+    def finalize(self) -> Dict[str, Any]:
+        """Возвращает накопленный процент ридов с каждым адаптером до позиции включительно."""
+        if not self.total_reads or not self.max_length:
+            return {self.result_key: None}
+        cumulative = np.cumsum(self.counts[:self.bins], axis=0) * 100 / self.total_reads
+        return {self.result_key: {
+            'positions': self.positions(),
+            'adapters': {name: cumulative[:, index].tolist()
+                         for index, name in enumerate(self.adapters)}
+        }}
+
+    def get_state(self) -> Dict[str, np.ndarray]:
+        """Возвращает матрицу и количество ридов."""
+        state = super().get_state()
+        state['total_reads'] = np.array(self.total_reads, dtype=np.int64)
+        return state
+
+    def set_state(self, state: Dict[str, np.ndarray]):
+        """Восстанавливает матрицу и количество ридов."""
+        super().set_state(state)
+        self.total_reads = int(state['total_reads'])
+
+    @classmethod
+    def settings(cls) -> str:
+        """Возвращает библиотеку адаптеров."""
+        return ";".join(f"{name}={sequence}" for name, sequence in cls.adapters.items())
+
+    @classmethod
+    def create_figure(cls, data: Any, accent_color: str, partial: bool = False,
+                      profiler: Profiler = NULL_PROFILER) -> "Figure":
+        """Строит накопленную долю ридов с адаптерами по позициям."""
+        from .fastq_plots import create_figure_adapter_content
+        return create_figure_adapter_content(data, accent_color, partial=partial, profiler=profiler)
+
+
+@register_metric
+class OverrepresentedSequences(MetricModule):
+    """
+    Сверхпредставленные последовательности (как Overrepresented sequences в FastQC).
+
+    Частые последовательности отслеживаются сводкой Мисры–Гриса из capacity счётчиков
+    (двойственна Space-Saving, но сливается векторно): различные последовательности пакета
+    с точными числами ридов добавляются к сводке, и если счётчиков становится больше
+    capacity, из всех вычитается (capacity + 1)-е по величине значение. Оценка числа
+    ридов занижена не более чем на error ≤ total_reads / (capacity + 1): при capacity = 4096
+    все последовательности с долей от 0.1% остаются в сводке, а их доля занижена не более
+    чем на 0.025%. Текст хранится только для последовательностей, находящихся в сводке.
+
+    Сводка, в отличие от счётчиков остальных модулей, сливается не точно: при слиянии
+    тоже вычитается отсечка, поэтому оценки и error зависят от того, как риды разделены
+    между накопителями и в каком порядке накопители сливаются. Граница занижения
+    total_reads / (capacity + 1) при этом сохраняется: параллельный анализ даёт оценки
+    с той же гарантией точности, что и однопроцессный, но не обязательно те же числа
+    (а для последовательностей с долей около порога — и не тот же их набор).
+
+    Attributes:
+        capacity (int): Количество счётчиков. Задаётся для класса до анализа.
+        hashes (np.ndarray): Отсортированные хэши отслеживаемых последовательностей.
+        counts (np.ndarray): Оценки числа ридов.
+        sequences (Dict[int, str]): Хэш -> последовательность.
+        error (int): Суммарная величина вычитаний — граница занижения оценок.
+        total_reads (int): Количество учтённых ридов.
+    """
+
+    name = "overrepresented"
+    title = "Сверхпредставленные последовательности"
+    result_key = "overrepresented_sequences"
+    view = "table"
+    capacity: int = DEFAULT_TOP_CAPACITY
+
+    def __init__(self):
+        """Инициализирует пустую сводку."""
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self.counts = np.empty(0, dtype=np.int64)
+        self.sequences: Dict[int, str] = {}
+        self.error = 0
+        self.total_reads = 0
+
+    def _add(self, hashes: np.ndarray, counts: np.ndarray) -> np.ndarray:
+        """
+        Добавляет счётчики к сводке и сокращает её до capacity счётчиков.
+
+        Returns:
+            np.ndarray: Маска добавленных хэшей, оставшихся в сводке.
+        """
+        merged, inverse = np.unique(np.concatenate((self.hashes, hashes)), return_inverse=True)
+        totals = np.bincount(inverse, weights=np.concatenate((self.counts, counts)),
+                             minlength=len(merged)).astype(np.int64)
+        if len(merged) > self.capacity:
+            cutoff = np.partition(totals, len(totals) - self.capacity - 1)[len(totals) - self.capacity - 1]
+            totals -= cutoff
+            self.error += int(cutoff)
+            keep = totals > 0
+            merged, totals = merged[keep], totals[keep]
+
+        self.hashes, self.counts = merged, totals
+        self.sequences = {key: self.sequences[key] for key in self.hashes.tolist() if key in self.sequences}
+        return np.isin(hashes, self.hashes)
+
+    def update_batch(self, batch: "FastqBatch"):
+        """Добавляет различные последовательности пакета к сводке."""
+        if len(batch) == 0:
+            return
+        self.total_reads += len(batch)
+        hashes, counts, first = batch_distinct_sequences(batch)
+        kept = self._add(hashes, counts)
+        for key, row in zip(hashes[kept].tolist(), first[kept].tolist()):
+            if key not in self.sequences:
+                self.sequences[key] = batch_sequence_text(batch, row)
+
+    def merge(self, other: "OverrepresentedSequences"):
+        """
+        Сливает сводки; границы занижения складываются.
+
+        Результат зависит от порядка слияния (см. описание класса).
+        """
+        self.total_reads += other.total_reads
+        self.error += other.error
+        sequences = {**other.sequences, **self.sequences}
+        self._add(other.hashes, other.counts)
+        self.sequences = {key: sequences[key] for key in self.hashes.tolist()}
+
+    def finalize(self) -> Dict[str, Any]:
+        """
+        Возвращает последовательности с долей ридов не ниже OVERREPRESENTED_PERCENT.
+
+        Для каждой указывается оценка числа ридов, процент и возможный источник —
+        адаптер библиотеки, с которым последовательность имеет общий k-мер.
+        """
+        if not self.total_reads:
+            return {self.result_key: None}
+        order = np.argsort(self.counts, kind="stable")[::-1]
+        threshold = self.total_reads * OVERREPRESENTED_PERCENT / 100
+        rows = []
+        for index in order:
+            count = int(self.counts[index])
+            if count < threshold:
+                break
+            sequence = self.sequences[int(self.hashes[index])]
+            rows.append({
+                'sequence': sequence,
+                'count': count,
+                'percent': count * 100 / self.total_reads,
+                'source': possible_source(sequence)
+            })
+        return {self.result_key: {
+            'sequences': rows,
+            'total_reads': self.total_reads,
+            'max_error_percent': self.error * 100 / self.total_reads
+        }}
+
+    def get_state(self) -> Dict[str, np.ndarray]:
+        """Возвращает сводку вместе с текстом последовательностей."""
+        return {
+            'hashes': self.hashes,
+            'counts': self.counts,
+            'sequences': np.array([self.sequences[key] for key in self.hashes.tolist()], dtype=str),
+            'error': np.array(self.error, dtype=np.int64),
+            'total_reads': np.array(self.total_reads, dtype=np.int64)
+        }
+
+    def set_state(self, state: Dict[str, np.ndarray]):
+        """Восстанавливает сводку."""
+        self.hashes = np.array(state['hashes'], dtype=np.uint64)
+        self.counts = np.array(state['counts'], dtype=np.int64)
+        self.sequences = dict(zip(self.hashes.tolist(), np.asarray(state['sequences']).tolist()))
+        self.error = int(state['error'])
+        self.total_reads = int(state['total_reads'])
+
+    @classmethod
+    def settings(cls) -> str:
+        """Возвращает количество счётчиков сводки."""
+        return f"capacity={cls.capacity}"
+
+    @classmethod
+    def create_table(cls, data: Any) -> Tuple[List[str], List[Tuple[Any, ...]]]:
+        """Формирует таблицу сверхпредставленных последовательностей."""
+        headings = ["Последовательность", "Количество", "Процент", "Возможный источник"]
+        if not data:
+            return headings, []
+        return headings, [(row['sequence'], row['count'], f"{row['percent']:.3f}", row['source'])
+                          for row in data['sequences']]
+
+
+def possible_source(sequence: str) -> str:
+    """
+    Определяет возможный источник последовательности по библиотеке адаптеров.
+
+    Returns:
+        str: Названия адаптеров, имеющих с последовательностью общий k-мер длины
+            ADAPTER_KMER, или "Нет совпадений".
+    """
+    kmers = {sequence[i:i + ADAPTER_KMER] for i in range(len(sequence) - ADAPTER_KMER + 1)}
+    matches = [name for name, adapter in AdapterContent.adapters.items()
+               if any(adapter[i:i + ADAPTER_KMER] in kmers
+                      for i in range(len(adapter) - ADAPTER_KMER + 1))]
+    return ", ".join(matches) or "Нет совпадений"
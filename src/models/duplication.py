@@ -0,0 +1,166 @@
+from typing import Any, Dict, TYPE_CHECKING
+import numpy as np
+
+from .metric_module import MetricModule, register_metric, batch_distinct_sequences
+from .profiler import Profiler, NULL_PROFILER
+
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+    from .fastq_reader import FastqBatch
+
+# Ограничение памяти на таблицу выборки по умолчанию (байты)
+DEFAULT_MEMORY_LIMIT = 16 * 1024 * 1024
+# Байтов на одну последовательность в таблице: хэш uint64 и счётчик int64
+BYTES_PER_SEQUENCE = 16
+
+# Нижние границы уровней дупликации и их подписи (уровни FastQC)
+LEVEL_EDGES = np.array([1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 50, 100, 500, 1000, 5000, 10000])
+LEVEL_LABELS = ["1", "2", "3", "4", "5", "6", "7", "8", "9",
+                ">10", ">50", ">100", ">500", ">1k", ">5k", ">10k"]
+
+
+@register_metric
+class SequenceDuplication(MetricModule):
+    """
+    Оценка уровня дупликации последовательностей в ограниченной памяти.
+
+    Хранить все различные последовательности нельзя: на сотнях миллионов ридов словарь
+    занял бы десятки гигабайт. Вместо этого используется выборка по хэшу: учитываются
+    только последовательности, хэш которых меньше порога 2^(64 - level), и для каждой
+    из них точно считается число ридов. Поскольку решение определяется хэшем, каждая
+    отобранная последовательность учитывается со всеми своими вхождениями. Когда таблица
+    превышает ограничение памяти, порог уменьшается вдвое, и из таблицы удаляются
+    последовательности выше нового порога. Отобранные последовательности — равномерная
+    случайная выборка различных последовательностей с долей 2^-level, поэтому число
+    различных последовательностей и число ридов на каждом уровне дупликации оцениваются
+    умножением на 2^level. Пока выборка не понадобилась (level = 0), результаты точные.
+
+    Attributes:
+        memory_limit (int): Ограничение памяти на таблицу выборки в байтах (около
+            memory_limit / 16 последовательностей). Задаётся для класса до анализа; в процессы
+            параллельного анализа передаётся явно (см. setting_attributes) и действует в каждом
+            из них отдельно.
+        hashes (np.ndarray): Отсортированные хэши отобранных последовательностей.
+        counts (np.ndarray): Количество ридов для каждого хэша.
+        level (int): Уровень выборки: отбирается доля 2^-level различных последовательностей.
+        total_reads (int): Количество всех учтённых ридов (не только отобранных).
+    """
+
+    name = "duplication"
+    title = "Уровень дупликации последовательностей"
+    result_key = "duplication"
+    memory_limit: int = DEFAULT_MEMORY_LIMIT
+    setting_attributes = ("memory_limit",)
+
+    def __init__(self):
+        """Инициализирует пустую таблицу выборки."""
+        self.capacity = max(1, self.memory_limit // BYTES_PER_SEQUENCE)
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self.counts = np.empty(0, dtype=np.int64)
+        self.level = 0
+        self.total_reads = 0
+
+    def _sampled(self, hashes: np.ndarray) -> np.ndarray:
+        """Возвращает маску хэшей, попадающих в выборку текущего уровня."""
+        if self.level == 0:
+            return np.ones(len(hashes), dtype=bool)
+        return hashes < np.uint64(1 << (64 - self.level))
+
+    def _shrink(self):
+        """Уменьшает порог выборки, пока таблица не уложится в ограничение памяти."""
+        while len(self.hashes) > self.capacity:
+            self.level += 1
+            keep = self._sampled(self.hashes)
+            self.hashes = self.hashes[keep]
+            self.counts = self.counts[keep]
+
+    def update_batch(self, batch: "FastqBatch"):
+        """Добавляет в таблицу отобранные последовательности пакета."""
+        if len(batch) == 0:
+            return
+        self.total_reads += len(batch)
+        hashes, counts, _ = batch_distinct_sequences(batch)
+        sampled = self._sampled(hashes)
+        hashes, counts = hashes[sampled], counts[sampled]
+
+        index = np.searchsorted(self.hashes, hashes)
+        found = index < len(self.hashes)
+        found[found] = self.hashes[index[found]] == hashes[found]
+        self.counts[index[found]] += counts[found]
+
+        new = ~found
+        if new.any():
+            self.hashes = np.insert(self.hashes, index[new], hashes[new])
+            self.counts = np.insert(self.counts, index[new], counts[new])
+            self._shrink()
+
+    def merge(self, other: "SequenceDuplication"):
+        """
+        Объединяет таблицы выборки.
+
+        Общим становится меньший из порогов: каждая таблица содержит все последовательности
+        ниже своего порога, поэтому объединение после отсечения точное.
+        """
+        self.level = max(self.level, other.level)
+        self.total_reads += other.total_reads
+        hashes = np.concatenate((self.hashes, other.hashes))
+        counts = np.concatenate((self.counts, other.counts))
+        keep = self._sampled(hashes)
+        self.hashes, inverse = np.unique(hashes[keep], return_inverse=True)
+        self.counts = np.bincount(inverse, weights=counts[keep],
+                                  minlength=len(self.hashes)).astype(np.int64)
+        self._shrink()
+
+    def finalize(self) -> Dict[str, Any]:
+        """
+        Возвращает распределение уровней дупликации и долю уникальных ридов.
+
+        'percent_unique' — доля ридов, которая останется после удаления дупликатов
+        (как Total Deduplicated Percentage в FastQC). Доли по уровням считаются от
+        различных последовательностей ('percent_of_deduplicated') и от всех ридов
+        ('percent_of_total'). При выборке доли от всех ридов — несмещённые оценки, и их
+        сумма может отличаться от 100%: редкие в числе различных, но частые в ридах
+        последовательности могут не попасть в выборку.
+        """
+        if self.total_reads == 0 or len(self.counts) == 0:
+            return {self.result_key: None}
+
+        scale = 2 ** self.level
+        levels = np.searchsorted(LEVEL_EDGES, self.counts, side='right') - 1
+        sequences = np.bincount(levels, minlength=len(LEVEL_EDGES))
+        reads = np.bincount(levels, weights=self.counts, minlength=len(LEVEL_EDGES)) * scale
+        distinct = min(len(self.counts) * scale, self.total_reads)
+        return {self.result_key: {
+            'levels': LEVEL_LABELS,
+            'percent_of_deduplicated': (sequences * 100 / len(self.counts)).tolist(),
+            'percent_of_total': np.minimum(reads * 100 / self.total_reads, 100).tolist(),
+            'percent_unique': distinct * 100 / self.total_reads,
+            'estimated_distinct': distinct,
+            'sample_fraction': 1 / scale
+        }}
+
+    def get_state(self) -> Dict[str, np.ndarray]:
+        """Возвращает таблицу выборки, её уровень и количество ридов."""
+        return {'hashes': self.hashes, 'counts': self.counts,
+                'level': np.array(self.level, dtype=np.int64),
+                'total_reads': np.array(self.total_reads, dtype=np.int64)}
+
+    def set_state(self, state: Dict[str, np.ndarray]):
+        """Восстанавливает таблицу выборки (с учётом текущего ограничения памяти)."""
+        self.hashes = np.array(state['hashes'], dtype=np.uint64)
+        self.counts = np.array(state['counts'], dtype=np.int64)
+        self.level = int(state['level'])
+        self.total_reads = int(state['total_reads'])
+        self._shrink()
+
+    @classmethod
+    def settings(cls) -> str:
+        """Возвращает ограничение памяти: от него зависит точность оценки."""
+        return f"memory_limit={cls.memory_limit}"
+
+    @classmethod
+    def create_figure(cls, data: Any, accent_color: str, partial: bool = False,
+                      profiler: Profiler = NULL_PROFILER) -> "Figure":
+        """Строит распределение уровней дупликации."""
+        from .fastq_plots import create_figure_duplication
+        return create_figure_duplication(data, accent_color, partial=partial, profiler=profiler)
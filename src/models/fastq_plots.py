@@ -1,99 +1,321 @@
+import functools
+import threading
+import time
 from pathlib import Path
-from typing import Dict, List, Any
-import matplotlib.pyplot as plt
+from typing import Callable, Dict, List, Any, TYPE_CHECKING
 import numpy as np
-from .fastq_reader import FastqReader
+from .fastq_reader import FastqReader, DEFAULT_BATCH_SIZE, is_stream
+from .stats_accumulator import StatsAccumulator
+from .parallel_analysis import run_sharded_analysis
+from .results_cache import ResultsCache
+from .record_index import RecordIndex
+from .checkpoint import CheckpointStore, DEFAULT_CHECKPOINT_INTERVAL
+from .gzip_parallel import detect_gzip_layout, LAYOUT_BGZF, LAYOUT_MULTI_MEMBER
+from .profiler import Profiler, NULL_PROFILER
+from .plot_decimation import DecimatedLine
+
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+
+# matplotlib загружается при построении первого графика, а не при импорте модуля:
+# это заметно ускоряет запуск окна выбора файла и консольного режима без графиков
+_style_applied = False
+
+# Количество ридов в быстром предварительном анализе
+DEFAULT_PREVIEW_READS = 20000
+# Количество точек несжатого файла, из которых берутся риды для предварительного анализа
+DEFAULT_SAMPLE_POINTS = 16
+# Период выдачи промежуточных результатов полного анализа (секунды)
+DEFAULT_SNAPSHOT_INTERVAL = 5.0
+# Гистограмма длин строится в логарифмическом масштабе, если длины различаются больше чем
+# в LOG_LENGTH_RATIO раз, а максимальная длина не меньше LOG_LENGTH_MIN (длинные риды)
+LOG_LENGTH_RATIO = 10
+LOG_LENGTH_MIN = 1000
+# Количество столбцов гистограммы длин
+LENGTH_HISTOGRAM_BINS = 50
+
+
+class AnalysisCancelled(Exception):
+    """Исключение, сигнализирующее об отмене анализа пользователем."""
+
+
+def run_analysis(file_path: str | Path, workers: int = 1,
+                 progress_callback: Callable[[int, int, int], None] | None = None,
+                 cancel_event: threading.Event | None = None,
+                 cache: ResultsCache | None = None,
+                 snapshot_callback: Callable[[Dict[str, Any]], None] | None = None,
+                 snapshot_interval: float = DEFAULT_SNAPSHOT_INTERVAL,
+                 profiler: Profiler | None = None,
+                 checkpoints: CheckpointStore | None = None,
+                 checkpoint_interval: float = DEFAULT_CHECKPOINT_INTERVAL) -> Dict[str, Any]:
+    """
+    Анализирует FASTQ-файл и собирает ключевые метрики качества последовательностей.
+
+    Риды читаются пакетами (FastqReader.read_batches), а статистика накапливается векторно
+    в гистограммах фиксированного размера (см. StatsAccumulator), поэтому потребление
+    памяти не растёт с количеством ридов.
 
-plt.style.use('default')
+    При workers > 1 несжатый файл делится на фрагменты по границам записей, которые
+    анализируются в пуле процессов; результат совпадает с однопроцессным, кроме оценок
+    сверхпредставленных последовательностей (см. run_sharded_analysis). Если для файла
+    построен индекс записей (см. RecordIndex), фрагменты берутся из него, и параллельно
+    анализируются также gzip-файлы.
 
+    Вместо файла можно передать поток — '-' (стандартный ввод) или именованный канал:
+    он анализируется за один проход без временных файлов, сжатие gzip определяется
+    по сигнатуре. Для потоков не используются кэш и параллельный анализ, а размер
+    в progress_callback равен 0; следить за анализом можно через snapshot_callback.
 
-def run_analysis(file_path: str | Path) -> Dict[str, Any]:
+    С checkpoints последовательный анализ (gzip или workers=1) раз в checkpoint_interval
+    секунд сохраняет контрольную точку. Если для файла есть контрольная точка от прерванного
+    анализа, он продолжается с неё, и результат совпадает с результатом непрерывного анализа.
+    gzip в этом режиме распаковывается в один поток (см. FastqReader, resumable), поэтому
+    для BGZF и многочленных gzip-файлов, которые распаковываются в несколько потоков,
+    контрольные точки не сохраняются. Параллельный анализ и потоки их тоже не сохраняют.
+
+    Args:
+        file_path (str | Path): Путь к FASTQ-файлу или '-' для стандартного ввода.
+        workers (int): Количество процессов для параллельного анализа несжатых файлов
+            (и gzip-файлов с индексом записей).
+        progress_callback (Callable | None): Вызывается по мере чтения с аргументами
+            (обработано байтов файла, размер файла, обработано ридов). Для gzip учитываются
+            сжатые байты.
+        cancel_event (threading.Event | None): Событие отмены, проверяется после каждого пакета.
+        cache (ResultsCache | None): Кэш результатов. Если файл уже анализировался и не
+            изменился, результаты берутся из кэша без чтения файла.
+        snapshot_callback (Callable | None): Получает промежуточные результаты (с ключом
+            'partial': True) не чаще одного раза в snapshot_interval секунд.
+        snapshot_interval (float): Период выдачи промежуточных результатов в секундах.
+        profiler (Profiler | None): Сборщик времени этапов. None — создаётся новый.
+        checkpoints (CheckpointStore | None): Хранилище контрольных точек. Контрольная точка
+            удаляется после успешного завершения анализа и сохраняется при отмене и ошибках.
+        checkpoint_interval (float): Период сохранения контрольных точек в секундах.
+
+    Returns:
+        Dict[str, Any]: Словарь с собранными данными для построения графиков
+            ('partial': False — результаты по всему файлу) и замерами этапов
+            в 'diagnostics' (см. Profiler.report).
+
+    Raises:
+        AnalysisCancelled: Если анализ был отменён через cancel_event.
     """
-    Анализирует FASTQ-файл и собирает ключевые метрики качества последовательностей.
+    file_path = Path(file_path)
+    streamed = is_stream(file_path)
+    if not streamed:
+        if not file_path.exists():
+            raise FileNotFoundError(f"Файл не найден: {file_path}")
+        if file_path.stat().st_size == 0:
+            raise RuntimeError("Файл пуст.")
+    else:
+        # Поток нельзя идентифицировать по размеру и времени изменения
+        cache = None
+        checkpoints = None
+
+    if profiler is None:
+        profiler = Profiler()
+
+    if cache is not None:
+        with profiler.stage("cache"):
+            accumulator = cache.get(file_path)
+        if accumulator is not None:
+            return _make_result(accumulator, partial=False, profiler=profiler)
+
+    last_snapshot = time.monotonic()
+
+    def maybe_snapshot(current: StatsAccumulator):
+        nonlocal last_snapshot
+        if snapshot_callback and time.monotonic() - last_snapshot >= snapshot_interval:
+            snapshot_callback(_make_result(current, partial=True, profiler=profiler))
+            last_snapshot = time.monotonic()
+
+    if (checkpoints is not None and FastqReader(file_path).compressed
+            and detect_gzip_layout(file_path) in (LAYOUT_BGZF, LAYOUT_MULTI_MEMBER)):
+        # Продолжить можно только однопоточную распаковку: не меняем на неё многопоточную
+        checkpoints = None
+    reader = FastqReader(file_path, profiler=profiler, resumable=checkpoints is not None)
+    index = None if streamed or workers <= 1 else RecordIndex.load(file_path)
+    if workers > 1 and not streamed and (not reader.compressed or index is not None):
+        with profiler.stage("shards"):
+            accumulator = run_sharded_analysis(file_path, workers, progress_callback, cancel_event,
+                                               merge_callback=maybe_snapshot, profiler=profiler,
+                                               index=index)
+        if accumulator is None:
+            raise AnalysisCancelled()
+    else:
+        accumulator = StatsAccumulator()
+        resume = None
+        if checkpoints is not None:
+            with profiler.stage("checkpoint"):
+                saved = checkpoints.load(file_path)
+            if saved is not None:
+                accumulator, resume = saved
+        last_checkpoint = time.monotonic()
+        window = None
+        with reader:
+            total_bytes = reader.total_bytes
+            for batch in reader.read_batches(resume=resume):
+                if cancel_event is not None and cancel_event.is_set():
+                    raise AnalysisCancelled()
+                # Контрольная точка сохраняется только перед первым пакетом окна чтения:
+                # с начала окна ридер может воспроизвести те же пакеты
+                if checkpoints is not None and reader.resume_position is not window:
+                    window = reader.resume_position
+                    if window is not None and time.monotonic() - last_checkpoint >= checkpoint_interval:
+                        with profiler.stage("checkpoint"):
+                            checkpoints.save(file_path, accumulator, window)
+                        last_checkpoint = time.monotonic()
+                with profiler.stage("accumulate", reads=len(batch)):
+                    accumulator.update_batch(batch)
+                if progress_callback:
+                    progress_callback(reader.bytes_consumed, total_bytes, accumulator.total_sequences)
+                maybe_snapshot(accumulator)
+
+    if accumulator.total_sequences == 0:
+        raise RuntimeError("В файле не найдено действительных последовательностей.")
+
+    if cache is not None:
+        with profiler.stage("cache"):
+            cache.put(file_path, accumulator)
+    if checkpoints is not None:
+        checkpoints.remove(file_path)
+
+    return _make_result(accumulator, partial=False, profiler=profiler)
+
+
+def run_preview_analysis(file_path: str | Path, max_reads: int = DEFAULT_PREVIEW_READS,
+                         sample_points: int = DEFAULT_SAMPLE_POINTS,
+                         profiler: Profiler = NULL_PROFILER) -> Dict[str, Any]:
+    """
+    Быстро оценивает метрики по выборке ридов.
+
+    Для несжатых файлов риды берутся равными порциями из sample_points точек по всему файлу
+    (с переходом к границе записи), для сжатых — с начала файла. Если для файла построен
+    индекс записей (см. RecordIndex), точки выборки берутся из него, в том числе для gzip.
+    Потоки не поддерживаются: выборка израсходовала бы данные, нужные для полного анализа.
 
     Args:
         file_path (str | Path): Путь к FASTQ-файлу.
+        max_reads (int): Примерное количество ридов в выборке.
+        sample_points (int): Количество точек выборки в несжатом файле.
+        profiler (Profiler): Сборщик времени этапов.
 
     Returns:
-        Dict[str, Any]: Словарь с собранными данными для построения графиков.
+        Dict[str, Any]: Словарь того же формата, что и run_analysis, с ключом 'partial': True.
+
+    Raises:
+        ValueError: Если file_path — поток (см. is_stream).
     """
     file_path = Path(file_path)
+    if is_stream(file_path):
+        raise ValueError("Предварительный анализ потока не поддерживается")
     if not file_path.exists():
         raise FileNotFoundError(f"Файл не найден: {file_path}")
-    if file_path.stat().st_size == 0:
-        raise RuntimeError("Файл пуст.")
-
-    sequence_lengths: List[int] = []
-    quality_per_position: Dict[int, List[int]] = {}
-    base_content_per_position: Dict[int, Dict[str, int]] = {}  # pos -> {A: N, T: N, ...}
-
-    total_sequences = 0
-
-    with FastqReader(file_path) as reader:
-        for record in reader.read():
-            seq = record.sequence
-            qual = record.quality
-            seq_len = len(seq)
-
-            total_sequences += 1
-            sequence_lengths.append(seq_len)
-
-            # Сбор качества по позициям
-            for i, q in enumerate(qual):
-                if i not in quality_per_position:
-                    quality_per_position[i] = []
-                quality_per_position[i].append(q)
-
-            # Сбор содержания оснований по позициям
-            for i, base in enumerate(seq):
-                if i not in base_content_per_position:
-                    base_content_per_position[i] = {"A": 0, "T": 0, "G": 0, "C": 0}
-                if base in "ATGC":
-                    base_content_per_position[i][base] += 1
-
-    if total_sequences == 0:
+
+    index = RecordIndex.load(file_path)
+    reader = FastqReader(file_path, profiler=profiler, index=index)
+    if index is not None:
+        ranges = index.record_ranges(sample_points)
+    elif reader.compressed:
+        ranges = [(0, None)]
+    else:
+        size = file_path.stat().st_size
+        starts = sorted({reader.align_to_record(size * i // sample_points) for i in range(sample_points)})
+        ranges = list(zip(starts, starts[1:] + [size]))
+
+    reads_per_range = max(1, max_reads // len(ranges))
+    accumulator = StatsAccumulator()
+    for start, end in ranges:
+        taken = 0
+        batches = reader.read_batches(batch_size=min(reads_per_range, DEFAULT_BATCH_SIZE), start=start, end=end)
+        try:
+            for batch in batches:
+                with profiler.stage("accumulate", reads=len(batch)):
+                    accumulator.update_batch(batch)
+                taken += len(batch)
+                if taken >= reads_per_range:
+                    break
+        finally:
+            batches.close()
+
+    if accumulator.total_sequences == 0:
         raise RuntimeError("В файле не найдено действительных последовательностей.")
 
-    # 1. Расчет среднего качества
-    mean_qualities_data = None
-    if quality_per_position:
-        positions = sorted(quality_per_position.keys())
-        mean_qualities_data = {
-            'positions': positions,
-            'mean_qualities': [np.mean(quality_per_position[p]) for p in positions]
-        }
-
-    # 2. Расчет процентного содержания нуклеотидов
-    base_content_data = None
-    if base_content_per_position:
-        positions = sorted(base_content_per_position.keys())
-        base_content_data = {'A': [], 'T': [], 'G': [], 'C': [], 'positions': positions}
-
-        for p in positions:
-            counts = base_content_per_position[p]
-            total_at_pos = sum(counts.values())
-
-            if total_at_pos > 0:
-                for base in ['A', 'T', 'G', 'C']:
-                    base_content_data[base].append(counts.get(base, 0) / total_at_pos * 100)
-            else:
-                for base in ['A', 'T', 'G', 'C']:
-                    base_content_data[base].append(0)
-
-    return {
-        'sequence_lengths': sequence_lengths,
-        'mean_qualities_data': mean_qualities_data,
-        'base_content_data': base_content_data
-    }
-
-
-def create_figure_length(data: List[int], accent_color: str) -> plt.Figure:
-    """Строит график распределения длин последовательностей."""
-    fig, ax = plt.subplots(figsize=(6, 4), dpi=100)
-
-    if data:
-        bins = min(50, len(set(data))) if len(data) > 1 else 1
-        ax.hist(data, bins=bins,
+    return _make_result(accumulator, partial=True, profiler=profiler)
+
+
+def _make_result(accumulator: StatsAccumulator, partial: bool,
+                 profiler: Profiler = NULL_PROFILER) -> Dict[str, Any]:
+    """
+    Формирует словарь результатов с признаком предварительных (partial) данных.
+
+    Расчёт средних и квантилей по позициям замеряется как этап aggregate; в 'diagnostics'
+    попадают замеры, накопленные к этому моменту.
+    """
+    with profiler.stage("aggregate"):
+        result = accumulator.to_result()
+    result['partial'] = partial
+    result['diagnostics'] = profiler.report()
+    return result
+
+
+def _profiled(stage: str):
+    """
+    Декоратор функций построения графиков: добавляет аргумент profiler и замеряет
+    построение фигуры как этап stage.
+    """
+    def decorator(create_figure):
+        @functools.wraps(create_figure)
+        def wrapper(*args, profiler: Profiler = NULL_PROFILER, **kwargs):
+            with profiler.stage(stage):
+                return create_figure(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _new_figure() -> "Figure":
+    """
+    Создает фигуру без регистрации в pyplot.
+
+    Такие фигуры не накапливаются в глобальном состоянии pyplot, освобождаются сборщиком
+    мусора вместе с последней ссылкой и могут строиться вне главного потока Tk.
+    """
+    global _style_applied
+    from matplotlib.figure import Figure
+
+    if not _style_applied:
+        import matplotlib.style
+        matplotlib.style.use('default')
+        _style_applied = True
+
+    return Figure(figsize=(6, 4), dpi=100)
+
+
+def _mark_partial(ax):
+    """Помечает график как построенный по предварительным (неполным) данным."""
+    title = ax.get_title()
+    ax.set_title(f"{title}\n(предварительные данные, анализ продолжается)" if title
+                 else "(предварительные данные, анализ продолжается)", fontsize=12)
+
+
+@_profiled("figure.length")
+def create_figure_length(data: Dict[str, List[int]], accent_color: str, partial: bool = False) -> "Figure":
+    """
+    Строит график распределения длин последовательностей по гистограмме длина → число ридов.
+
+    Для длинных ридов с широким разбросом длин (Nanopore, PacBio) столбцы и ось X
+    строятся в логарифмическом масштабе.
+    """
+    fig = _new_figure()
+    ax = fig.add_subplot()
+
+    if data and data['lengths']:
+        lengths = data['lengths']
+        bins = min(LENGTH_HISTOGRAM_BINS, len(lengths)) if sum(data['counts']) > 1 else 1
+        shortest, longest = max(lengths[0], 1), lengths[-1]
+        if longest >= LOG_LENGTH_MIN and longest >= LOG_LENGTH_RATIO * shortest:
+            bins = np.geomspace(shortest, longest + 1, LENGTH_HISTOGRAM_BINS + 1)
+            ax.set_xscale('log')
+        ax.hist(lengths, bins=bins, weights=data['counts'],
                 color=accent_color,
                 edgecolor='white',
                 alpha=0.7)
@@ -105,19 +327,23 @@ def create_figure_length(data: List[int], accent_color: str) -> plt.Figure:
         ax.text(0.5, 0.5, "Данные о длине отсутствуют",
                 ha='center', va='center', fontsize=12)
 
+    if partial:
+        _mark_partial(ax)
     fig.tight_layout()
     return fig
 
 
-def create_figure_quality(data: Dict[str, Any], accent_color: str) -> plt.Figure:
+@_profiled("figure.quality")
+def create_figure_quality(data: Dict[str, Any], accent_color: str, partial: bool = False) -> "Figure":
     """Строит график среднего качества по каждой позиции."""
-    fig, ax = plt.subplots(figsize=(6, 4), dpi=100)
+    fig = _new_figure()
+    ax = fig.add_subplot()
 
     if data and data['positions']:
         positions = data['positions']
         mean_qualities = data['mean_qualities']
 
-        ax.plot(positions, mean_qualities, color=accent_color, linewidth=2, label='Среднее качество')
+        DecimatedLine(ax, positions, mean_qualities, color=accent_color, linewidth=2, label='Среднее качество')
         ax.axhline(y=20, color='red', linestyle='--', alpha=0.7, label='Q20')
         ax.axhline(y=30, color='green', linestyle='--', alpha=0.7, label='Q30')
 
@@ -130,22 +356,26 @@ def create_figure_quality(data: Dict[str, Any], accent_color: str) -> plt.Figure
         ax.text(0.5, 0.5, "Данные о качестве отсутствуют",
                 ha='center', va='center', fontsize=12)
 
+    if partial:
+        _mark_partial(ax)
     fig.tight_layout()
     return fig
 
 
-def create_figure_content(data: Dict[str, Any], accent_color: str) -> plt.Figure:
+@_profiled("figure.content")
+def create_figure_content(data: Dict[str, Any], accent_color: str, partial: bool = False) -> "Figure":
     """Строит график процентного содержания нуклеотидов по позициям."""
-    fig, ax = plt.subplots(figsize=(6, 4), dpi=100)
+    fig = _new_figure()
+    ax = fig.add_subplot()
 
     if data and data['positions']:
         positions = data['positions']
 
         # Используем стандартные цвета для нуклеотидов
-        ax.plot(positions, data['A'], label='A', color='green', linewidth=1.5)
-        ax.plot(positions, data['T'], label='T', color='red', linewidth=1.5)
-        ax.plot(positions, data['G'], label='G', color='orange', linewidth=1.5)
-        ax.plot(positions, data['C'], label='C', color='blue', linewidth=1.5)
+        DecimatedLine(ax, positions, data['A'], label='A', color='green', linewidth=1.5)
+        DecimatedLine(ax, positions, data['T'], label='T', color='red', linewidth=1.5)
+        DecimatedLine(ax, positions, data['G'], label='G', color='orange', linewidth=1.5)
+        DecimatedLine(ax, positions, data['C'], label='C', color='blue', linewidth=1.5)
 
         # Горизонтальная линия для 25% (равное распределение)
         ax.axhline(y=25, color='black', linestyle=':', alpha=0.5, linewidth=0.8)
@@ -159,5 +389,225 @@ def create_figure_content(data: Dict[str, Any], accent_color: str) -> plt.Figure
         ax.text(0.5, 0.5, "Данные о нуклеотидном составе отсутствуют",
                 ha='center', va='center', fontsize=12)
 
+    if partial:
+        _mark_partial(ax)
+    fig.tight_layout()
+    return fig
+
+
+@_profiled("figure.per_sequence_quality")
+def create_figure_per_sequence_quality(data: Dict[str, Any], accent_color: str, partial: bool = False) -> "Figure":
+    """Строит распределение ридов по среднему качеству."""
+    fig = _new_figure()
+    ax = fig.add_subplot()
+
+    if data and data['qualities']:
+        ax.plot(data['qualities'], data['counts'], color=accent_color, linewidth=2)
+        ax.fill_between(data['qualities'], data['counts'], color=accent_color, alpha=0.2)
+        ax.axvline(x=20, color='red', linestyle='--', alpha=0.7, label='Q20')
+        ax.axvline(x=30, color='green', linestyle='--', alpha=0.7, label='Q30')
+
+        ax.set_title("Распределение ридов по среднему качеству", fontsize=12)
+        ax.set_xlabel("Среднее качество рида (Phred)", fontsize=10)
+        ax.set_ylabel("Количество ридов", fontsize=10)
+        ax.legend(fontsize=8)
+        ax.grid(True, linestyle='--', alpha=0.3)
+    else:
+        ax.text(0.5, 0.5, "Данные о качестве ридов отсутствуют",
+                ha='center', va='center', fontsize=12)
+
+    if partial:
+        _mark_partial(ax)
+    fig.tight_layout()
+    return fig
+
+
+@_profiled("figure.gc_content")
+def create_figure_gc_content(data: Dict[str, Any], accent_color: str, partial: bool = False) -> "Figure":
+    """Строит наблюдаемое распределение GC-состава ридов и теоретическое нормальное распределение."""
+    fig = _new_figure()
+    ax = fig.add_subplot()
+
+    if data and data['percents']:
+        ax.plot(data['percents'], data['counts'], color=accent_color, linewidth=2, label='Наблюдаемое')
+        ax.plot(data['percents'], data['theoretical'], color='gray', linestyle='--', linewidth=1.5,
+                label='Теоретическое (нормальное)')
+
+        ax.set_title("Распределение ридов по GC-составу", fontsize=12)
+        ax.set_xlabel(f"GC-состав рида (%), среднее {data['mean_gc']:.1f}%", fontsize=10)
+        ax.set_ylabel("Количество ридов", fontsize=10)
+        ax.set_xlim(0, 100)
+        ax.legend(fontsize=8)
+        ax.grid(True, linestyle='--', alpha=0.3)
+    else:
+        ax.text(0.5, 0.5, "Данные о GC-составе отсутствуют",
+                ha='center', va='center', fontsize=12)
+
+    if partial:
+        _mark_partial(ax)
     fig.tight_layout()
     return fig
+
+
+@_profiled("figure.n_content")
+def create_figure_n_content(data: Dict[str, Any], accent_color: str, partial: bool = False) -> "Figure":
+    """Строит график доли неопределённых нуклеотидов (N) по позициям."""
+    fig = _new_figure()
+    ax = fig.add_subplot()
+
+    if data and data['positions']:
+        DecimatedLine(ax, data['positions'], data['percents'], color=accent_color, linewidth=1.5)
+
+        ax.set_title("Доля N по позициям", fontsize=12)
+        ax.set_xlabel("Позиция в риде (п.н.)", fontsize=10)
+        ax.set_ylabel("Процент N (%)", fontsize=10)
+        ax.set_ylim(bottom=0, top=max(5.0, max(data['percents']) * 1.1))
+        ax.grid(True, linestyle='--', alpha=0.3)
+    else:
+        ax.text(0.5, 0.5, "Данные о содержании N отсутствуют",
+                ha='center', va='center', fontsize=12)
+
+    if partial:
+        _mark_partial(ax)
+    fig.tight_layout()
+    return fig
+
+
+@_profiled("figure.q30")
+def create_figure_q30(data: Dict[str, Any], accent_color: str, partial: bool = False) -> "Figure":
+    """Строит график доли оснований с качеством не ниже Q30 по позициям."""
+    fig = _new_figure()
+    ax = fig.add_subplot()
+
+    if data and data['positions']:
+        DecimatedLine(ax, data['positions'], data['percents'], color=accent_color, linewidth=2,
+                      label='Доля Q30 в позиции')
+        ax.axhline(y=data['overall_percent'], color='green', linestyle='--', alpha=0.7,
+                   label=f"Весь файл: {data['overall_percent']:.1f}%")
+
+        ax.set_title("Доля оснований Q30 по позициям", fontsize=12)
+        ax.set_xlabel("Позиция в риде (п.н.)", fontsize=10)
+        ax.set_ylabel("Основания с качеством ≥ Q30 (%)", fontsize=10)
+        ax.set_ylim(0, 100)
+        ax.legend(fontsize=8)
+        ax.grid(True, linestyle='--', alpha=0.3)
+    else:
+        ax.text(0.5, 0.5, "Данные о качестве отсутствуют",
+                ha='center', va='center', fontsize=12)
+
+    if partial:
+        _mark_partial(ax)
+    fig.tight_layout()
+    return fig
+
+
+@_profiled("figure.duplication")
+def create_figure_duplication(data: Dict[str, Any], accent_color: str, partial: bool = False) -> "Figure":
+    """Строит распределение уровней дупликации: доли различных последовательностей и всех ридов."""
+    fig = _new_figure()
+    ax = fig.add_subplot()
+
+    if data and data['levels']:
+        levels = range(len(data['levels']))
+        ax.plot(levels, data['percent_of_deduplicated'], color=accent_color, linewidth=2,
+                marker='o', markersize=3, label='Различные последовательности')
+        ax.plot(levels, data['percent_of_total'], color='red', linewidth=1.5,
+                marker='o', markersize=3, label='Все риды')
+
+        title = f"Уникальных ридов: {data['percent_unique']:.1f}%"
+        if data['sample_fraction'] < 1:
+            title += f" (оценка по выборке {data['sample_fraction']:.2%})"
+        ax.set_title(title, fontsize=12)
+        ax.set_xticks(list(levels), data['levels'], fontsize=8, rotation=45)
+        ax.set_xlabel("Уровень дупликации (число копий)", fontsize=10)
+        ax.set_ylabel("Процент (%)", fontsize=10)
+        ax.set_ylim(0, 100)
+        ax.legend(fontsize=8)
+        ax.grid(True, linestyle='--', alpha=0.3)
+    else:
+        ax.text(0.5, 0.5, "Данные о дупликации отсутствуют",
+                ha='center', va='center', fontsize=12)
+
+    if partial:
+        _mark_partial(ax)
+    fig.tight_layout()
+    return fig
+
+
+@_profiled("figure.adapter_content")
+def create_figure_adapter_content(data: Dict[str, Any], accent_color: str, partial: bool = False) -> "Figure":
+    """Строит накопленный процент ридов с адаптерами по позициям, по линии на адаптер."""
+    fig = _new_figure()
+    ax = fig.add_subplot()
+
+    if data and data['positions']:
+        for name, percents in data['adapters'].items():
+            DecimatedLine(ax, data['positions'], percents, linewidth=1.5, label=name)
+
+        ax.set_title("Содержание адаптеров по позициям", fontsize=12)
+        ax.set_xlabel("Позиция в риде (п.н.)", fontsize=10)
+        ax.set_ylabel("Риды с адаптером до позиции (%)", fontsize=10)
+        ax.set_ylim(0, 100)
+        ax.legend(fontsize=7, loc='upper left')
+        ax.grid(True, linestyle='--', alpha=0.3)
+    else:
+        ax.text(0.5, 0.5, "Данные о содержании адаптеров отсутствуют",
+                ha='center', va='center', fontsize=12)
+
+    if partial:
+        _mark_partial(ax)
+    fig.tight_layout()
+    return fig
+
+
+def create_figure_run_overview() -> "Figure":
+    """
+    Создает пустую фигуру сводки по набору файлов: среднее качество по позициям
+    и распределение GC-состава. Кривые файлов добавляются функцией add_run_curves.
+    """
+    fig = _new_figure()
+    fig.set_size_inches(6, 8)
+    quality_ax, gc_ax = fig.subplots(2, 1)
+
+    quality_ax.axhline(y=20, color='red', linestyle='--', alpha=0.7)
+    quality_ax.axhline(y=30, color='green', linestyle='--', alpha=0.7)
+    quality_ax.set_title("Среднее качество по позициям", fontsize=12)
+    quality_ax.set_xlabel("Позиция в риде (п.н.)", fontsize=10)
+    quality_ax.set_ylabel("Phred Quality Score", fontsize=10)
+    quality_ax.grid(True, linestyle='--', alpha=0.3)
+
+    gc_ax.set_title("Распределение ридов по GC-составу", fontsize=12)
+    gc_ax.set_xlabel("GC-состав рида (%)", fontsize=10)
+    gc_ax.set_ylabel("Доля ридов (%)", fontsize=10)
+    gc_ax.set_xlim(0, 100)
+    gc_ax.grid(True, linestyle='--', alpha=0.3)
+
+    fig.tight_layout()
+    return fig
+
+
+def add_run_curves(fig: "Figure", summary: Dict[str, Any], color: str) -> list:
+    """
+    Добавляет на фигуру сводки (см. create_figure_run_overview) кривые одного файла.
+
+    Args:
+        fig (Figure): Фигура сводки.
+        summary (Dict[str, Any]): Сводка файла (см. summarize_result).
+        color (str): Цвет кривых.
+
+    Returns:
+        list: Добавленные линии (для выделения файла).
+    """
+    quality_ax, gc_ax = fig.axes
+    lines = []
+    if summary['quality_curve'] is not None:
+        curve = summary['quality_curve']
+        lines.append(DecimatedLine(quality_ax, curve['positions'], curve['mean_qualities'],
+                                   color=color, linewidth=1, alpha=0.6).line)
+    if summary['gc_curve'] is not None:
+        curve = summary['gc_curve']
+        lines += gc_ax.plot(curve['percents'], curve['fractions'], color=color, linewidth=1, alpha=0.6)
+    for ax in fig.axes:
+        ax.relim()
+        ax.autoscale_view()
+    return lines
@@ -1,8 +1,240 @@
 from pathlib import Path
-from typing import Iterator
+from typing import Iterator, TYPE_CHECKING
 import gzip
+import io
+import mmap
+import os
+import stat
+import sys
+import zlib
+import numpy as np
 from .abstract import SequenceReader
-from .record import SequenceRecord
+from .gzip_index import AccessPoint, IndexedGzipReader
+from .gzip_parallel import (ParallelGzipReader, detect_gzip_layout, is_gzip, GZIP_MAGIC,
+                            LAYOUT_BGZF, LAYOUT_MULTI_MEMBER)
+from .profiler import Profiler, NULL_PROFILER
+from .record import BaseSequenceRecord, FastqRecord
+
+if TYPE_CHECKING:
+    from .record_index import RecordIndex
+
+# Размер блока, читаемого из файла за один раз в пакетном режиме
+CHUNK_SIZE = 4 * 1024 * 1024
+# Количество ридов в одном пакете по умолчанию
+DEFAULT_BATCH_SIZE = 8192
+# Верхняя граница числа ячеек (риды × ширина) в матрицах одного пакета
+MAX_BATCH_CELLS = 16 * 1024 * 1024
+
+# Сколько последних точек доступа gzip хранит ридер с возможностью продолжения
+RESUME_POINTS = 16
+
+# Путь, означающий чтение из стандартного ввода
+STDIN_PATH = "-"
+
+# Таблица перевода символов последовательности в верхний регистр
+UPPER_CASE = np.arange(256, dtype=np.uint8)
+UPPER_CASE[ord('a'):ord('z') + 1] -= 32
+
+
+class FastqBatch:
+    """
+    Пакет ридов FASTQ в виде матриц NumPy.
+
+    Последовательности и качества хранятся в матрицах размера (число ридов × длина самого
+    длинного рида), дополненных нулями справа. Фактическая длина каждого рида
+    хранится в векторе lengths.
+
+    Attributes:
+        sequences (np.ndarray): Матрица uint8 с ASCII-кодами нуклеотидов в верхнем регистре.
+        qualities (np.ndarray): Матрица uint8 с Phred-оценками (уже без смещения 33).
+        lengths (np.ndarray): Вектор int64 с длинами ридов.
+        derived (dict[str, np.ndarray]): Производные матрицы, общие для модулей метрик
+            (например, коды нуклеотидов); заполняются модулями по мере необходимости.
+    """
+
+    def __init__(self, sequences: np.ndarray, qualities: np.ndarray, lengths: np.ndarray,
+                 buffer: bytes | memoryview, header_starts: np.ndarray, header_ends: np.ndarray):
+        """
+        Инициализирует пакет ридов.
+
+        Args:
+            sequences (np.ndarray): Матрица последовательностей.
+            qualities (np.ndarray): Матрица Phred-оценок.
+            lengths (np.ndarray): Длины ридов.
+            buffer (bytes | memoryview): Буфер, из которого были разобраны риды (для ленивого доступа к заголовкам).
+            header_starts (np.ndarray): Смещения начала заголовков (после '@') в буфере.
+            header_ends (np.ndarray): Смещения конца заголовков в буфере.
+        """
+        self.sequences = sequences
+        self.qualities = qualities
+        self.lengths = lengths
+        self.derived: dict[str, np.ndarray] = {}
+        self._buffer = buffer
+        self._header_starts = header_starts
+        self._header_ends = header_ends
+
+    @classmethod
+    def from_records(cls, records: list[BaseSequenceRecord]) -> "FastqBatch":
+        """
+        Собирает пакет из готовых записей (например, полученных через read()).
+
+        Args:
+            records (list[BaseSequenceRecord]): Записи с последовательностью и качеством.
+
+        Returns:
+            FastqBatch: Пакет с матрицами, дополненными нулями справа.
+
+        Raises:
+            ValueError: Если оценка качества выходит за пределы диапазона Phred+33 (0–93)
+                или длины последовательности и качества различаются.
+        """
+        lengths = np.array([len(record.sequence) for record in records], dtype=np.int64)
+        width = int(lengths.max()) if len(records) else 0
+        sequences = np.zeros((len(records), width), dtype=np.uint8)
+        qualities = np.zeros((len(records), width), dtype=np.uint8)
+        headers = []
+        for row, record in enumerate(records):
+            length = lengths[row]
+            scores = record.quality_array()
+            if len(scores) != length:
+                raise ValueError(f"Sequence and quality length mismatch for {record.id}")
+            if scores.size and (scores.min() < 0 or scores.max() > 93):
+                raise ValueError(f"Quality score out of Phred+33 range for {record.id}")
+            sequences[row, :length] = UPPER_CASE[np.frombuffer(record.sequence.encode("ascii"), dtype=np.uint8)]
+            qualities[row, :length] = scores
+            headers.append(record.id.encode("ascii", "replace"))
+
+        header_ends = np.cumsum([len(header) + 1 for header in headers], dtype=np.int64) - 1
+        header_starts = header_ends - np.array([len(header) for header in headers], dtype=np.int64)
+        return cls(sequences, qualities, lengths, b"\n".join(headers) + b"\n", header_starts, header_ends)
+
+    def __len__(self) -> int:
+        """Возвращает количество ридов в пакете."""
+        return len(self.lengths)
+
+    def headers(self) -> list[bytes]:
+        """
+        Возвращает заголовки ридов (без '@'). Заголовки извлекаются из буфера только по запросу.
+
+        Returns:
+            list[bytes]: Список заголовков в порядке ридов.
+        """
+        buffer = self._buffer
+        return [bytes(buffer[start:end]) for start, end in
+                zip(self._header_starts.tolist(), self._header_ends.tolist())]
+
+
+def is_stream(file_path: str | Path) -> bool:
+    """
+    Проверяет, является ли источник потоком: стандартным вводом ('-') или не обычным
+    файлом (именованный канал, устройство). Потоки читаются один раз и последовательно,
+    их размер заранее неизвестен.
+
+    Args:
+        file_path (str | Path): Путь к файлу или '-'.
+
+    Returns:
+        bool: True для потока, False для обычного файла (или если пути не существует).
+    """
+    if str(file_path) == STDIN_PATH:
+        return True
+    try:
+        return not stat.S_ISREG(os.stat(file_path).st_mode)
+    except OSError:
+        return False
+
+
+class _PipeReader(io.RawIOBase):
+    """
+    Поток данных из канала (стандартный ввод или именованный канал) с определением сжатия
+    по сигнатуре gzip.
+
+    Канал нельзя перемотать, поэтому первые байты читаются при открытии и затем выдаются
+    первыми. Сжатые данные распаковываются на лету, включая многочленные gzip (например,
+    собранные через cat).
+
+    Attributes:
+        compressed (bool): Данные сжаты gzip.
+        compressed_position (int | None): Сколько сжатых байтов прочитано из канала
+            (None для несжатых данных).
+    """
+
+    def __init__(self, raw):
+        """
+        Инициализирует поток и читает сигнатуру.
+
+        Args:
+            raw: Небуферизованный двоичный поток канала.
+        """
+        super().__init__()
+        self._raw = raw
+        head = b""
+        while len(head) < len(GZIP_MAGIC):
+            chunk = raw.read(len(GZIP_MAGIC) - len(head))
+            if not chunk:
+                break
+            head += chunk
+        self.compressed = head == GZIP_MAGIC
+        self.compressed_position = 0 if self.compressed else None
+        self._head = head
+        self._decompressor = zlib.decompressobj(31) if self.compressed else None
+        self._current = memoryview(b"")
+
+    def readable(self) -> bool:
+        """Поток поддерживает чтение."""
+        return True
+
+    def readinto(self, buffer) -> int:
+        """
+        Копирует очередную порцию (распакованных) данных в buffer.
+
+        Returns:
+            int: Количество скопированных байтов (0 — конец потока).
+
+        Raises:
+            EOFError: Если сжатый поток оборвался посреди gzip-члена.
+        """
+        if self._decompressor is None and not self._head:
+            return self._raw.readinto(buffer)
+
+        while not self._current:
+            data, self._head = self._head or self._raw.read(CHUNK_SIZE), b""
+            if self._decompressor is None:
+                if not data:
+                    return 0
+                self._current = memoryview(data)
+                break
+            if not data:
+                if not self._decompressor.eof:
+                    raise EOFError("Сжатый поток закончился до конца gzip-члена")
+                return 0
+            self.compressed_position += len(data)
+            self._current = memoryview(self._inflate(data))
+
+        size = min(len(buffer), len(self._current))
+        buffer[:size] = self._current[:size]
+        self._current = self._current[size:]
+        return size
+
+    def _inflate(self, data: bytes) -> bytes:
+        """Распаковывает очередной блок сжатых данных, переходя к следующим gzip-членам."""
+        parts = []
+        while data:
+            if self._decompressor.eof:
+                # Между членами, как и в модуле gzip, допускается дополнение нулями
+                data = data.lstrip(b"\x00")
+                if not data:
+                    break
+                self._decompressor = zlib.decompressobj(31)
+            parts.append(self._decompressor.decompress(data))
+            data = self._decompressor.unused_data
+        return b"".join(parts)
+
+    def close(self):
+        """Закрывает канал."""
+        if not self.closed:
+            self._raw.close()
+        super().close()
 
 
 class FastqReader(SequenceReader):
@@ -10,41 +242,77 @@ class FastqReader(SequenceReader):
     Реализация ридера для чтения FASTQ-файлов (включая сжатые .gz).
 
     Поддерживает итеративное чтение записей в формате FASTQ, автоматическое определение
-    сжатия по расширению файла (.gz), валидацию структуры записей и преобразование
+    сжатия gzip по сигнатуре в начале файла, валидацию структуры записей и преобразование
     ASCII-строк качества в числовые значения Phred+33.
 
+    Помимо построчного read() поддерживает пакетное чтение read_batches(), которое
+    возвращает риды в виде матриц NumPy для векторного анализа, и read_views(), которое
+    возвращает срезы memoryview без декодирования текста. Несжатые файлы в этих режимах
+    отображаются в память (mmap).
+
+    Вместо файла можно читать поток: стандартный ввод (путь '-') или именованный канал.
+    Поток читается один раз последовательно, без временных файлов (см. is_stream).
+
+    Чтение обычного файла можно продолжить с места остановки (см. resume_position):
+    для gzip ридер с resumable=True по ходу распаковки сохраняет точки доступа
+    (см. IndexedGzipReader) и не распаковывает файл заново с начала.
+
+    С индексом записей (см. RecordIndex) можно читать произвольный диапазон записей,
+    в том числе из gzip-файла: read_batches(start, end) и read_records().
+
     Attributes:
-        filepath (Path): Путь к FASTQ-файлу (может быть сжатым).
-        file (file object or None): Открытый файловый дескриптор (обычный или gzip).
+        filepath (Path): Путь к FASTQ-файлу (может быть сжатым) или '-' для стандартного ввода.
+        streamed (bool): Источник — поток, а не обычный файл.
+        file (file object or None): Не используется: файл открывается в read() и read_batches().
+        bytes_consumed (int): Сколько байтов файла на диске (для gzip — сжатых, для потока —
+            прочитанных из него) уже обработано в read_batches. Используется для отображения прогресса.
+        profiler (Profiler): Сборщик времени этапов чтения (decompress, parse, quality).
+        resumable (bool): Сохранять точки доступа gzip для продолжения чтения.
+        resume_position (dict | None): Позиция начала текущего окна read_batches, с которой
+            чтение можно продолжить (аргумент resume). None — продолжить с этого места нельзя
+            (поток, gzip без resumable, последнее окно gzip).
+        index (RecordIndex | None): Индекс записей файла для произвольного доступа.
     """
 
-    def __init__(self, filepath: str | Path):
+    def __init__(self, filepath: str | Path, threads: int | None = None,
+                 profiler: Profiler = NULL_PROFILER, resumable: bool = False,
+                 index: "RecordIndex | None" = None):
         """
         Инициализирует FastqReader с указанным путём к файлу.
 
         Args:
-            filepath (str | Path): Путь к FASTQ-файлу. Поддерживается сжатие (.gz).
+            filepath (str | Path): Путь к FASTQ-файлу или '-' для стандартного ввода.
+                Поддерживается сжатие gzip.
+            threads (int | None): Количество потоков распаковки для BGZF и многочленных
+                gzip-файлов. None — по числу ядер, 1 — обычная однопоточная распаковка.
+            profiler (Profiler): Сборщик времени этапов. По умолчанию замеры не выполняются.
+            resumable (bool): Распаковывать gzip с сохранением точек доступа, чтобы чтение
+                можно было продолжить (однопоточно, см. resume_position).
+            index (RecordIndex | None): Индекс записей файла (см. RecordIndex.load).
+                Нужен для чтения диапазонов gzip-файла и для read_records().
         """
         super().__init__(filepath)
         self.file = None
+        self.threads = threads
+        self.bytes_consumed = 0
+        self.profiler = profiler
+        self.streamed = is_stream(self.filepath)
+        self.resumable = resumable
+        self.resume_position = None
+        self.index = index
+        self._compressed = None
+        self._gzip_layout = None
 
     def __enter__(self):
         """
         Поддержка контекстного менеджера (with-блока).
 
-        Автоматически определяет, сжат ли файл (по расширению .gz),
-        и открывает его в текстовом режиме с кодировкой ASCII.
+        Файл открывается при чтении: read() и read_batches() читают его в двоичном режиме
+        (несжатые файлы отображаются в память, gzip распаковывается, см. _open_binary).
 
         Returns:
-            FastqReader: Текущий экземпляр после открытия файла.
-
-        Raises:
-            OSError: Если файл не может быть открыт (например, не существует или повреждён).
+            FastqReader: Текущий экземпляр.
         """
-        if str(self.filepath).endswith('.gz'):
-            self.file = gzip.open(self.filepath, "rt", encoding="ascii")
-        else:
-            self.file = open(self.filepath, "r", encoding="ascii")
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
@@ -70,9 +338,9 @@ class FastqReader(SequenceReader):
             self.file.close()
             self.file = None
 
-    def read(self) -> Iterator[SequenceRecord]:
+    def read(self) -> Iterator[FastqRecord]:
         """
-        Итеративно читает FASTQ-файл и возвращает объекты SequenceRecord.
+        Итеративно читает FASTQ-файл и возвращает объекты FastqRecord.
 
         Каждая запись FASTQ состоит из 4 строк:
             1. Заголовок (начинается с '@')
@@ -80,54 +348,495 @@ class FastqReader(SequenceReader):
             3. Разделитель (начинается с '+')
             4. Строка качества (ASCII, Phred+33)
 
-        Метод выполняет базовую валидацию структуры и длины данных.
+        Метод выполняет базовую валидацию структуры и длины данных (см. read_views).
+        Идентификатор и Phred-оценки разбираются лениво, при первом обращении к ним.
 
         Yields:
-            SequenceRecord: Объект с атрибутами id, sequence и quality (список int).
+            FastqRecord: Объект с атрибутами id, sequence и quality (список int).
 
         Raises:
             ValueError: При нарушении формата FASTQ (неверные маркеры, несоответствие длины и т.д.).
             OSError: Если файл не может быть прочитан.
         """
-        if not self.file:
-            if str(self.filepath).endswith('.gz'):
-                self.file = gzip.open(self.filepath, "rt", encoding="ascii")
+        for header, sequence, quality in self.read_views():
+            yield FastqRecord(bytes(header), bytes(sequence).upper().decode("ascii"), bytes(quality))
+
+    def read_records(self, first: int, count: int = 1) -> list[FastqRecord]:
+        """
+        Читает записи по номерам, не просматривая файл с начала.
+
+        Чтение начинается с ближайшей предшествующей записи из индекса (см. RecordIndex),
+        поэтому пропускается не больше index.step записей.
+
+        Args:
+            first (int): Номер первой записи (с нуля).
+            count (int): Количество записей. Если до конца файла записей меньше,
+                возвращаются оставшиеся.
+
+        Returns:
+            list[FastqRecord]: Записи с номерами first, first + 1, ...
+
+        Raises:
+            ValueError: Если у ридера нет индекса записей или нарушен формат FASTQ.
+            IndexError: Если записи с номером first в файле нет.
+        """
+        if self.index is None:
+            raise ValueError("Для чтения записей по номеру нужен индекс записей (RecordIndex)")
+        offset, record = self.index.record_offset(first)
+
+        records = []
+        if count <= 0:
+            return records
+        views = self.read_views(offset)
+        try:
+            for header, sequence, quality in views:
+                if record >= first:
+                    records.append(FastqRecord(bytes(header), bytes(sequence).upper().decode("ascii"),
+                                               bytes(quality)))
+                    if len(records) == count:
+                        break
+                record += 1
+        finally:
+            views.close()
+        return records
+
+    @property
+    def compressed(self) -> bool | None:
+        """
+        Сжат ли источник gzip (определяется по сигнатуре, а не по расширению).
+
+        Для потока сигнатура читается при открытии, поэтому до начала чтения значение — None.
+        """
+        if self._compressed is None and not self.streamed:
+            self._compressed = is_gzip(self.filepath)
+        return self._compressed
+
+    def _open_binary(self, point: AccessPoint | None = None):
+        """
+        Открывает файл в двоичном режиме (с распаковкой gzip).
+
+        BGZF и многочленные gzip-файлы распаковываются в несколько потоков
+        (см. ParallelGzipReader), обычный gzip с одним потоком сжатия — модулем gzip.
+        Ридер с resumable=True и чтение с точки доступа используют IndexedGzipReader.
+        Потоки открываются через _PipeReader, который сам определяет и распаковывает gzip.
+
+        Args:
+            point (AccessPoint | None): Точка доступа gzip, с которой начинается распаковка.
+                None — начало файла.
+        """
+        if self.streamed:
+            if str(self.filepath) == STDIN_PATH:
+                raw = open(sys.stdin.fileno(), "rb", buffering=0, closefd=False)
             else:
-                self.file = open(self.filepath, "r", encoding="ascii")
+                raw = open(self.filepath, "rb", buffering=0)
+            pipe = _PipeReader(raw)
+            self._compressed = pipe.compressed
+            return io.BufferedReader(pipe, buffer_size=CHUNK_SIZE)
+
+        if not self.compressed:
+            return open(self.filepath, "rb")
+
+        if self.resumable or point is not None:
+            raw = IndexedGzipReader(self.filepath, start=point, max_points=RESUME_POINTS)
+            return io.BufferedReader(raw, buffer_size=CHUNK_SIZE)
+        if self.threads != 1:
+            if self._gzip_layout is None:
+                self._gzip_layout = detect_gzip_layout(self.filepath)
+            if self._gzip_layout in (LAYOUT_BGZF, LAYOUT_MULTI_MEMBER):
+                raw = ParallelGzipReader(self.filepath, self._gzip_layout, self.threads)
+                return io.BufferedReader(raw, buffer_size=CHUNK_SIZE)
+        return gzip.open(self.filepath, "rb")
+
+    def read_batches(self, batch_size: int = DEFAULT_BATCH_SIZE,
+                     max_cells: int = MAX_BATCH_CELLS,
+                     start: int = 0, end: int | None = None,
+                     complete_only: bool = False,
+                     resume: dict | None = None) -> Iterator[FastqBatch]:
+        """
+        Читает FASTQ-файл пакетами и возвращает риды в виде матриц NumPy.
 
-        while True:
-            header = self.file.readline()
-            if not header:
-                break
+        Файл читается крупными блоками в двоичном режиме, границы строк находятся
+        векторно, поэтому на каждый рид не создаются объекты Python. Выполняется та же
+        структурная валидация, что и в read().
 
-            sequence = self.file.readline().rstrip('\n')
-            plus_line = self.file.readline()
-            quality = self.file.readline().rstrip('\n')
+        Для обычных файлов (не потоков) можно прочитать только диапазон байтов [start, end): возвращаются
+        записи, заголовок которых начинается в этом диапазоне. start должен указывать на
+        начало записи (см. align_to_record или RecordIndex). Для gzip-файла диапазон задаётся
+        в распакованных данных и требует индекса записей (index): распаковка начинается
+        с ближайшей точки доступа.
 
-            if not (header and sequence and plus_line and quality):
-                break
+        Args:
+            batch_size (int): Максимальное количество ридов в пакете.
+            max_cells (int): Максимальный размер матриц пакета (риды × ширина). Ограничивает
+                память при чтении длинных ридов.
+            start (int): Смещение начала диапазона в байтах (для gzip — распакованных).
+            end (int | None): Смещение конца диапазона в байтах. None — до конца файла.
+            complete_only (bool): Разбирать только данные до последнего перевода строки
+                (несжатые файлы): запись, которая ещё дописывается в файл, пропускается
+                вместо ошибки формата. Используется при слежении за растущим файлом.
+            resume (dict | None): Позиция из resume_position прошлого чтения: чтение
+                продолжается с неё и выдаёт те же пакеты, что и непрерывное чтение.
+                Для gzip ридер должен быть создан с resumable=True.
+
+        Yields:
+            FastqBatch: Очередной пакет ридов.
+
+        Raises:
+            ValueError: При нарушении формата FASTQ.
+            OSError: Если файл не может быть прочитан.
+        """
+        if (start or end is not None) and (self.streamed or (self.compressed and self.index is None)):
+            raise ValueError("Чтение диапазона байтов не поддерживается для потоков и сжатых файлов без индекса")
+
+        buffers = self._iter_buffers(start, end, complete_only, resume)
+        try:
+            data, position, source_position = next(buffers)
+            while True:
+                limit = None if end is None else end - position
+                consumed = 0
+                for batch, consumed in self._parse_buffer(data, batch_size, max_cells, limit, self.profiler):
+                    self.bytes_consumed = position + consumed if source_position is None else source_position
+                    yield batch
+                data, position, source_position = buffers.send(consumed)
+        except StopIteration:
+            pass
+        finally:
+            buffers.close()
+
+    def read_views(self, start: int = 0) -> Iterator[tuple[memoryview, memoryview, memoryview]]:
+        """
+        Итеративно читает FASTQ-файл без декодирования текста.
+
+        Для несжатых файлов записи выдаются как срезы memoryview прямо из отображения файла
+        в память (mmap), без копирования и без создания строк. Выполняется та же структурная
+        валидация, что и в read(). Последовательность не приводится к верхнему регистру.
+
+        Срезы ссылаются на общий буфер: чтобы сохранить данные записи после перехода
+        к следующей, их нужно скопировать (например, bytes(view)).
+
+        Args:
+            start (int): Смещение начала записи, с которой начинается чтение (для gzip —
+                в распакованных данных, требуется индекс записей).
+
+        Yields:
+            tuple[memoryview, memoryview, memoryview]: Заголовок (без '@'), последовательность
+                и строка качества (ASCII, Phred+33) без символов перевода строки.
+
+        Raises:
+            ValueError: При нарушении формата FASTQ.
+            OSError: Если файл не может быть прочитан.
+        """
+        if start and (self.streamed or (self.compressed and self.index is None)):
+            raise ValueError("Чтение с произвольного смещения не поддерживается для потоков и сжатых файлов без индекса")
+
+        buffers = self._iter_buffers(start)
+        try:
+            data, _, _ = next(buffers)
+            while True:
+                view = memoryview(data)
+                newlines = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == 10).tolist()
+                line_start = 0
+                for i in range(0, len(newlines) // 4 * 4, 4):
+                    header_end, sequence_end, plus_end, quality_end = newlines[i:i + 4]
+                    header = view[line_start:self._strip_cr(view, line_start, header_end)]
+                    sequence = view[header_end + 1:self._strip_cr(view, header_end + 1, sequence_end)]
+                    plus_start = sequence_end + 1
+                    quality = view[plus_end + 1:self._strip_cr(view, plus_end + 1, quality_end)]
+
+                    if not header or header[0] != 64:
+                        line = bytes(header).decode("ascii", "replace")
+                        raise ValueError(f"Invalid FASTQ: expected '@', got {line.strip()!r}")
+                    if plus_end == plus_start or view[plus_start] != 43:
+                        line = bytes(view[plus_start:plus_end]).decode("ascii", "replace")
+                        raise ValueError(f"Invalid FASTQ: expected '+', got {line.strip()!r}")
+                    if len(sequence) != len(quality):
+                        raise ValueError(f"Sequence and quality length mismatch for {self._view_id(header)}")
+                    if not sequence:
+                        raise ValueError(f"Empty sequence for {self._view_id(header)}")
+
+                    yield header[1:], sequence, quality
+                    line_start = quality_end + 1
+                data, _, _ = buffers.send(line_start)
+        except StopIteration:
+            pass
+        finally:
+            buffers.close()
 
-            if not header.startswith("@"):
-                raise ValueError(f"Invalid FASTQ: expected '@', got {header.strip()!r}")
-            if not plus_line.startswith("+"):
-                raise ValueError(f"Invalid FASTQ: expected '+', got {plus_line.strip()!r}")
+    @staticmethod
+    def _strip_cr(view: memoryview, start: int, end: int) -> int:
+        """Возвращает конец строки [start, end) без завершающего '\\r' (переводы строк Windows)."""
+        return end - 1 if end > start and view[end - 1] == 13 else end
 
-            seq_id = header[1:].split(maxsplit=1)[0] if len(header) > 1 else "unknown"
+    @staticmethod
+    def _view_id(header: memoryview) -> str:
+        """Извлекает идентификатор рида из заголовка (вместе с '@') для сообщений об ошибках."""
+        text = bytes(header[1:]).decode("ascii", "replace")
+        return text.split(maxsplit=1)[0] if text.strip() else "unknown"
 
-            seq_clean = sequence.upper()
-            qual_clean = quality
+    def _iter_buffers(self, start: int = 0, end: int | None = None, complete_only: bool = False,
+                      resume: dict | None = None):
+        """
+        Выдаёт файл последовательными окнами байтов для разбора записей.
+
+        Это генератор с обратной связью: после разбора окна вызывающий код передаёт через
+        send() число байтов, занятых полными записями, и следующее окно начинается сразу
+        за ними. Если в окне не поместилось ни одной записи, следующее окно увеличивается.
 
-            if len(seq_clean) != len(qual_clean):
-                raise ValueError(f"Sequence and quality length mismatch for {seq_id}")
+        Несжатый файл отображается в память (mmap), и окна являются срезами memoryview
+        без копирования. Сжатые файлы и потоки читаются блоками CHUNK_SIZE, и неразобранный
+        хвост переносится в следующий блок.
 
-            if not seq_clean:
-                raise ValueError(f"Empty sequence for {seq_id}")
+        Отображение не закрывается явно: срезы могут оставаться в выданных пакетах
+        (см. FastqBatch.headers), поэтому оно освобождается вместе с последней ссылкой.
 
-            quality_scores = self._parse_quality(qual_clean)
+        Перед выдачей окна в resume_position записывается позиция, с которой это окно
+        можно воспроизвести: для несжатого файла — его смещение, для gzip — ещё и конец
+        окна и точка доступа перед ним (окно gzip заканчивается на границе блока CHUNK_SIZE,
+        и при продолжении первым читается блок до того же конца).
 
+        Args:
+            start (int): Смещение начала чтения (для gzip — в распакованных данных, по индексу).
+            end (int | None): Окна выдаются, пока их начало меньше end. None — до конца файла.
+            complete_only (bool): Файл считается заканчивающимся на последнем переводе строки
+                (только для несжатых файлов).
+            resume (dict | None): Позиция из resume_position, с которой продолжается чтение.
 
-            record = SequenceRecord(id=seq_id, sequence=seq_clean, quality=quality_scores)
-            yield record
+        Yields:
+            tuple: Окно данных (последнее окно всегда заканчивается '\\n'), его смещение
+                в распакованных данных и позиция в сжатом файле (None для несжатых данных).
+        """
+        self.resume_position = None
+        if not self.streamed and not self.compressed:
+            if resume is not None:
+                start = resume['offset']
+            with open(self.filepath, "rb") as stream:
+                size = os.fstat(stream.fileno()).st_size
+                if size <= start:
+                    return
+                mapping = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+                if complete_only:
+                    size = mapping.rfind(b"\n") + 1
+                    if size <= start:
+                        return
+                mapped = memoryview(mapping)
+
+            position = start
+            window = CHUNK_SIZE
+            while end is None or position < end:
+                window_end = min(position + window, size)
+                final = window_end == size
+                data = mapped[position:window_end]
+                if final and data[-1] != 10:
+                    data = bytes(data) + b"\n"
+                self.resume_position = {'offset': position}
+                consumed = yield data, position, None
+                position += consumed
+                if position >= size or (final and consumed < len(data)):
+                    # Неполная последняя запись игнорируется, как и в read()
+                    return
+                # Запись длиннее окна: расширяем окно, иначе возвращаемся к обычному размеру
+                window = window * 2 if consumed == 0 else CHUNK_SIZE
+            return
+
+        if resume is not None and not (self.resumable and self.compressed):
+            raise ValueError("Продолжить чтение можно только для несжатых файлов и gzip с resumable=True")
+        point = None
+        read_size = CHUNK_SIZE
+        if resume is not None:
+            point = resume['point']
+            start = resume['offset']
+            read_size = resume['chunk_end'] - start
+        elif start:
+            point = self.index.point_before(start)
+        with self._open_binary(point) as stream:
+            position = start
+            if point is not None:
+                with self.profiler.stage("decompress"):
+                    # Данные от точки доступа до начала чтения пропускаются
+                    stream.read(start - point.uncompressed)
+            pending = b""
+            while True:
+                with self.profiler.stage("decompress"):
+                    chunk = stream.read(read_size)
+                self.profiler.count("decompress", bytes=len(chunk))
+                read_size = CHUNK_SIZE
+                final = not chunk
+                data = pending + chunk if pending else chunk
+                if final and data and not data.endswith(b"\n"):
+                    data += b"\n"
+
+                self.resume_position = None
+                if isinstance(getattr(stream, "raw", None), IndexedGzipReader) and not final:
+                    point = stream.raw.point_before(position)
+                    if point is not None:
+                        self.resume_position = {'offset': position, 'chunk_end': position + len(data),
+                                                'point': point}
+                consumed = yield data, position, self._source_position(stream)
+                pending = data[consumed:]
+                position += consumed
+                if final or (end is not None and position >= end):
+                    return
+
+    @property
+    def total_bytes(self) -> int:
+        """Размер файла на диске в байтах (для gzip — сжатый размер). Для потока — 0: размер неизвестен."""
+        return 0 if self.streamed else self.filepath.stat().st_size
+
+    @staticmethod
+    def _source_position(stream) -> int | None:
+        """
+        Возвращает позицию в сжатом файле для потоков распаковки.
+
+        Returns:
+            int | None: Смещение в сжатом файле или None для несжатого потока.
+        """
+        raw = getattr(stream, "raw", None)
+        if isinstance(raw, (ParallelGzipReader, IndexedGzipReader, _PipeReader)):
+            return raw.compressed_position
+        fileobj = getattr(stream, "fileobj", None)
+        if fileobj is not None:
+            return fileobj.tell()
+        return None
+
+    def align_to_record(self, offset: int) -> int:
+        """
+        Находит начало первой записи FASTQ, начинающейся не раньше offset.
+
+        Строка качества тоже может начинаться с '@', поэтому кандидат проверяется
+        по структуре: за заголовком через одну строку должен идти '+', а строки
+        последовательности и качества должны иметь одинаковую длину.
+
+        Args:
+            offset (int): Произвольное смещение в несжатом файле.
+
+        Returns:
+            int: Смещение начала записи или размер файла, если записей дальше нет.
+        """
+        if offset <= 0:
+            return 0
+
+        with open(self.filepath, "rb") as stream:
+            # Переходим к началу строки, следующей за байтом offset - 1
+            stream.seek(offset - 1)
+            position = offset - 1 + len(stream.readline())
+
+            lines = []
+            line_offsets = []
+            for _ in range(8):
+                line = stream.readline()
+                if not line:
+                    break
+                line_offsets.append(position)
+                lines.append(line)
+                position += len(line)
+
+            for i in range(len(lines) - 3):
+                header, sequence, plus_line, quality = lines[i:i + 4]
+                if (header.startswith(b"@") and plus_line.startswith(b"+")
+                        and len(sequence.rstrip(b"\r\n")) == len(quality.rstrip(b"\r\n"))):
+                    return line_offsets[i]
+
+            if len(lines) < 8:
+                # Дальше только неполная запись в конце файла
+                return position
+            raise ValueError(f"Invalid FASTQ: не удалось найти начало записи после смещения {offset}")
+
+    @staticmethod
+    def _parse_buffer(data: bytes, batch_size: int, max_cells: int, limit: int | None = None,
+                      profiler: Profiler = NULL_PROFILER) -> Iterator[tuple[FastqBatch, int]]:
+        """
+        Разбирает все полные записи FASTQ в буфере.
+
+        Args:
+            data (bytes | memoryview): Буфер с одной или несколькими записями (может заканчиваться неполной записью).
+            batch_size (int): Максимальное количество ридов в пакете.
+            max_cells (int): Максимальный размер матриц пакета.
+            limit (int | None): Разбираются только записи, начинающиеся до этого смещения в буфере.
+            profiler (Profiler): Сборщик времени: поиск границ и проверка структуры замеряются
+                как этап parse, построение матриц и проверка качества — как этап quality.
+
+        Yields:
+            tuple[FastqBatch, int]: Пакет и смещение в буфере сразу после его последней записи.
+
+        Raises:
+            ValueError: При нарушении формата FASTQ.
+        """
+        with profiler.stage("parse"):
+            buffer = np.frombuffer(data, dtype=np.uint8)
+            newlines = np.flatnonzero(buffer == 10)
+            n_records = len(newlines) // 4
+            if n_records == 0:
+                return
+
+            line_ends = newlines[:n_records * 4]
+            line_starts = np.empty_like(line_ends)
+            line_starts[0] = 0
+            line_starts[1:] = line_ends[:-1] + 1
+
+            # Учитываем переводы строк в стиле Windows (\r\n)
+            has_cr = (line_ends > line_starts) & (buffer[np.maximum(line_ends - 1, 0)] == 13)
+            line_ends = line_ends - has_cr
+
+            starts = line_starts.reshape(-1, 4)
+            ends = line_ends.reshape(-1, 4)
+            if limit is not None:
+                n_records = int(np.count_nonzero(starts[:, 0] < limit))
+                if n_records == 0:
+                    return
+                starts = starts[:n_records]
+                ends = ends[:n_records]
+            lengths = ends[:, 1] - starts[:, 1]
+
+            def header_of(index: int) -> str:
+                header = bytes(data[starts[index, 0] + 1:ends[index, 0]]).decode("ascii", "replace")
+                return header.split(maxsplit=1)[0] if header.strip() else "unknown"
+
+            bad = np.flatnonzero(buffer[starts[:, 0]] != ord("@"))
+            if bad.size:
+                line = bytes(data[starts[bad[0], 0]:ends[bad[0], 0]]).decode("ascii", "replace")
+                raise ValueError(f"Invalid FASTQ: expected '@', got {line.strip()!r}")
+            bad = np.flatnonzero((ends[:, 2] == starts[:, 2]) | (buffer[starts[:, 2]] != ord("+")))
+            if bad.size:
+                line = bytes(data[starts[bad[0], 2]:ends[bad[0], 2]]).decode("ascii", "replace")
+                raise ValueError(f"Invalid FASTQ: expected '+', got {line.strip()!r}")
+            bad = np.flatnonzero(lengths != ends[:, 3] - starts[:, 3])
+            if bad.size:
+                raise ValueError(f"Sequence and quality length mismatch for {header_of(bad[0])}")
+            bad = np.flatnonzero(lengths == 0)
+            if bad.size:
+                raise ValueError(f"Empty sequence for {header_of(bad[0])}")
+
+        first = 0
+        while first < n_records:
+            with profiler.stage("parse"):
+                last = min(first + batch_size, n_records)
+                # Ограничиваем ширину матриц: (k + 1) * max(lengths[:k + 1]) не должно превышать max_cells
+                widths = np.maximum.accumulate(lengths[first:last])
+                fits = np.arange(1, last - first + 1) * widths <= max_cells
+                last = first + max(1, int(np.count_nonzero(fits)))
+
+                batch_lengths = lengths[first:last]
+                width = int(batch_lengths.max())
+                columns = np.arange(width)
+                mask = columns < batch_lengths[:, None]
+
+                # Символы за концом рида читаются из следующих строк буфера и затем обнуляются маской
+                sequences = UPPER_CASE[buffer.take(starts[first:last, 1, None] + columns, mode="clip")] * mask
+
+            with profiler.stage("quality"):
+                qualities = (buffer.take(starts[first:last, 3, None] + columns, mode="clip") - 33) * mask
+                if qualities.max() > 93:
+                    # Символы ниже '!' после вычитания 33 переполняются uint8 и тоже попадают сюда
+                    row = int(np.flatnonzero((qualities > 93).any(axis=1))[0])
+                    raise ValueError(f"Invalid quality character for {header_of(first + row)}")
+
+            consumed = int(newlines[last * 4 - 1]) + 1
+            profiler.count("parse", bytes=consumed - int(starts[first, 0]), reads=last - first,
+                           bases=int(batch_lengths.sum()))
+            batch = FastqBatch(sequences, qualities, batch_lengths.astype(np.int64), data,
+                               starts[first:last, 0] + 1, ends[first:last, 0])
+            yield batch, consumed
+            first = last
 
     @staticmethod
     def _parse_quality(quality_str: str) -> list[int]:
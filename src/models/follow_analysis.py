@@ -0,0 +1,180 @@
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict
+from .fastq_plots import AnalysisCancelled
+from .fastq_reader import FastqReader
+from .profiler import Profiler, NULL_PROFILER
+from .stats_accumulator import StatsAccumulator
+
+# Период проверки файла на появление новых записей (секунды)
+DEFAULT_POLL_INTERVAL = 2.0
+
+
+class FastqFollower:
+    """
+    Накопленная статистика FASTQ-файла, который ещё дописывается (например, бейсколлером).
+
+    Хранит StatsAccumulator и смещение сразу за последней учтённой записью. Каждый вызов
+    poll() читает только полные записи, добавленные с прошлого вызова, поэтому стоимость
+    обновления пропорциональна объёму новых данных, а не размеру файла.
+
+    Поддерживаются только несжатые файлы: продолжить распаковку gzip с середины файла нельзя.
+
+    Attributes:
+        file_path (Path): Путь к файлу.
+        accumulator (StatsAccumulator): Статистика по учтённым записям.
+        offset (int): Смещение в байтах сразу за последней учтённой записью.
+    """
+
+    def __init__(self, file_path: str | Path, profiler: Profiler = NULL_PROFILER):
+        """
+        Инициализирует слежение за файлом (сам файл читается при первом вызове poll()).
+
+        Args:
+            file_path (str | Path): Путь к несжатому FASTQ-файлу.
+            profiler (Profiler): Сборщик времени этапов.
+
+        Raises:
+            FileNotFoundError: Если файла нет.
+            ValueError: Если файл сжат или является потоком.
+        """
+        self.file_path = Path(file_path)
+        if not self.file_path.exists():
+            raise FileNotFoundError(f"Файл не найден: {self.file_path}")
+        self.accumulator = StatsAccumulator()
+        self.offset = 0
+        self.profiler = profiler
+        self._reader = FastqReader(self.file_path, profiler=profiler)
+        if self._reader.streamed or self._reader.compressed:
+            raise ValueError("Слежение поддерживается только для несжатых файлов")
+
+    def poll(self, final: bool = False, cancel_event: threading.Event | None = None) -> int:
+        """
+        Учитывает записи, добавленные в файл с прошлого вызова.
+
+        Args:
+            final (bool): Файл больше не дописывается: учитывается и последняя запись
+                без завершающего перевода строки.
+            cancel_event (threading.Event | None): Событие остановки, проверяется после
+                каждого пакета. Учтённые до остановки записи сохраняются.
+
+        Returns:
+            int: Количество новых ридов.
+
+        Raises:
+            RuntimeError: Если файл стал короче учтённых данных (усечён или заменён).
+            ValueError: При нарушении формата FASTQ.
+        """
+        if self.file_path.stat().st_size < self.offset:
+            raise RuntimeError(f"Файл {self.file_path.name} был усечён или заменён во время слежения")
+
+        before = self.accumulator.total_sequences
+        batches = self._reader.read_batches(start=self.offset, complete_only=not final)
+        try:
+            for batch in batches:
+                with self.profiler.stage("accumulate", reads=len(batch)):
+                    self.accumulator.update_batch(batch)
+                self.offset = self._reader.bytes_consumed
+                if cancel_event is not None and cancel_event.is_set():
+                    break
+        finally:
+            batches.close()
+        # К последней записи без перевода строки он добавляется при чтении, но в файле его нет
+        self.offset = min(self.offset, self.file_path.stat().st_size)
+        return self.accumulator.total_sequences - before
+
+    def result(self, partial: bool) -> Dict[str, Any]:
+        """
+        Возвращает результаты в формате run_analysis по учтённым записям.
+
+        Args:
+            partial (bool): Признак предварительных данных (файл ещё дописывается).
+        """
+        with self.profiler.stage("aggregate"):
+            result = self.accumulator.to_result()
+        result['partial'] = partial
+        result['diagnostics'] = self.profiler.report()
+        return result
+
+
+def run_follow_analysis(file_path: str | Path,
+                        poll_interval: float = DEFAULT_POLL_INTERVAL,
+                        idle_timeout: float | None = None,
+                        progress_callback: Callable[[int, int, int], None] | None = None,
+                        snapshot_callback: Callable[[Dict[str, Any]], None] | None = None,
+                        stop_event: threading.Event | None = None,
+                        profiler: Profiler | None = None) -> Dict[str, Any]:
+    """
+    Анализирует FASTQ-файл, который ещё дописывается, обновляя статистику по мере роста.
+
+    Сначала учитываются все уже записанные полные записи, затем каждые poll_interval секунд —
+    только добавленные (см. FastqFollower). После каждого обновления с новыми ридами
+    вызывается snapshot_callback. Слежение заканчивается по stop_event или когда файл
+    не растёт idle_timeout секунд; во втором случае файл считается дописанным и учитывается
+    также последняя запись без перевода строки. Если последняя запись оборвана (запись
+    файла прервалась), учтённые риды сохраняются, а необработанный хвост указывается
+    в результате.
+
+    Args:
+        file_path (str | Path): Путь к несжатому FASTQ-файлу.
+        poll_interval (float): Период проверки файла в секундах.
+        idle_timeout (float | None): Через сколько секунд без новых данных закончить слежение.
+            None — следить до stop_event.
+        progress_callback (Callable | None): Вызывается после каждой проверки с аргументами
+            (учтено байтов, текущий размер файла, учтено ридов).
+        snapshot_callback (Callable | None): Получает промежуточные результаты
+            (с ключом 'partial': True) после каждой проверки, добавившей риды.
+        stop_event (threading.Event | None): Событие остановки слежения. Остановка не является
+            отменой: возвращаются результаты по уже учтённым записям.
+        profiler (Profiler | None): Сборщик времени этапов. None — создаётся новый.
+
+    Returns:
+        Dict[str, Any]: Результаты в формате run_analysis ('partial': False) и позиция
+            слежения в 'follow': {'offset': учтено байтов, 'file_size': размер файла,
+            'incomplete_tail': None или описание ошибки формата в неучтённом хвосте файла}.
+
+    Raises:
+        AnalysisCancelled: Если слежение остановлено до появления первых ридов.
+        RuntimeError: Если файл был усечён или заменён либо в нём нет ридов.
+        ValueError: Если файл сжат или нарушен формат FASTQ (кроме оборванной последней записи).
+    """
+    if profiler is None:
+        profiler = Profiler()
+    follower = FastqFollower(file_path, profiler)
+    last_growth = time.monotonic()
+    incomplete_tail = None
+
+    while True:
+        final = idle_timeout is not None and time.monotonic() - last_growth >= idle_timeout
+        try:
+            added = follower.poll(final=final, cancel_event=stop_event)
+        except ValueError as e:
+            # Оборванная последняя запись не должна отменять уже учтённые риды
+            if not final:
+                raise
+            incomplete_tail = str(e)
+            added = 0
+        if added:
+            last_growth = time.monotonic()
+            if snapshot_callback and not final:
+                snapshot_callback(follower.result(partial=True))
+        if progress_callback:
+            progress_callback(follower.offset, follower.file_path.stat().st_size,
+                              follower.accumulator.total_sequences)
+        if final or (stop_event is not None and stop_event.is_set()):
+            break
+        if stop_event is not None:
+            stop_event.wait(poll_interval)
+        else:
+            time.sleep(poll_interval)
+
+    if follower.accumulator.total_sequences == 0:
+        if stop_event is not None and stop_event.is_set():
+            raise AnalysisCancelled()
+        raise RuntimeError("В файле не найдено действительных последовательностей.")
+
+    result = follower.result(partial=False)
+    result['follow'] = {'offset': follower.offset, 'file_size': follower.file_path.stat().st_size,
+                        'incomplete_tail': incomplete_tail}
+    return result
@@ -0,0 +1,346 @@
+import ctypes
+import ctypes.util
+import gzip
+import io
+import zlib
+from collections import deque
+from pathlib import Path
+from typing import Iterator
+
+# Размер окна deflate: столько предыдущих распакованных байтов нужно для продолжения распаковки
+WINDOW_SIZE = 32 * 1024
+# Размер блока, читаемого из сжатого файла за один раз
+READ_SIZE = 1024 * 1024
+# Размер буфера распакованных данных одного вызова inflate
+OUTPUT_SIZE = 1024 * 1024
+# Расстояние между точками доступа по распакованным данным по умолчанию
+DEFAULT_SPACING = 4 * 1024 * 1024
+
+# Константы zlib.h
+_Z_OK = 0
+_Z_STREAM_END = 1
+_Z_NEED_DICT = 2
+_Z_BUF_ERROR = -5
+_Z_NO_FLUSH = 0
+_Z_BLOCK = 5
+# Размер завершения gzip-члена (CRC32 и длина), которое не читается в режиме raw deflate
+_GZIP_TRAILER_SIZE = 8
+
+
+class _ZStream(ctypes.Structure):
+    """Структура z_stream из zlib.h."""
+    _fields_ = [
+        ("next_in", ctypes.c_void_p),
+        ("avail_in", ctypes.c_uint),
+        ("total_in", ctypes.c_ulong),
+        ("next_out", ctypes.c_void_p),
+        ("avail_out", ctypes.c_uint),
+        ("total_out", ctypes.c_ulong),
+        ("msg", ctypes.c_char_p),
+        ("state", ctypes.c_void_p),
+        ("zalloc", ctypes.c_void_p),
+        ("zfree", ctypes.c_void_p),
+        ("opaque", ctypes.c_void_p),
+        ("data_type", ctypes.c_int),
+        ("adler", ctypes.c_ulong),
+        ("reserved", ctypes.c_ulong),
+    ]
+
+
+def _load_libz():
+    """
+    Загружает системную библиотеку zlib через ctypes.
+
+    Модуль zlib Python не позволяет остановить распаковку на границе блока deflate
+    и продолжить её с произвольного бита, поэтому для точек доступа внутри gzip-члена
+    используются функции библиотеки напрямую (inflate с Z_BLOCK, inflatePrime).
+
+    Returns:
+        ctypes.CDLL | None: Библиотека или None, если она недоступна (тогда точки
+            доступа создаются только на границах gzip-членов).
+    """
+    name = ctypes.util.find_library("z") or ctypes.util.find_library("zlib1")
+    if name is None:
+        return None
+    try:
+        lib = ctypes.CDLL(name)
+        lib.zlibVersion.restype = ctypes.c_char_p
+        lib.inflateInit2_.argtypes = [ctypes.POINTER(_ZStream), ctypes.c_int, ctypes.c_char_p, ctypes.c_int]
+        lib.inflate.argtypes = [ctypes.POINTER(_ZStream), ctypes.c_int]
+        lib.inflateEnd.argtypes = [ctypes.POINTER(_ZStream)]
+        lib.inflateReset2.argtypes = [ctypes.POINTER(_ZStream), ctypes.c_int]
+        lib.inflatePrime.argtypes = [ctypes.POINTER(_ZStream), ctypes.c_int, ctypes.c_int]
+        lib.inflateSetDictionary.argtypes = [ctypes.POINTER(_ZStream), ctypes.c_char_p, ctypes.c_uint]
+    except (OSError, AttributeError):
+        return None
+    return lib
+
+
+_LIBZ = _load_libz()
+
+
+class AccessPoint:
+    """
+    Точка доступа в gzip-файле, с которой можно начать распаковку (как в zran.c из zlib).
+
+    Точка внутри gzip-члена лежит на границе блока deflate, которая не обязательно
+    совпадает с границей байта, и требует 32 КБ предшествующих распакованных данных
+    (окна). Точка в начале gzip-члена окна не требует.
+
+    Attributes:
+        uncompressed (int): Смещение в распакованных данных.
+        compressed (int): Смещение первого непрочитанного байта в сжатом файле.
+        bits (int): Сколько старших битов байта compressed - 1 ещё не прочитано (0–7).
+        window (bytes): Последние WINDOW_SIZE байтов распакованных данных перед точкой;
+            пусто для начала gzip-члена.
+    """
+
+    def __init__(self, uncompressed: int, compressed: int, bits: int = 0, window: bytes = b""):
+        """
+        Инициализирует точку доступа.
+
+        Args:
+            uncompressed (int): Смещение в распакованных данных.
+            compressed (int): Смещение в сжатом файле.
+            bits (int): Количество непрочитанных битов предыдущего байта.
+            window (bytes): Окно распакованных данных (пусто в начале gzip-члена).
+        """
+        self.uncompressed = uncompressed
+        self.compressed = compressed
+        self.bits = bits
+        self.window = window
+
+    @property
+    def member_start(self) -> bool:
+        """Точка находится в начале gzip-члена (распаковка начинается с заголовка)."""
+        return not self.window
+
+
+class IndexedGzipReader(io.RawIOBase):
+    """
+    Поток распакованных данных gzip, который можно начать с точки доступа и который
+    по ходу распаковки сам создаёт новые точки доступа.
+
+    Точки создаются примерно каждые spacing байтов распакованных данных: на ближайшей
+    границе блока deflate (если доступна системная zlib, см. _load_libz) или на ближайшей
+    границе gzip-члена. Поддерживаются многочленные файлы (включая BGZF).
+
+    Attributes:
+        filepath (Path): Путь к gzip-файлу.
+        points (deque[AccessPoint]): Созданные точки доступа в порядке возрастания
+            (включая начальную), не более max_points последних.
+        compressed_position (int): Сколько байтов сжатого файла прочитано.
+        position (int): Смещение в распакованных данных сразу за выданными байтами.
+    """
+
+    def __init__(self, filepath: str | Path, start: AccessPoint | None = None,
+                 spacing: int = DEFAULT_SPACING, max_points: int | None = None):
+        """
+        Инициализирует поток.
+
+        Args:
+            filepath (str | Path): Путь к gzip-файлу.
+            start (AccessPoint | None): Точка, с которой начинается распаковка. None — начало файла.
+            spacing (int): Расстояние между создаваемыми точками в распакованных байтах.
+            max_points (int | None): Сколько последних точек хранить. None — все.
+        """
+        super().__init__()
+        self.filepath = Path(filepath)
+        start = start or AccessPoint(0, 0)
+        self.points = deque([start], maxlen=max_points)
+        self.compressed_position = start.compressed
+        self.position = start.uncompressed
+        self._spacing = spacing
+        self._stream = open(self.filepath, "rb")
+        self._current = memoryview(b"")
+        use_libz = _LIBZ is not None
+        if not use_libz and not start.member_start and start.bits:
+            # Без системной zlib продолжить с середины байта нельзя: распаковываем с начала
+            start = AccessPoint(0, 0)
+            self.points = deque([start], maxlen=max_points)
+            self.compressed_position = 0
+            self._skip = self.position
+            self.position = 0
+        else:
+            self._skip = 0
+        self._chunks = self._inflate_libz(start) if use_libz else self._inflate_zlib(start)
+
+    def readable(self) -> bool:
+        """Поток поддерживает чтение."""
+        return True
+
+    def readinto(self, buffer) -> int:
+        """
+        Копирует очередную порцию распакованных данных в buffer.
+
+        Returns:
+            int: Количество скопированных байтов (0 — конец файла).
+        """
+        while not self._current:
+            try:
+                data = next(self._chunks)
+            except StopIteration:
+                return 0
+            if self._skip:
+                skipped = min(self._skip, len(data))
+                self._skip -= skipped
+                self.position += skipped
+                data = data[skipped:]
+            self._current = memoryview(data)
+
+        size = min(len(buffer), len(self._current))
+        buffer[:size] = self._current[:size]
+        self._current = self._current[size:]
+        self.position += size
+        return size
+
+    def close(self):
+        """Останавливает распаковку и закрывает файл."""
+        if not self.closed:
+            self._chunks.close()
+            self._stream.close()
+        super().close()
+
+    def point_before(self, offset: int) -> AccessPoint | None:
+        """
+        Возвращает последнюю из хранимых точек доступа, не превышающую offset.
+
+        Args:
+            offset (int): Смещение в распакованных данных.
+
+        Returns:
+            AccessPoint | None: Точка или None, если все хранимые точки дальше offset.
+        """
+        found = None
+        for point in self.points:
+            if point.uncompressed > offset:
+                break
+            found = point
+        return found
+
+    def _add_point(self, uncompressed: int, compressed: int, bits: int, window: bytes):
+        """Добавляет точку доступа, если от предыдущей прошло не меньше spacing байтов."""
+        if uncompressed - self.points[-1].uncompressed >= self._spacing:
+            self.points.append(AccessPoint(uncompressed, compressed, bits, window))
+
+    def _inflate_zlib(self, start: AccessPoint) -> Iterator[bytes]:
+        """
+        Распаковывает файл модулем zlib Python; новые точки доступа создаются только
+        на границах gzip-членов.
+        """
+        self._stream.seek(start.compressed)
+        if start.member_start:
+            decompressor = zlib.decompressobj(31)
+            trailer = 0
+        else:
+            decompressor = zlib.decompressobj(-15, zdict=start.window)
+            # В режиме raw deflate завершение члена (CRC32 и длина) распаковщик не читает
+            trailer = _GZIP_TRAILER_SIZE
+        uncompressed = start.uncompressed
+        while True:
+            chunk = self._stream.read(READ_SIZE)
+            if not chunk:
+                break
+            chunk_offset = self.compressed_position
+            self.compressed_position += len(chunk)
+            data = chunk
+            while data:
+                if decompressor.eof:
+                    skipped = min(trailer, len(data))
+                    trailer -= skipped
+                    # Между членами, как и в модуле gzip, допускается дополнение нулями
+                    data = data[skipped:].lstrip(b"\x00")
+                    if trailer or not data:
+                        break
+                    self._add_point(uncompressed, chunk_offset + len(chunk) - len(data), 0, b"")
+                    decompressor = zlib.decompressobj(31)
+                output = decompressor.decompress(data)
+                if output:
+                    uncompressed += len(output)
+                    yield output
+                data = decompressor.unused_data
+        if not decompressor.eof or trailer:
+            raise EOFError("Compressed file ended before the end-of-stream marker was reached")
+
+    def _inflate_libz(self, start: AccessPoint) -> Iterator[bytes]:
+        """
+        Распаковывает файл системной zlib, останавливаясь на границах блоков deflate,
+        когда нужна новая точка доступа (алгоритм zran.c).
+        """
+        lib = _LIBZ
+        stream = _ZStream()
+        raw_deflate = not start.member_start
+        if lib.inflateInit2_(ctypes.byref(stream), -15 if raw_deflate else 31, lib.zlibVersion(),
+                             ctypes.sizeof(_ZStream)) != _Z_OK:
+            raise MemoryError("Не удалось инициализировать распаковку zlib")
+        output = ctypes.create_string_buffer(OUTPUT_SIZE)
+        output_address = ctypes.addressof(output)
+        try:
+            self._stream.seek(start.compressed - (1 if start.bits else 0))
+            if start.bits:
+                byte = self._stream.read(1)[0]
+                lib.inflatePrime(ctypes.byref(stream), start.bits, byte >> (8 - start.bits))
+            if raw_deflate:
+                lib.inflateSetDictionary(ctypes.byref(stream), start.window, len(start.window))
+
+            uncompressed = start.uncompressed
+            history = start.window
+            chunk = b""
+            chunk_address = 0
+            chunk_offset = start.compressed
+            member_done = False
+            trailer = 0
+            while True:
+                if stream.avail_in == 0:
+                    chunk_offset += len(chunk)
+                    chunk = self._stream.read(READ_SIZE)
+                    self.compressed_position = chunk_offset + len(chunk)
+                    if not chunk:
+                        if not member_done or trailer:
+                            raise EOFError("Compressed file ended before the end-of-stream marker was reached")
+                        return
+                    # Указатель на данные bytes без копирования; chunk хранит их до следующего чтения
+                    chunk_address = ctypes.cast(ctypes.c_char_p(chunk), ctypes.c_void_p).value
+                    stream.next_in = chunk_address
+                    stream.avail_in = len(chunk)
+
+                if member_done:
+                    # Пропускаем завершение члена (в режиме raw deflate) и дополнение нулями
+                    position = len(chunk) - stream.avail_in
+                    skipped = min(trailer, len(chunk) - position)
+                    trailer -= skipped
+                    position += skipped
+                    while not trailer and position < len(chunk) and chunk[position] == 0:
+                        position += 1
+                    stream.next_in = chunk_address + position
+                    stream.avail_in = len(chunk) - position
+                    if not stream.avail_in:
+                        continue
+                    self._add_point(uncompressed, chunk_offset + position, 0, b"")
+                    lib.inflateReset2(ctypes.byref(stream), 31)
+                    raw_deflate = False
+                    member_done = False
+
+                stream.next_out = output_address
+                stream.avail_out = OUTPUT_SIZE
+                need_point = uncompressed - self.points[-1].uncompressed >= self._spacing
+                ret = lib.inflate(ctypes.byref(stream), _Z_BLOCK if need_point else _Z_NO_FLUSH)
+                if ret not in (_Z_OK, _Z_STREAM_END, _Z_BUF_ERROR):
+                    message = stream.msg.decode("ascii", "replace") if stream.msg else str(ret)
+                    raise gzip.BadGzipFile(f"Ошибка распаковки {self.filepath}: {message}")
+                produced = OUTPUT_SIZE - stream.avail_out
+                if produced:
+                    data = ctypes.string_at(output_address, produced)
+                    uncompressed += produced
+                    history = data[-WINDOW_SIZE:] if produced >= WINDOW_SIZE else (history + data)[-WINDOW_SIZE:]
+                    yield data
+
+                if ret == _Z_STREAM_END:
+                    member_done = True
+                    trailer = _GZIP_TRAILER_SIZE if raw_deflate else 0
+                elif need_point and stream.data_type & 128 and not stream.data_type & 64:
+                    # Граница блока deflate (не последнего): сохраняем точку доступа
+                    self._add_point(uncompressed, chunk_offset + len(chunk) - stream.avail_in,
+                                    stream.data_type & 7, history)
+        finally:
+            lib.inflateEnd(ctypes.byref(stream))
@@ -0,0 +1,329 @@
+import gzip
+import io
+import os
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterator
+
+# Сигнатура заголовка gzip-члена: ID1, ID2 и метод сжатия deflate
+GZIP_MAGIC = b"\x1f\x8b\x08"
+# Флаг FEXTRA в заголовке gzip
+FLAG_EXTRA = 4
+
+# Размер блока, читаемого из сжатого файла за один раз
+READ_SIZE = 4 * 1024 * 1024
+# Объём сжатых данных в одной задаче распаковки BGZF
+BGZF_TASK_SIZE = 1024 * 1024
+# Максимальный размер сегмента многочленного gzip, распаковываемого одной задачей
+MAX_SEGMENT_SIZE = 4 * 1024 * 1024
+# Объём сжатых данных, распаковываемый при определении типа файла
+PROBE_SIZE = 4 * 1024 * 1024
+
+LAYOUT_BGZF = "bgzf"
+LAYOUT_MULTI_MEMBER = "multi"
+LAYOUT_SINGLE = "single"
+
+
+def _bgzf_block_size(header: bytes) -> int | None:
+    """
+    Извлекает полный размер BGZF-блока из заголовка gzip-члена.
+
+    Args:
+        header (bytes): Байты, начинающиеся с заголовка gzip-члена.
+
+    Returns:
+        int | None: Размер блока в байтах или None, если заголовок не содержит поля BC
+            (или данных недостаточно для его разбора).
+    """
+    if len(header) < 12 or not header.startswith(GZIP_MAGIC) or not header[3] & FLAG_EXTRA:
+        return None
+
+    extra_length = int.from_bytes(header[10:12], "little")
+    extra = header[12:12 + extra_length]
+    if len(extra) < extra_length:
+        return None
+
+    pos = 0
+    while pos + 4 <= len(extra):
+        field_length = int.from_bytes(extra[pos + 2:pos + 4], "little")
+        if extra[pos:pos + 2] == b"BC" and field_length == 2:
+            return int.from_bytes(extra[pos + 4:pos + 6], "little") + 1
+        pos += 4 + field_length
+    return None
+
+
+def is_gzip(file_path: str | Path) -> bool:
+    """
+    Проверяет, сжат ли файл gzip, по сигнатуре в начале файла (расширение не учитывается).
+
+    Args:
+        file_path (str | Path): Путь к файлу.
+
+    Returns:
+        bool: True, если файл начинается с заголовка gzip-члена.
+    """
+    with open(file_path, "rb") as stream:
+        return stream.read(len(GZIP_MAGIC)) == GZIP_MAGIC
+
+
+def detect_gzip_layout(file_path: str | Path) -> str | None:
+    """
+    Определяет внутреннюю структуру gzip-файла.
+
+    BGZF распознаётся по полю BC в заголовке первого блока. Для остальных файлов
+    распаковывается начало первого члена: если он заканчивается в пределах PROBE_SIZE
+    и за ним следует ещё один заголовок gzip, файл считается многочленным.
+
+    Args:
+        file_path (str | Path): Путь к файлу.
+
+    Returns:
+        str | None: LAYOUT_BGZF, LAYOUT_MULTI_MEMBER, LAYOUT_SINGLE или None, если файл не gzip.
+    """
+    with open(file_path, "rb") as stream:
+        head = stream.read(PROBE_SIZE)
+
+    if not head.startswith(GZIP_MAGIC):
+        return None
+    if _bgzf_block_size(head) is not None:
+        return LAYOUT_BGZF
+
+    decompressor = zlib.decompressobj(31)
+    try:
+        data = head
+        while data and not decompressor.eof:
+            # Ограничиваем объём распакованных данных: они не нужны
+            decompressor.decompress(data, READ_SIZE)
+            data = decompressor.unconsumed_tail
+    except zlib.error:
+        return LAYOUT_SINGLE
+
+    if decompressor.eof and decompressor.unused_data.startswith(GZIP_MAGIC):
+        return LAYOUT_MULTI_MEMBER
+    return LAYOUT_SINGLE
+
+
+def _inflate_blocks(blocks: list[bytes]) -> bytes:
+    """Распаковывает последовательность полных gzip-членов (BGZF-блоков)."""
+    return b"".join(zlib.decompress(block, 31) for block in blocks)
+
+
+def _inflate_speculative(segment: bytes) -> tuple:
+    """
+    Пытается распаковать сегмент, начинающийся с кандидата в заголовки gzip-члена.
+
+    Args:
+        segment (bytes): Сжатые данные от кандидата до следующего кандидата.
+
+    Returns:
+        tuple: Распаковщик (для продолжения члена в следующих сегментах) и распакованные данные.
+            Если сегмент не начинается с корректного члена, распаковщик равен None.
+    """
+    decompressor = zlib.decompressobj(31)
+    try:
+        return decompressor, decompressor.decompress(segment)
+    except zlib.error:
+        return None, b""
+
+
+def _check_trailing(data: bytes):
+    """Проверяет данные после последнего члена: допускается только дополнение нулями, как в gzip."""
+    if data.strip(b"\x00"):
+        raise gzip.BadGzipFile("Неожиданные данные между членами gzip")
+
+
+class ParallelGzipReader(io.RawIOBase):
+    """
+    Поток распакованных данных BGZF или многочленного gzip с многопоточной распаковкой.
+
+    Сжатый файл делится на независимые члены (блоки), которые распаковываются в пуле потоков
+    (zlib освобождает GIL во время распаковки). Результаты выдаются строго в исходном порядке.
+
+    Для BGZF границы блоков известны из заголовков. Для прочих многочленных файлов файл
+    делится по всем вхождениям сигнатуры gzip; каждый сегмент распаковывается спекулятивно,
+    а ложные срабатывания (сигнатура внутри сжатых данных) обнаруживаются при сборке
+    и дораспаковываются последовательно.
+
+    Attributes:
+        filepath (Path): Путь к сжатому файлу.
+        compressed_position (int): Количество обработанных байтов сжатого файла.
+    """
+
+    def __init__(self, filepath: str | Path, layout: str, threads: int | None = None):
+        """
+        Инициализирует поток.
+
+        Args:
+            filepath (str | Path): Путь к gzip-файлу.
+            layout (str): LAYOUT_BGZF или LAYOUT_MULTI_MEMBER (см. detect_gzip_layout).
+            threads (int | None): Количество потоков распаковки. None — по числу ядер.
+        """
+        super().__init__()
+        self.filepath = Path(filepath)
+        self.compressed_position = 0
+        self._threads = threads or os.cpu_count() or 1
+        self._stream = open(self.filepath, "rb")
+        self._executor = ThreadPoolExecutor(max_workers=self._threads)
+        self._member = None
+        self._current = memoryview(b"")
+        if layout == LAYOUT_BGZF:
+            self._chunks = self._iter_bgzf()
+        else:
+            self._chunks = self._iter_multi_member()
+
+    def readable(self) -> bool:
+        """Поток поддерживает чтение."""
+        return True
+
+    def readinto(self, buffer) -> int:
+        """
+        Копирует очередную порцию распакованных данных в buffer.
+
+        Returns:
+            int: Количество скопированных байтов (0 — конец файла).
+        """
+        while not self._current:
+            try:
+                self._current = memoryview(next(self._chunks))
+            except StopIteration:
+                return 0
+
+        size = min(len(buffer), len(self._current))
+        buffer[:size] = self._current[:size]
+        self._current = self._current[size:]
+        return size
+
+    def close(self):
+        """Останавливает распаковку и закрывает файл."""
+        if not self.closed:
+            self._chunks.close()
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._stream.close()
+        super().close()
+
+    def _ordered(self, tasks: Iterator[tuple[int, bytes, bool]]) -> Iterator[tuple[int, bytes, Future | None]]:
+        """
+        Отправляет задачи в пул, ограничивая число одновременно распаковываемых сегментов.
+
+        Yields:
+            tuple: Размер сегмента, сами сжатые данные и Future с результатом (или None).
+        """
+        window = deque()
+        for size, payload, submit in tasks:
+            future = None
+            if submit:
+                func = _inflate_blocks if isinstance(payload, list) else _inflate_speculative
+                future = self._executor.submit(func, payload)
+            window.append((size, payload, future))
+            if len(window) >= self._threads * 2:
+                yield window.popleft()
+        while window:
+            yield window.popleft()
+
+    def _iter_bgzf(self) -> Iterator[bytes]:
+        """Выдаёт распакованные данные BGZF-файла в исходном порядке."""
+        for size, _, future in self._ordered(self._bgzf_tasks()):
+            data = future.result()
+            self.compressed_position += size
+            yield data
+
+    def _bgzf_tasks(self) -> Iterator[tuple[int, list[bytes], bool]]:
+        """Делит BGZF-файл на группы целых блоков по границам из заголовков."""
+        buffer = b""
+        while True:
+            chunk = self._stream.read(READ_SIZE)
+            buffer = buffer + chunk if buffer else chunk
+            pos = 0
+            blocks = []
+            group_size = 0
+            while pos < len(buffer):
+                block_size = _bgzf_block_size(buffer[pos:pos + 512])
+                if block_size is None:
+                    if chunk and len(buffer) - pos < 512:
+                        break  # заголовок блока ещё не прочитан целиком
+                    if not buffer[pos:].strip(b"\x00"):
+                        pos = len(buffer)
+                        break
+                    raise gzip.BadGzipFile(f"Повреждённый BGZF-блок в {self.filepath}")
+                if pos + block_size > len(buffer):
+                    break
+                blocks.append(buffer[pos:pos + block_size])
+                group_size += block_size
+                pos += block_size
+                if group_size >= BGZF_TASK_SIZE:
+                    yield group_size, blocks, True
+                    blocks = []
+                    group_size = 0
+            if blocks:
+                yield group_size, blocks, True
+
+            buffer = buffer[pos:]
+            if not chunk:
+                if buffer:
+                    raise gzip.BadGzipFile(f"Файл {self.filepath} обрывается посреди BGZF-блока")
+                return
+
+    def _iter_multi_member(self) -> Iterator[bytes]:
+        """Выдаёт распакованные данные многочленного gzip-файла в исходном порядке."""
+        for size, segment, future in self._ordered(self._member_tasks()):
+            if self._member is None:
+                if future is None:
+                    # Данные после последнего члена, не начинающиеся с сигнатуры
+                    _check_trailing(segment)
+                    self.compressed_position += size
+                    continue
+                decompressor, data = future.result()
+                if decompressor is None:
+                    raise gzip.BadGzipFile(f"Повреждённый gzip-член в {self.filepath}")
+            else:
+                # Продолжение члена: сигнатура в начале сегмента оказалась ложной
+                decompressor = self._member
+                data = decompressor.decompress(segment)
+
+            self.compressed_position += size
+            if decompressor.eof:
+                _check_trailing(decompressor.unused_data)
+                self._member = None
+            else:
+                self._member = decompressor
+            yield data
+
+        if self._member is not None:
+            raise EOFError("Compressed file ended before the end-of-stream marker was reached")
+
+    def _member_tasks(self) -> Iterator[tuple[int, bytes, bool]]:
+        """
+        Делит многочленный gzip-файл на сегменты по вхождениям сигнатуры gzip.
+
+        Сегмент, начинающийся с сигнатуры, распаковывается спекулятивно в пуле.
+        Слишком длинные участки без сигнатуры делятся на части по MAX_SEGMENT_SIZE,
+        которые дораспаковываются последовательно.
+        """
+        buffer = b""
+        at_candidate = True
+        while True:
+            chunk = self._stream.read(READ_SIZE)
+            buffer = buffer + chunk if buffer else chunk
+            pos = 0
+            while True:
+                candidate = buffer.find(GZIP_MAGIC, pos + 1 if at_candidate else pos)
+                if candidate == -1:
+                    break
+                if candidate > pos:
+                    yield candidate - pos, buffer[pos:candidate], at_candidate
+                at_candidate = True
+                pos = candidate
+            buffer = buffer[pos:]
+
+            if not chunk:
+                if buffer:
+                    yield len(buffer), buffer, at_candidate
+                return
+            if len(buffer) > MAX_SEGMENT_SIZE:
+                # Оставляем хвост, в котором может начинаться сигнатура
+                keep = len(GZIP_MAGIC) - 1
+                yield len(buffer) - keep, buffer[:-keep], at_candidate
+                buffer = buffer[-keep:]
+                at_candidate = False
@@ -0,0 +1,394 @@
+from abc import ABC, abstractmethod
+from typing import Any, ClassVar, Dict, List, Tuple, TYPE_CHECKING
+import numpy as np
+
+from .profiler import Profiler, NULL_PROFILER
+
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+    from .fastq_reader import FastqBatch
+
+# Порядок столбцов матрицы нуклеотидного состава
+BASES = ("A", "C", "G", "T", "N")
+
+# Таблица перевода ASCII-кода символа последовательности в индекс столбца BASES.
+# Строчные буквы учитываются как прописные, любые другие символы — как N.
+BASE_CODES = np.full(256, BASES.index("N"), dtype=np.uint8)
+for _index, _base in enumerate(BASES):
+    BASE_CODES[ord(_base)] = _index
+    BASE_CODES[ord(_base.lower())] = _index
+
+# Как в FastQC: при сравнении последовательностей риды длиннее TRUNCATE_ABOVE учитываются
+# по первым TRUNCATE_TO нуклеотидам, чтобы ошибки в концах длинных ридов не скрывали совпадения
+TRUNCATE_ABOVE = 75
+TRUNCATE_TO = 50
+
+# Множитель полиномиального хэша и константы перемешивания splitmix64
+_HASH_BASE = np.uint64(0x100000001B3)
+_MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_2 = np.uint64(0x94D049BB133111EB)
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_HASH_POWERS = np.cumprod(np.full(TRUNCATE_ABOVE, _HASH_BASE, dtype=np.uint64), dtype=np.uint64)
+
+# Как в FastQC, позиции рида группируются в интервалы: до EXACT_POSITIONS каждая позиция
+# учитывается отдельно, дальше ширина интервалов растёт геометрически (POSITION_BINS_PER_DOUBLING
+# интервалов на каждое удвоение позиции). Число интервалов растёт как логарифм длины рида:
+# около 1000 для ридов в 100 т.п.н. и около 1200 для 1 м.п.н.
+EXACT_POSITIONS = 500
+POSITION_BINS_PER_DOUBLING = 64
+# Начала интервалов (позиции с нуля); последний интервал начинается дальше 2^32
+POSITION_BIN_STARTS = np.concatenate((
+    np.arange(EXACT_POSITIONS),
+    np.unique(np.ceil(EXACT_POSITIONS * 2.0 ** (np.arange(POSITION_BINS_PER_DOUBLING * 24)
+                                                 / POSITION_BINS_PER_DOUBLING))).astype(np.int64)
+))
+
+# Зарегистрированные модули метрик в порядке регистрации (он же порядок кнопок в окне)
+_REGISTRY: Dict[str, type["MetricModule"]] = {}
+# Способ показа результатов модуля -> метод, который модуль с этим способом должен реализовать
+_VIEW_METHODS = {"figure": "create_figure", "table": "create_table"}
+
+
+class MetricModule(ABC):
+    """
+    Модуль метрики качества, вычисляемой за один потоковый проход по файлу.
+
+    Все зарегистрированные модули обновляются одним и тем же пакетом ридов
+    (см. StatsAccumulator), поэтому новая метрика не требует отдельного прохода.
+    Состояние модуля должно занимать ограниченную память и сливаться с состоянием
+    другого экземпляра (для параллельного анализа фрагментов файла).
+
+    Attributes:
+        name (str): Короткий идентификатор модуля (используется в именах файлов графиков).
+        title (str): Заголовок графика и кнопки в окне статистики.
+        result_key (str): Ключ данных графика в словаре результатов анализа.
+        view (str): Способ показа результатов: "figure" — график (create_figure),
+            "table" — таблица (create_table). Соответствующий метод обязателен:
+            register_metric проверяет, что он переопределён.
+        setting_attributes (Tuple[str, ...]): Атрибуты класса, задающие настройки модуля.
+            Их значения передаются в процессы-обработчики (см. metric_settings в stats_accumulator):
+            при запуске методом spawn процесс заново импортирует модули и видит только значения
+            по умолчанию.
+    """
+
+    name: ClassVar[str]
+    title: ClassVar[str]
+    result_key: ClassVar[str]
+    view: ClassVar[str] = "figure"
+    setting_attributes: ClassVar[Tuple[str, ...]] = ()
+
+    @abstractmethod
+    def update_batch(self, batch: "FastqBatch"):
+        """
+        Добавляет в статистику пакет ридов.
+
+        Args:
+            batch (FastqBatch): Пакет ридов (см. FastqReader.read_batches).
+        """
+
+    @abstractmethod
+    def merge(self, other: "MetricModule"):
+        """
+        Добавляет к статистике модуля статистику другого экземпляра того же модуля.
+
+        Args:
+            other (MetricModule): Модуль, заполненный по другой части файла.
+        """
+
+    @abstractmethod
+    def finalize(self) -> Dict[str, Any]:
+        """
+        Вычисляет итоговые значения метрики.
+
+        Returns:
+            Dict[str, Any]: Записи словаря результатов анализа (обычно одна — по result_key).
+                Значения должны сериализоваться в JSON.
+        """
+
+    @abstractmethod
+    def get_state(self) -> Dict[str, np.ndarray]:
+        """Возвращает состояние модуля в виде набора массивов (для кэша результатов)."""
+
+    @abstractmethod
+    def set_state(self, state: Dict[str, np.ndarray]):
+        """Восстанавливает состояние, полученное через get_state()."""
+
+    @classmethod
+    def create_figure(cls, data: Any, accent_color: str, partial: bool = False,
+                      profiler: Profiler = NULL_PROFILER) -> "Figure":
+        """
+        Строит график метрики по данным из словаря результатов (ключ result_key).
+
+        Args:
+            data (Any): Данные метрики или None, если их нет.
+            accent_color (str): Основной цвет графика.
+            partial (bool): Данные предварительные (анализ ещё продолжается).
+            profiler (Profiler): Сборщик времени построения.
+
+        Returns:
+            Figure: Фигура matplotlib.
+        """
+        raise NotImplementedError
+
+    @classmethod
+    def create_table(cls, data: Any) -> Tuple[List[str], List[Tuple[Any, ...]]]:
+        """
+        Формирует таблицу по данным из словаря результатов (для модулей с view = "table").
+
+        Args:
+            data (Any): Данные метрики или None, если их нет.
+
+        Returns:
+            Tuple[List[str], List[Tuple[Any, ...]]]: Заголовки столбцов и строки таблицы.
+        """
+        raise NotImplementedError
+
+    @classmethod
+    def settings(cls) -> str:
+        """
+        Возвращает настройки модуля, от которых зависит результат (входят в ключ кэша).
+
+        Returns:
+            str: Строковое представление настроек; пустая строка — настроек нет.
+        """
+        return ""
+
+
+def register_metric(cls: type[MetricModule]) -> type[MetricModule]:
+    """
+    Декоратор класса: регистрирует модуль метрики.
+
+    Ошибки объявления модуля обнаруживаются здесь, при импорте, а не при первом
+    построении графика или таблицы в окне статистики.
+
+    Raises:
+        ValueError: Если модуль с таким именем уже зарегистрирован или view неизвестен.
+        TypeError: Если модуль не переопределяет метод показа, соответствующий view.
+    """
+    if cls.name in _REGISTRY:
+        raise ValueError(f"Модуль метрики '{cls.name}' уже зарегистрирован")
+    if cls.view not in _VIEW_METHODS:
+        raise ValueError(f"Модуль метрики '{cls.name}': неизвестный способ показа '{cls.view}'")
+    method = _VIEW_METHODS[cls.view]
+    if getattr(cls, method).__func__ is getattr(MetricModule, method).__func__:
+        raise TypeError(f"Модуль метрики '{cls.name}' с view = \"{cls.view}\" должен реализовать {method}")
+    _REGISTRY[cls.name] = cls
+    return cls
+
+
+def registered_metrics() -> list[type[MetricModule]]:
+    """Возвращает классы зарегистрированных модулей в порядке регистрации."""
+    return list(_REGISTRY.values())
+
+
+def get_metric(name: str) -> type[MetricModule]:
+    """
+    Возвращает класс модуля по имени.
+
+    Raises:
+        KeyError: Если модуль не зарегистрирован.
+    """
+    return _REGISTRY[name]
+
+
+def position_bin_count(length: int) -> int:
+    """Возвращает количество интервалов позиций, покрывающих риды длиной до length."""
+    return int(np.searchsorted(POSITION_BIN_STARTS, length))
+
+
+def position_bins(positions: np.ndarray) -> np.ndarray:
+    """Возвращает номера интервалов для позиций рида (с нуля) или длин ридов."""
+    return np.searchsorted(POSITION_BIN_STARTS, positions, side='right') - 1
+
+
+def bin_positions(values: np.ndarray) -> np.ndarray:
+    """Суммирует значения по позициям (первая ось массива) в интервалы позиций."""
+    if len(values) <= EXACT_POSITIONS:
+        return values
+    return np.add.reduceat(values, POSITION_BIN_STARTS[:position_bin_count(len(values))], axis=0)
+
+
+def batch_position_bins(batch: "FastqBatch") -> np.ndarray:
+    """
+    Возвращает номер интервала позиций для каждого столбца матриц пакета.
+
+    Модули считают гистограммы сразу по интервалам (смещая индексы np.bincount на номер
+    интервала, а не позиции), поэтому промежуточные матрицы не растут с длиной рида.
+    Результат вычисляется один раз на пакет.
+    """
+    bins = batch.derived.get("position_bins")
+    if bins is None:
+        bins = position_bins(np.arange(batch.sequences.shape[1]))
+        batch.derived["position_bins"] = bins
+    return bins
+
+
+def batch_padding(batch: "FastqBatch") -> np.ndarray:
+    """
+    Возвращает для каждой позиции пакета число ридов, которые короче этой позиции.
+
+    В матрицах пакета такие ячейки заполнены нулями, и модули вычитают их из гистограмм,
+    построенных по всей матрице. Результат вычисляется один раз на пакет.
+    """
+    padding = batch.derived.get("padding")
+    if padding is None:
+        width = batch.sequences.shape[1]
+        padding = np.cumsum(np.bincount(batch.lengths, minlength=width + 1))[:width]
+        batch.derived["padding"] = padding
+    return padding
+
+
+def batch_base_codes(batch: "FastqBatch") -> np.ndarray:
+    """
+    Возвращает матрицу индексов нуклеотидов (см. BASES) для пакета.
+
+    Нулевое дополнение справа попадает в N. Результат вычисляется один раз на пакет
+    и используется всеми модулями, которым нужен нуклеотидный состав.
+    """
+    codes = batch.derived.get("base_codes")
+    if codes is None:
+        codes = BASE_CODES[batch.sequences]
+        batch.derived["base_codes"] = codes
+    return codes
+
+
+def batch_distinct_sequences(batch: "FastqBatch") -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Возвращает 64-битные хэши различных последовательностей пакета.
+
+    Хэш не зависит от ширины матрицы пакета: нуклеотиды кодируются числами 1–5,
+    позиции за концом рида — нулём, а длина рида подмешивается отдельно. Строчные и
+    прописные буквы не различаются. Риды длиннее TRUNCATE_ABOVE хэшируются по первым
+    TRUNCATE_TO нуклеотидам. Результат вычисляется один раз на пакет.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: Отсортированные хэши uint64, число ридов
+            с каждым хэшем и номер первого такого рида в пакете.
+    """
+    distinct = batch.derived.get("distinct_sequences")
+    if distinct is None:
+        lengths = np.where(batch.lengths > TRUNCATE_ABOVE, TRUNCATE_TO, batch.lengths)
+        width = int(lengths.max())
+        codes = batch_base_codes(batch)[:, :width].astype(np.uint64) + np.uint64(1)
+        codes[np.arange(width) >= lengths[:, None]] = 0
+
+        with np.errstate(over='ignore'):
+            hashes = codes @ _HASH_POWERS[:width] + lengths.astype(np.uint64) * _GOLDEN
+            # Финальное перемешивание splitmix64: старшие биты должны быть равномерными,
+            # так как по ним модули отбирают выборку
+            hashes ^= hashes >> np.uint64(30)
+            hashes *= _MIX_1
+            hashes ^= hashes >> np.uint64(27)
+            hashes *= _MIX_2
+            hashes ^= hashes >> np.uint64(31)
+
+        unique, first, counts = np.unique(hashes, return_index=True, return_counts=True)
+        distinct = (unique, counts, first)
+        batch.derived["distinct_sequences"] = distinct
+    return distinct
+
+
+def batch_sequence_text(batch: "FastqBatch", row: int) -> str:
+    """Возвращает последовательность рида пакета в том виде, в каком она хэшируется (см. выше)."""
+    length = int(batch.lengths[row])
+    if length > TRUNCATE_ABOVE:
+        length = TRUNCATE_TO
+    return bytes(batch.sequences[row, :length]).decode("ascii").upper()
+
+
+def grow_rows(array: np.ndarray, rows: int) -> np.ndarray:
+    """Возвращает массив, дополненный нулевыми строками до rows строк (с удвоением ёмкости)."""
+    capacity = array.shape[0]
+    if rows <= capacity:
+        return array
+    new_capacity = max(rows, capacity * 2)
+    return np.pad(array, [(0, new_capacity - capacity)] + [(0, 0)] * (array.ndim - 1))
+
+
+class PositionalMetric(MetricModule):
+    """
+    Основа модулей с гистограммой по позициям в риде (интервал позиций × столбцы).
+
+    Строки матрицы — интервалы позиций (см. POSITION_BIN_STARTS): для коротких ридов
+    каждая позиция образует свой интервал, а для длинных память и размер результатов
+    ограничены числом интервалов, а не длиной рида. Матрица counts расширяется с удвоением
+    ёмкости при появлении более длинных ридов. Подклассы задают число столбцов и реализуют
+    _count(batch), возвращающий вклад пакета.
+
+    Attributes:
+        counts (np.ndarray): Матрица int64 размера (ёмкость × columns).
+        max_length (int): Максимальная длина учтённого рида.
+    """
+
+    columns: ClassVar[int]
+    INITIAL_LENGTH: ClassVar[int] = 256
+
+    def __init__(self):
+        """Инициализирует пустую гистограмму."""
+        self.counts = np.zeros((self.INITIAL_LENGTH, self.columns), dtype=np.int64)
+        self.max_length = 0
+
+    @abstractmethod
+    def _count(self, batch: "FastqBatch") -> np.ndarray:
+        """
+        Возвращает вклад пакета: матрицу (интервалы позиций пакета × columns).
+
+        Число строк равно position_bin_count(ширина пакета); номер интервала для каждого
+        столбца матриц пакета возвращает batch_position_bins.
+        """
+
+    @property
+    def bins(self) -> int:
+        """Количество интервалов позиций, покрывающих учтённые риды."""
+        return position_bin_count(self.max_length)
+
+    def positions(self) -> List[int]:
+        """Возвращает начала интервалов позиций (с нуля) — ось X графиков по позициям."""
+        return POSITION_BIN_STARTS[:self.bins].tolist()
+
+    def update_batch(self, batch: "FastqBatch"):
+        """Добавляет в гистограмму вклад пакета ридов."""
+        if len(batch) == 0:
+            return
+        width = batch.sequences.shape[1]
+        bins = position_bin_count(width)
+        self.counts = grow_rows(self.counts, bins)
+        self.counts[:bins] += self._count(batch)
+        self.max_length = max(self.max_length, width)
+
+    def _check_columns(self, columns: int):
+        """Проверяет, что гистограмма другого экземпляра имеет то же число столбцов."""
+        if columns != self.counts.shape[1]:
+            raise ValueError(f"Модуль '{self.name}': число столбцов гистограммы различается "
+                             f"({self.counts.shape[1]} и {columns}) — модули настроены по-разному")
+
+    def merge(self, other: "PositionalMetric"):
+        """
+        Складывает гистограммы.
+
+        Raises:
+            ValueError: Если число столбцов гистограмм различается (разные настройки модулей).
+        """
+        self._check_columns(other.counts.shape[1])
+        bins = other.bins
+        self.counts = grow_rows(self.counts, bins)
+        self.counts[:bins] += other.counts[:bins]
+        self.max_length = max(self.max_length, other.max_length)
+
+    def get_state(self) -> Dict[str, np.ndarray]:
+        """Возвращает гистограмму, обрезанную по максимальной длине рида, и эту длину."""
+        return {'counts': self.counts[:self.bins],
+                'max_length': np.array(self.max_length, dtype=np.int64)}
+
+    def set_state(self, state: Dict[str, np.ndarray]):
+        """
+        Восстанавливает гистограмму.
+
+        Raises:
+            ValueError: Если число столбцов сохранённой гистограммы отличается от текущего.
+        """
+        counts = state['counts']
+        self._check_columns(counts.shape[1])
+        self.max_length = int(state['max_length'])
+        self.counts = grow_rows(np.zeros((1, self.columns), dtype=np.int64), len(counts))
+        self.counts[:len(counts)] = counts
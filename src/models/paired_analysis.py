@@ -0,0 +1,337 @@
+import hashlib
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+from .fastq_reader import FastqReader
+from .fastq_plots import AnalysisCancelled, run_preview_analysis
+from .profiler import Profiler, NULL_PROFILER
+from .record_index import RecordIndex
+from .stats_accumulator import StatsAccumulator, apply_metric_settings, metric_settings
+
+# Подписи прямых и обратных ридов
+MATE_LABELS = ("R1", "R2")
+
+# Суффиксы идентификатора в старом формате Illumina, различающиеся у ридов пары
+_MATE_SUFFIXES = (b"/1", b"/2")
+
+# Период отправки прогресса из процессов-обработчиков (секунды)
+PROGRESS_INTERVAL = 0.2
+
+# Очередь прогресса и событие отмены процесса-обработчика (задаются инициализатором пула)
+_progress_queue = None
+_cancel_event = None
+
+
+def mate_id(header: bytes) -> bytes:
+    """
+    Возвращает идентификатор рида без суффикса, которым различаются риды пары.
+
+    Отбрасываются описание после первого пробела ('1:N:0:...' в формате CASAVA 1.8+)
+    и окончание '/1' или '/2' (старый формат Illumina).
+
+    Args:
+        header (bytes): Заголовок рида без '@'.
+
+    Returns:
+        bytes: Идентификатор, одинаковый для R1 и R2 одной пары.
+    """
+    name = header.split(None, 1)[0] if header.strip() else b""
+    return name[:-2] if name.endswith(_MATE_SUFFIXES) else name
+
+
+def _mate_difference(first: str, second: str) -> tuple[str, str] | None:
+    """Возвращает единственную пару различающихся символов имён файлов или None."""
+    if len(first) != len(second):
+        return None
+    differences = [(x, y) for x, y in zip(first, second) if x != y]
+    return differences[0] if len(differences) == 1 else None
+
+
+def are_mates(first: str | Path, second: str | Path) -> bool:
+    """
+    Проверяет, похожи ли имена файлов на пару R1/R2: имена отличаются ровно в одном
+    символе, и это '1' и '2' (sample_R1.fastq.gz / sample_R2.fastq.gz, reads_1.fq / reads_2.fq).
+    """
+    difference = _mate_difference(Path(first).name, Path(second).name)
+    return difference is not None and set(difference) == {"1", "2"}
+
+
+def order_mates(first: str | Path, second: str | Path) -> tuple[Path, Path]:
+    """
+    Упорядочивает файлы пары: R1, затем R2.
+
+    Если имена файлов похожи на пару (см. are_mates), порядок определяется по
+    различающемуся символу, иначе файлы упорядочиваются по имени.
+
+    Returns:
+        tuple[Path, Path]: Пути к R1 и R2.
+    """
+    first, second = Path(first), Path(second)
+    if are_mates(first, second):
+        return (first, second) if _mate_difference(first.name, second.name)[0] == "1" else (second, first)
+    return (first, second) if first.name <= second.name else (second, first)
+
+
+class MateIdDigest:
+    """
+    Потоковая сводка идентификаторов ридов для проверки синхронности пары.
+
+    Идентификаторы (см. mate_id) хэшируются блоками по BLOCK_READS ридов. Процессы,
+    читающие R1 и R2, не обмениваются идентификаторами: достаточно сравнить списки
+    хэшей блоков, а при расхождении найти первый несовпадающий рид в одном блоке.
+
+    Attributes:
+        digests (List[bytes]): Хэши завершённых блоков.
+        reads (int): Количество учтённых ридов.
+    """
+
+    BLOCK_READS = 65536
+
+    def __init__(self):
+        """Инициализирует пустую сводку."""
+        self.digests: List[bytes] = []
+        self.reads = 0
+        self._hash = hashlib.blake2b(digest_size=16)
+        self._in_block = 0
+
+    def update(self, headers: List[bytes]):
+        """
+        Добавляет заголовки очередного пакета ридов.
+
+        Args:
+            headers (List[bytes]): Заголовки ридов без '@' (см. FastqBatch.headers).
+        """
+        position = 0
+        while position < len(headers):
+            take = min(self.BLOCK_READS - self._in_block, len(headers) - position)
+            ids = [mate_id(header) for header in headers[position:position + take]]
+            self._hash.update(b"\n".join(ids) + b"\n")
+            position += take
+            self._in_block += take
+            if self._in_block == self.BLOCK_READS:
+                self.digests.append(self._hash.digest())
+                self._hash = hashlib.blake2b(digest_size=16)
+                self._in_block = 0
+        self.reads += len(headers)
+
+    def finish(self) -> List[bytes]:
+        """Завершает последний неполный блок и возвращает хэши всех блоков."""
+        if self._in_block:
+            self.digests.append(self._hash.digest())
+            self._hash = hashlib.blake2b(digest_size=16)
+            self._in_block = 0
+        return self.digests
+
+
+def _views_from(reader: FastqReader, start: int):
+    """
+    Возвращает итератор записей файла, начиная с записи start (см. FastqReader.read_views).
+
+    При наличии сохранённого индекса записей (RecordIndex) чтение начинается с ближайшей
+    предшествующей записи из индекса, иначе файл просматривается с начала.
+    """
+    offset, record = 0, 0
+    if start and reader.index is not None:
+        if start >= reader.index.total_records:
+            return iter(())
+        offset, record = reader.index.record_offset(start)
+    views = reader.read_views(offset)
+    for _ in range(start - record):
+        if next(views, None) is None:
+            break
+    return views
+
+
+def find_first_mismatch(r1: str | Path, r2: str | Path, start: int = 0) -> Dict[str, Any] | None:
+    """
+    Находит первую пару ридов с разными идентификаторами, начиная с рида start.
+
+    Если для файла сохранён индекс записей (см. RecordIndex, опция --index), чтение
+    начинается рядом с ридом start; без индекса предшествующие риды приходится прочитать
+    (но не сравнивать).
+
+    Args:
+        r1 (str | Path): Путь к файлу R1.
+        r2 (str | Path): Путь к файлу R2.
+        start (int): Номер рида (с нуля), с которого начинать сравнение.
+
+    Returns:
+        Dict[str, Any] | None: {'read': номер рида, 'r1': id, 'r2': id} (None вместо id,
+            если в файле закончились риды) или None, если расхождений нет.
+    """
+    with FastqReader(r1, index=RecordIndex.load(r1)) as first, \
+            FastqReader(r2, index=RecordIndex.load(r2)) as second:
+        views1, views2 = _views_from(first, start), _views_from(second, start)
+        index = start
+        while True:
+            view1 = next(views1, None)
+            view2 = next(views2, None)
+            if view1 is None and view2 is None:
+                return None
+            id1 = mate_id(bytes(view1[0])) if view1 is not None else None
+            id2 = mate_id(bytes(view2[0])) if view2 is not None else None
+            if id1 != id2:
+                return {
+                    'read': index,
+                    'r1': id1.decode("ascii", "replace") if id1 is not None else None,
+                    'r2': id2.decode("ascii", "replace") if id2 is not None else None
+                }
+            index += 1
+
+
+def _init_mate_worker(progress_queue, cancel_event, settings):
+    """
+    Инициализатор процесса-обработчика: сохраняет очередь прогресса и событие отмены
+    и устанавливает настройки модулей метрик основного процесса (см. metric_settings).
+    """
+    global _progress_queue, _cancel_event
+    _progress_queue = progress_queue
+    _cancel_event = cancel_event
+    apply_metric_settings(settings)
+
+
+def _analyze_mate(file_path: str | Path, mate: int) -> tuple[StatsAccumulator, List[bytes], dict] | None:
+    """
+    Анализирует один файл пары в процессе-обработчике.
+
+    Returns:
+        tuple | None: Накопитель, хэши блоков идентификаторов и замеры этапов;
+            None, если анализ отменён.
+    """
+    profiler = Profiler()
+    accumulator = StatsAccumulator()
+    digest = MateIdDigest()
+    last_report = 0.0
+    with FastqReader(file_path, profiler=profiler) as reader:
+        for batch in reader.read_batches():
+            if _cancel_event is not None and _cancel_event.is_set():
+                return None
+            with profiler.stage("accumulate", reads=len(batch)):
+                accumulator.update_batch(batch)
+            with profiler.stage("mate_ids", reads=len(batch)):
+                digest.update(batch.headers())
+            if _progress_queue is not None and time.monotonic() - last_report >= PROGRESS_INTERVAL:
+                _progress_queue.put((mate, reader.bytes_consumed, reader.total_bytes,
+                                     accumulator.total_sequences))
+                last_report = time.monotonic()
+    return accumulator, digest.finish(), profiler.report()
+
+
+def _check_input(file_path: Path):
+    """Проверяет, что файл существует и не пуст."""
+    if not file_path.exists():
+        raise FileNotFoundError(f"Файл не найден: {file_path}")
+    if file_path.stat().st_size == 0:
+        raise RuntimeError(f"Файл пуст: {file_path}")
+
+
+def run_paired_analysis(r1: str | Path, r2: str | Path,
+                        progress_callback: Callable[[int, int, int], None] | None = None,
+                        cancel_event: threading.Event | None = None,
+                        profiler: Profiler | None = None) -> Dict[str, Any]:
+    """
+    Анализирует пару файлов R1/R2 одновременно в двух процессах.
+
+    Каждый процесс собирает статистику своего файла и сводку идентификаторов
+    (MateIdDigest), поэтому общее время близко ко времени анализа одного файла.
+    После завершения сводки сравниваются; при расхождении первый несовпадающий рид
+    ищется повторным чтением пары, в котором сравниваются только риды начиная с первого
+    отличающегося блока. С индексом записей (RecordIndex) чтение начинается с этого блока,
+    без индекса файлы читаются с начала (см. find_first_mismatch).
+
+    Args:
+        r1 (str | Path): Путь к файлу R1.
+        r2 (str | Path): Путь к файлу R2.
+        progress_callback (Callable | None): Вызывается с аргументами (обработано байтов
+            обоих файлов, общий размер, обработано ридов обоих файлов).
+        cancel_event (threading.Event | None): Событие отмены.
+        profiler (Profiler | None): Сборщик времени этапов. None — создаётся новый.
+
+    Returns:
+        Dict[str, Any]: {'mates': [результаты R1, результаты R2] (формат run_analysis),
+            'pairing': {'reads': [риды R1, риды R2], 'in_sync': bool,
+            'first_mismatch': dict | None}, 'partial': False, 'diagnostics': замеры}.
+
+    Raises:
+        AnalysisCancelled: Если анализ был отменён через cancel_event.
+    """
+    paths = [Path(r1), Path(r2)]
+    for path in paths:
+        _check_input(path)
+    if profiler is None:
+        profiler = Profiler()
+
+    context = multiprocessing.get_context()
+    worker_cancel = context.Event()
+    progress_queue = context.Queue()
+    done_bytes, total_bytes, reads = [0, 0], [path.stat().st_size for path in paths], [0, 0]
+
+    def drain_progress(timeout: float):
+        # Ожидает первое сообщение не дольше timeout, остальные забирает без ожидания
+        try:
+            while True:
+                mate, done, total, count = progress_queue.get(timeout=timeout)
+                done_bytes[mate], total_bytes[mate], reads[mate] = done, total, count
+                timeout = 0
+                if progress_callback:
+                    progress_callback(sum(done_bytes), sum(total_bytes), sum(reads))
+        except queue.Empty:
+            pass
+
+    with profiler.stage("mates"):
+        with ProcessPoolExecutor(max_workers=2, mp_context=context, initializer=_init_mate_worker,
+                                 initargs=(progress_queue, worker_cancel, metric_settings())) as executor:
+            futures = [executor.submit(_analyze_mate, path, mate) for mate, path in enumerate(paths)]
+            while not all(future.done() for future in futures):
+                if cancel_event is not None and cancel_event.is_set():
+                    worker_cancel.set()
+                # Ошибка в одном файле останавливает обработку другого
+                if any(future.done() and future.exception() is not None for future in futures):
+                    worker_cancel.set()
+                drain_progress(timeout=0.1)
+            drain_progress(timeout=0)
+            outputs = [future.result() for future in futures]
+
+    if any(output is None for output in outputs):
+        raise AnalysisCancelled()
+
+    accumulators = [output[0] for output in outputs]
+    for _, _, report in outputs:
+        profiler.merge(report)
+    for path, accumulator in zip(paths, accumulators):
+        if accumulator.total_sequences == 0:
+            raise RuntimeError(f"В файле {path.name} не найдено действительных последовательностей.")
+
+    pairing = {
+        'reads': [accumulator.total_sequences for accumulator in accumulators],
+        'in_sync': True,
+        'first_mismatch': None
+    }
+    digests1, digests2 = outputs[0][1], outputs[1][1]
+    if digests1 != digests2:
+        with profiler.stage("mate_ids"):
+            block = next((i for i, (a, b) in enumerate(zip(digests1, digests2)) if a != b),
+                         min(len(digests1), len(digests2)))
+            pairing['in_sync'] = False
+            pairing['first_mismatch'] = find_first_mismatch(paths[0], paths[1],
+                                                            block * MateIdDigest.BLOCK_READS)
+
+    with profiler.stage("aggregate"):
+        mates = [dict(accumulator.to_result(), partial=False) for accumulator in accumulators]
+    return {'mates': mates, 'pairing': pairing, 'partial': False, 'diagnostics': profiler.report()}
+
+
+def run_paired_preview(r1: str | Path, r2: str | Path,
+                       profiler: Profiler = NULL_PROFILER) -> Dict[str, Any]:
+    """
+    Быстро оценивает метрики обоих файлов пары по выборке ридов (см. run_preview_analysis).
+
+    Returns:
+        Dict[str, Any]: Словарь формата run_paired_analysis с 'pairing': None и 'partial': True.
+    """
+    mates = [run_preview_analysis(path, profiler=profiler) for path in (r1, r2)]
+    return {'mates': mates, 'pairing': None, 'partial': True}
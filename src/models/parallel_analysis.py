@@ -0,0 +1,178 @@
+import functools
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable
+from .fastq_reader import FastqReader
+from .profiler import Profiler, NULL_PROFILER
+from .record_index import RecordIndex
+from .stats_accumulator import StatsAccumulator, apply_metric_settings, metric_settings
+
+# Минимальный размер фрагмента: более мелкое деление не окупает запуск задач
+MIN_SHARD_SIZE = 8 * 1024 * 1024
+# Количество фрагментов на один процесс (для выравнивания нагрузки)
+SHARDS_PER_WORKER = 4
+
+
+def default_workers() -> int:
+    """Возвращает количество процессов по умолчанию — число доступных ядер."""
+    return os.cpu_count() or 1
+
+
+def compute_shards(file_path: str | Path, n_shards: int,
+                   index: RecordIndex | None = None) -> list[tuple[int, int]]:
+    """
+    Делит FASTQ-файл на диапазоны байтов, выровненные по границам записей.
+
+    Без индекса границы записей ищутся эвристически (см. FastqReader.align_to_record),
+    и делить можно только несжатый файл. С индексом файл (в том числе gzip) делится
+    по сохранённым смещениям записей на фрагменты с примерно равным числом записей.
+
+    Args:
+        file_path (str | Path): Путь к FASTQ-файлу.
+        n_shards (int): Желаемое количество фрагментов.
+        index (RecordIndex | None): Индекс записей файла.
+
+    Returns:
+        list[tuple[int, int]]: Непустые диапазоны [start, end) в порядке следования в файле
+            (для gzip — в распакованных данных).
+    """
+    if index is not None:
+        return index.record_ranges(max(1, min(n_shards, index.uncompressed_size // MIN_SHARD_SIZE)))
+
+    reader = FastqReader(file_path)
+    size = Path(file_path).stat().st_size
+    n_shards = max(1, min(n_shards, size // MIN_SHARD_SIZE))
+
+    boundaries = [reader.align_to_record(size * i // n_shards) for i in range(n_shards)]
+    boundaries.append(size)
+
+    return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if start < end]
+
+
+def analyze_shard(file_path: str | Path, start: int, end: int,
+                  profiler: Profiler = NULL_PROFILER,
+                  index: RecordIndex | None = None) -> StatsAccumulator:
+    """
+    Собирает статистику по записям, начинающимся в диапазоне [start, end).
+
+    Args:
+        file_path (str | Path): Путь к FASTQ-файлу.
+        start (int): Начало диапазона (начало записи).
+        end (int): Конец диапазона.
+        profiler (Profiler): Сборщик времени этапов чтения и накопления.
+        index (RecordIndex | None): Индекс записей (обязателен для gzip-файла).
+
+    Returns:
+        StatsAccumulator: Накопитель со статистикой фрагмента.
+    """
+    accumulator = StatsAccumulator()
+    with FastqReader(file_path, profiler=profiler, index=index) as reader:
+        for batch in reader.read_batches(start=start, end=end):
+            with profiler.stage("accumulate", reads=len(batch)):
+                accumulator.update_batch(batch)
+    return accumulator
+
+
+@functools.lru_cache(maxsize=4)
+def _worker_index(file_path: str | Path) -> RecordIndex | None:
+    """Загружает индекс записей в процессе-обработчике один раз на все его фрагменты."""
+    return RecordIndex.load(file_path)
+
+
+def _analyze_shard_profiled(file_path: str | Path, start: int, end: int,
+                            indexed: bool = False) -> tuple[StatsAccumulator, dict]:
+    """
+    Анализирует фрагмент в процессе-обработчике и возвращает накопитель вместе с замерами этапов.
+
+    Индекс записей не передаётся в процесс (окна точек доступа gzip могут занимать мегабайты),
+    а загружается из файла индекса.
+    """
+    profiler = Profiler()
+    accumulator = analyze_shard(file_path, start, end, profiler,
+                                _worker_index(file_path) if indexed else None)
+    return accumulator, profiler.report()
+
+
+def run_sharded_analysis(file_path: str | Path, workers: int,
+                         progress_callback: Callable[[int, int, int], None] | None = None,
+                         cancel_event: threading.Event | None = None,
+                         merge_callback: Callable[[StatsAccumulator], None] | None = None,
+                         profiler: Profiler = NULL_PROFILER,
+                         index: RecordIndex | None = None) -> StatsAccumulator | None:
+    """
+    Анализирует FASTQ-файл параллельно в пуле процессов.
+
+    Файл делится на фрагменты по границам записей, каждый фрагмент анализируется
+    в отдельном процессе, а накопители фрагментов сливаются в порядке фрагментов в файле
+    (а не в порядке завершения), поэтому повторные запуски дают одинаковый результат.
+    Результат совпадает с однопроцессным анализом, кроме оценок сверхпредставленных
+    последовательностей: сводка OverrepresentedSequences зависит от разбиения на фрагменты,
+    но остаётся в пределах своей границы погрешности (см. StatsAccumulator.merge).
+
+    gzip-файл можно анализировать параллельно только с индексом записей, сохранённым
+    на диске (см. RecordIndex.load): процессы распаковывают фрагменты с точек доступа.
+
+    Args:
+        file_path (str | Path): Путь к FASTQ-файлу.
+        workers (int): Количество процессов.
+        progress_callback (Callable | None): Вызывается после каждого фрагмента с аргументами
+            (обработано байтов, всего байтов, обработано ридов).
+        cancel_event (threading.Event | None): Если событие установлено, оставшиеся
+            фрагменты отменяются и функция возвращает None.
+        merge_callback (Callable | None): Вызывается с текущим накопителем после слияния
+            каждого фрагмента (для промежуточных результатов).
+        profiler (Profiler): Сборщик времени. Замеры процессов-обработчиков суммируются,
+            поэтому время этапов может превышать общее время анализа.
+        index (RecordIndex | None): Индекс записей файла. Для gzip прогресс считается
+            в распакованных байтах.
+
+    Returns:
+        StatsAccumulator | None: Накопитель со статистикой всего файла или None при отмене.
+    """
+    shards = compute_shards(file_path, workers * SHARDS_PER_WORKER, index)
+    total_bytes = index.uncompressed_size if index is not None else Path(file_path).stat().st_size
+    done_bytes = 0
+
+    accumulator = StatsAccumulator()
+    if len(shards) <= 1 or workers <= 1:
+        for start, end in shards:
+            if cancel_event is not None and cancel_event.is_set():
+                return None
+            accumulator.merge(analyze_shard(file_path, start, end, profiler, index))
+            done_bytes += end - start
+            if progress_callback:
+                progress_callback(done_bytes, total_bytes, accumulator.total_sequences)
+            if merge_callback:
+                merge_callback(accumulator)
+        return accumulator
+
+    # Настройки модулей (библиотека адаптеров и т.д.) передаются явно: при запуске методом
+    # spawn обработчики не наследуют атрибуты классов, заданные в основном процессе
+    with ProcessPoolExecutor(max_workers=min(workers, len(shards)), initializer=apply_metric_settings,
+                             initargs=(metric_settings(),)) as executor:
+        futures = {executor.submit(_analyze_shard_profiled, file_path, start, end,
+                                   index is not None): number
+                   for number, (start, end) in enumerate(shards)}
+        # Готовые фрагменты ждут слияния, пока не будут слиты все предшествующие
+        finished = {}
+        next_shard = 0
+        for future in as_completed(futures):
+            if cancel_event is not None and cancel_event.is_set():
+                executor.shutdown(wait=False, cancel_futures=True)
+                return None
+            shard, report = future.result()
+            profiler.merge(report)
+            finished[futures[future]] = shard
+            while next_shard in finished:
+                accumulator.merge(finished.pop(next_shard))
+                start, end = shards[next_shard]
+                done_bytes += end - start
+                next_shard += 1
+                if progress_callback:
+                    progress_callback(done_bytes, total_bytes, accumulator.total_sequences)
+                if merge_callback:
+                    merge_callback(accumulator)
+
+    return accumulator
@@ -0,0 +1,92 @@
+from typing import Any, Tuple, TYPE_CHECKING
+import numpy as np
+
+if TYPE_CHECKING:
+    from matplotlib.axes import Axes
+
+# Минимальное количество интервалов прореживания (если ширина осей ещё неизвестна или мала)
+MIN_BUCKETS = 200
+# Прореживание включается, если точек в видимом диапазоне больше, чем DECIMATE_ABOVE на пиксель
+DECIMATE_ABOVE = 2
+
+
+def minmax_decimate(x: np.ndarray, y: np.ndarray, x_min: float, x_max: float,
+                    buckets: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Прореживает линию в диапазоне [x_min, x_max], сохраняя минимумы и максимумы.
+
+    Диапазон делится на buckets равных по X интервалов (по одному на пиксель), и в каждом
+    остаются только точки с наименьшим и наибольшим значением — в порядке следования.
+    Отрисованная линия проходит через те же пиксели, что и полная, поэтому пики и провалы
+    не теряются, а число точек не превышает 2 × buckets. Также сохраняются первая и
+    последняя точки и по одной точке за краями диапазона, чтобы линия доходила до краёв осей.
+
+    Args:
+        x (np.ndarray): Координаты X по возрастанию.
+        y (np.ndarray): Значения.
+        x_min (float): Левая граница видимого диапазона.
+        x_max (float): Правая граница видимого диапазона.
+        buckets (int): Количество интервалов (обычно ширина осей в пикселях).
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Координаты и значения оставленных точек.
+    """
+    first = max(int(np.searchsorted(x, x_min)) - 1, 0)
+    last = min(int(np.searchsorted(x, x_max, side='right')) + 1, len(x))
+    x, y = x[first:last], y[first:last]
+    if len(x) <= DECIMATE_ABOVE * buckets or x_max <= x_min:
+        return x, y
+
+    ids = np.clip(((x - x_min) * (buckets / (x_max - x_min))).astype(np.int64), -1, buckets)
+    # X упорядочены, поэтому точки каждого интервала идут подряд
+    starts = np.flatnonzero(np.diff(ids, prepend=ids[0] - 1))
+    counts = np.diff(starts, append=len(x))
+    keep = [[0, len(x) - 1]]
+    for reduce in (np.minimum, np.maximum):
+        extreme = np.repeat(reduce.reduceat(y, starts), counts)
+        # Первая точка интервала, на которой достигается экстремум
+        hits = np.flatnonzero(y == extreme)
+        keep.append(hits[np.diff(ids[hits], prepend=ids[0] - 1) != 0])
+    keep = np.unique(np.concatenate(keep))
+    return x[keep], y[keep]
+
+
+class DecimatedLine:
+    """
+    Линия графика по большому числу точек, которая показывает прореженные данные
+    (см. minmax_decimate) и пересчитывает их при изменении видимого диапазона оси X
+    (масштабирование и сдвиг панелью инструментов).
+
+    Число отрисовываемых точек определяется шириной осей в пикселях, а не количеством
+    данных; при увеличении масштаба показывается больше деталей.
+
+    Attributes:
+        line (Line2D): Линия matplotlib.
+    """
+
+    def __init__(self, ax: "Axes", x: Any, y: Any, **kwargs):
+        """
+        Строит линию на осях и подписывается на изменение диапазона оси X.
+
+        Args:
+            ax (Axes): Оси.
+            x (Any): Координаты X по возрастанию.
+            y (Any): Значения.
+            **kwargs: Параметры ax.plot (цвет, толщина, подпись и т.д.).
+        """
+        self._x = np.asarray(x, dtype=float)
+        self._y = np.asarray(y, dtype=float)
+        self.line, = ax.plot(*self._decimated(ax, self._x[0], self._x[-1]), **kwargs)
+        # Функция, в отличие от метода, хранится в callbacks по сильной ссылке и удерживает объект
+        ax.callbacks.connect('xlim_changed', lambda axes: self._update(axes))
+
+    def _decimated(self, ax: "Axes", x_min: float, x_max: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Возвращает прореженные точки диапазона с числом интервалов по ширине осей."""
+        buckets = max(int(ax.get_window_extent().width), MIN_BUCKETS)
+        return minmax_decimate(self._x, self._y, x_min, x_max, buckets)
+
+    def _update(self, ax: "Axes"):
+        """Пересчитывает точки линии для нового диапазона оси X."""
+        x_min, x_max = sorted(ax.get_xlim())
+        self.line.set_data(*self._decimated(ax, x_min, x_max))
+
@@ -0,0 +1,106 @@
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, Iterator
+
+# Порядок вывода известных этапов; прочие этапы выводятся после них в порядке появления
+STAGE_ORDER = ("cache", "decompress", "parse", "quality", "accumulate", "mate_ids", "shards", "mates",
+               "aggregate", "figure.length", "figure.quality", "figure.content", "figure.per_sequence_quality",
+               "figure.gc_content", "figure.n_content", "figure.q30", "figure.duplication",
+               "figure.adapter_content", "render", "show_plot")
+
+
+class Profiler:
+    """
+    Сборщик времени выполнения по этапам обработки.
+
+    Для каждого этапа накапливаются число вызовов, астрономическое время, процессорное
+    время потока (time.thread_time) и произвольные счётчики (байты, риды, нуклеотиды).
+    Замер этапа стоит два вызова таймеров, поэтому хуки ставятся на уровне блоков и пакетов,
+    а не отдельных ридов. Методы потокобезопасны: этапы могут выполняться в фоновом
+    потоке анализа и в главном потоке Tk одновременно.
+    """
+
+    def __init__(self):
+        """Инициализирует пустой сборщик."""
+        self._stages: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str, **counters: int) -> Iterator[None]:
+        """
+        Замеряет выполнение блока кода как вызов этапа name.
+
+        Args:
+            name (str): Имя этапа.
+            **counters (int): Счётчики, добавляемые к этапу (например, bytes=..., reads=...).
+        """
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - wall, time.thread_time() - cpu, **counters)
+
+    def add(self, name: str, wall_seconds: float = 0.0, cpu_seconds: float = 0.0,
+            calls: int = 1, **counters: int):
+        """
+        Добавляет к этапу замер, выполненный вне stage().
+
+        Args:
+            name (str): Имя этапа.
+            wall_seconds (float): Астрономическое время.
+            cpu_seconds (float): Процессорное время.
+            calls (int): Количество вызовов.
+            **counters (int): Счётчики этапа.
+        """
+        with self._lock:
+            stats = self._stages.setdefault(name, {"calls": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0})
+            stats["calls"] += calls
+            stats["wall_seconds"] += wall_seconds
+            stats["cpu_seconds"] += cpu_seconds
+            for key, value in counters.items():
+                stats[key] = stats.get(key, 0) + value
+
+    def count(self, name: str, **counters: int):
+        """Добавляет счётчики к этапу, не увеличивая число вызовов и время."""
+        self.add(name, calls=0, **counters)
+
+    def merge(self, report: Dict[str, Dict[str, float]]):
+        """
+        Добавляет замеры из отчёта другого сборщика (например, из процесса-обработчика).
+
+        Args:
+            report (Dict[str, Dict[str, float]]): Результат report() другого сборщика.
+        """
+        for name, stats in report.items():
+            stats = dict(stats)
+            self.add(name, stats.pop("wall_seconds"), stats.pop("cpu_seconds"), stats.pop("calls"), **stats)
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Возвращает копию накопленных замеров.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Этап -> {'calls', 'wall_seconds', 'cpu_seconds', счётчики}.
+                Этапы упорядочены по STAGE_ORDER.
+        """
+        with self._lock:
+            stages = {name: dict(stats) for name, stats in self._stages.items()}
+        order = {name: index for index, name in enumerate(STAGE_ORDER)}
+        return dict(sorted(stages.items(), key=lambda item: order.get(item[0], len(order))))
+
+
+class NullProfiler(Profiler):
+    """Сборщик, который ничего не замеряет. Используется по умолчанию, когда замеры не нужны."""
+
+    def stage(self, name: str, **counters: int):
+        """Возвращает пустой контекстный менеджер."""
+        return nullcontext()
+
+    def add(self, name: str, wall_seconds: float = 0.0, cpu_seconds: float = 0.0,
+            calls: int = 1, **counters: int):
+        """Ничего не делает."""
+
+
+NULL_PROFILER = NullProfiler()
@@ -0,0 +1,204 @@
+from typing import Any, Dict, TYPE_CHECKING
+import numpy as np
+
+from .basic_metrics import PHRED_LEVELS
+from .metric_module import (MetricModule, PositionalMetric, register_metric,
+                            batch_padding, batch_base_codes, bin_positions, BASES)
+from .profiler import Profiler, NULL_PROFILER
+
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+    from .fastq_reader import FastqBatch
+
+
+class _HistogramMetric(MetricModule):
+    """
+    Основа модулей с гистограммой фиксированного размера по ридам.
+
+    Attributes:
+        counts (np.ndarray): Гистограмма int64 из bins ячеек.
+    """
+
+    bins: int
+
+    def __init__(self):
+        """Инициализирует пустую гистограмму."""
+        self.counts = np.zeros(self.bins, dtype=np.int64)
+
+    def merge(self, other: "_HistogramMetric"):
+        """Складывает гистограммы."""
+        self.counts += other.counts
+
+    def get_state(self) -> Dict[str, np.ndarray]:
+        """Возвращает гистограмму."""
+        return {'counts': self.counts}
+
+    def set_state(self, state: Dict[str, np.ndarray]):
+        """Восстанавливает гистограмму."""
+        self.counts = np.array(state['counts'], dtype=np.int64)
+
+
+@register_metric
+class PerSequenceQuality(_HistogramMetric):
+    """Распределение ридов по среднему качеству (как Per sequence quality scores в FastQC)."""
+
+    name = "per_sequence_quality"
+    title = "Распределение ридов по среднему качеству"
+    result_key = "per_sequence_quality"
+    bins = PHRED_LEVELS
+
+    def update_batch(self, batch: "FastqBatch"):
+        """Добавляет средние качества ридов пакета, округлённые до целого."""
+        if len(batch) == 0:
+            return
+        # Нулевое дополнение не меняет сумму, поэтому делим на фактическую длину
+        means = np.rint(batch.qualities.sum(axis=1, dtype=np.int64) / batch.lengths).astype(np.int64)
+        self.counts += np.bincount(means, minlength=self.bins)
+
+    def finalize(self) -> Dict[str, Any]:
+        """Возвращает число ридов для каждого значения среднего качества."""
+        nonzero = np.flatnonzero(self.counts)
+        if not nonzero.size:
+            return {self.result_key: None}
+        qualities = np.arange(nonzero[0], nonzero[-1] + 1)
+        return {self.result_key: {
+            'qualities': qualities.tolist(),
+            'counts': self.counts[qualities].tolist()
+        }}
+
+    @classmethod
+    def create_figure(cls, data: Any, accent_color: str, partial: bool = False,
+                      profiler: Profiler = NULL_PROFILER) -> "Figure":
+        """Строит распределение ридов по среднему качеству."""
+        from .fastq_plots import create_figure_per_sequence_quality
+        return create_figure_per_sequence_quality(data, accent_color, partial=partial, profiler=profiler)
+
+
+@register_metric
+class GCContent(_HistogramMetric):
+    """
+    Распределение ридов по GC-составу (как Per sequence GC content в FastQC).
+
+    GC-состав рида считается от определённых нуклеотидов (без N) и округляется до целого
+    процента. Для сравнения строится нормальное распределение с тем же средним и
+    стандартным отклонением: заметные отличия указывают на загрязнение или смещение.
+    """
+
+    name = "gc_content"
+    title = "Распределение ридов по GC-составу"
+    result_key = "gc_content"
+    bins = 101
+
+    def update_batch(self, batch: "FastqBatch"):
+        """Добавляет GC-состав ридов пакета."""
+        if len(batch) == 0:
+            return
+        codes = batch_base_codes(batch)
+        gc = np.count_nonzero((codes == BASES.index("G")) | (codes == BASES.index("C")), axis=1)
+        # Нулевое дополнение попадает в N: вычитаем его из числа N в риде
+        padding = batch.sequences.shape[1] - batch.lengths
+        defined = batch.lengths - (np.count_nonzero(codes == BASES.index("N"), axis=1) - padding)
+        has_bases = defined > 0
+        percents = np.rint(gc[has_bases] * 100 / defined[has_bases]).astype(np.int64)
+        self.counts += np.bincount(percents, minlength=self.bins)
+
+    def finalize(self) -> Dict[str, Any]:
+        """Возвращает наблюдаемое и теоретическое распределение GC-состава."""
+        total = int(self.counts.sum())
+        if total == 0:
+            return {self.result_key: None}
+
+        percents = np.arange(self.bins)
+        mean = float(self.counts @ percents / total)
+        std = float(np.sqrt(self.counts @ (percents - mean) ** 2 / total))
+        if std > 0:
+            density = np.exp(-0.5 * ((percents - mean) / std) ** 2)
+            theoretical = density / density.sum() * total
+        else:
+            theoretical = self.counts.astype(float)
+        return {self.result_key: {
+            'percents': percents.tolist(),
+            'counts': self.counts.tolist(),
+            'theoretical': theoretical.tolist(),
+            'mean_gc': mean
+        }}
+
+    @classmethod
+    def create_figure(cls, data: Any, accent_color: str, partial: bool = False,
+                      profiler: Profiler = NULL_PROFILER) -> "Figure":
+        """Строит распределение GC-состава с теоретической кривой."""
+        from .fastq_plots import create_figure_gc_content
+        return create_figure_gc_content(data, accent_color, partial=partial, profiler=profiler)
+
+
+@register_metric
+class NContent(PositionalMetric):
+    """Доля неопределённых нуклеотидов (N) по позициям (как Per base N content в FastQC)."""
+
+    name = "n_content"
+    title = "Доля N по позициям"
+    result_key = "n_content"
+    # Столбцы: число N, число ридов, покрывающих позицию
+    columns = 2
+
+    def _count(self, batch: "FastqBatch") -> np.ndarray:
+        """Считает N и покрытие по позициям; нулевое дополнение попадает в N и вычитается."""
+        padding = batch_padding(batch)
+        n_counts = np.count_nonzero(batch_base_codes(batch) == BASES.index("N"), axis=0) - padding
+        return bin_positions(np.column_stack((n_counts, len(batch) - padding)))
+
+    def finalize(self) -> Dict[str, Any]:
+        """Возвращает процент N по позициям."""
+        if not self.max_length:
+            return {self.result_key: None}
+        counts = self.counts[:self.bins]
+        percents = np.divide(counts[:, 0] * 100, counts[:, 1],
+                             out=np.zeros(self.bins), where=counts[:, 1] > 0)
+        return {self.result_key: {
+            'positions': self.positions(),
+            'percents': percents.tolist()
+        }}
+
+    @classmethod
+    def create_figure(cls, data: Any, accent_color: str, partial: bool = False,
+                      profiler: Profiler = NULL_PROFILER) -> "Figure":
+        """Строит график доли N по позициям."""
+        from .fastq_plots import create_figure_n_content
+        return create_figure_n_content(data, accent_color, partial=partial, profiler=profiler)
+
+
+@register_metric
+class Q30ByPosition(PositionalMetric):
+    """Доля оснований с качеством не ниже Q30 в каждой позиции рида."""
+
+    name = "q30"
+    title = "Доля оснований Q30 по позициям"
+    result_key = "q30_by_position"
+    # Столбцы: число оснований с качеством >= Q30, число ридов, покрывающих позицию
+    columns = 2
+    THRESHOLD = 30
+
+    def _count(self, batch: "FastqBatch") -> np.ndarray:
+        """Считает основания Q30+ и покрытие по позициям (дополнение имеет качество 0)."""
+        high = np.count_nonzero(batch.qualities >= self.THRESHOLD, axis=0)
+        return bin_positions(np.column_stack((high, len(batch) - batch_padding(batch))))
+
+    def finalize(self) -> Dict[str, Any]:
+        """Возвращает процент оснований Q30+ по позициям и по всему файлу."""
+        if not self.max_length:
+            return {self.result_key: None}
+        counts = self.counts[:self.bins]
+        percents = np.divide(counts[:, 0] * 100, counts[:, 1],
+                             out=np.zeros(self.bins), where=counts[:, 1] > 0)
+        return {self.result_key: {
+            'positions': self.positions(),
+            'percents': percents.tolist(),
+            'overall_percent': float(counts[:, 0].sum() * 100 / counts[:, 1].sum())
+        }}
+
+    @classmethod
+    def create_figure(cls, data: Any, accent_color: str, partial: bool = False,
+                      profiler: Profiler = NULL_PROFILER) -> "Figure":
+        """Строит график доли оснований Q30 по позициям."""
+        from .fastq_plots import create_figure_q30
+        return create_figure_q30(data, accent_color, partial=partial, profiler=profiler)
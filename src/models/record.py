@@ -1,14 +1,24 @@
+import numpy as np
+
+# Таблица перевода символов качества Phred+33 в оценки (по модулю 256) для bytes.translate
+PHRED_TABLE = bytes((code - 33) % 256 for code in range(256))
+
+
 class Record:
     """
     Базовый класс для представления биологических записей.
 
     Содержит общий идентификатор записи, который может использоваться
-    в различных форматах (FASTA, FASTQ, SAM, VCF и др.).
+    в различных форматах (FASTA, FASTQ, SAM, VCF и др.). Сам класс не хранит атрибутов
+    (пустой __slots__): как хранить id, определяют подклассы, поэтому подкласс, вычисляющий
+    id через свойство, не получает неиспользуемого слота.
 
     Attributes:
         id (str): Уникальный идентификатор записи (например, имя последовательности или координата).
     """
 
+    __slots__ = ()
+
     def __init__(self, id: str):
         """
         Инициализирует базовую запись с заданным идентификатором.
@@ -28,7 +38,33 @@ class Record:
         return f"<Record id={self.id}>"
 
 
-class SequenceRecord(Record):
+class BaseSequenceRecord(Record):
+    """
+    Общий интерфейс записей последовательностей (SequenceRecord, FastqRecord).
+
+    Не хранит атрибутов (пустой __slots__): SequenceRecord хранит id и quality как есть,
+    а FastqRecord вычисляет их из исходных байтов записи.
+
+    Attributes:
+        id (str): Идентификатор последовательности.
+        sequence (str): Биологическая последовательность (например, "ATGCGTA").
+        quality (list[int] | None): Список Phred-оценок качества для каждой позиции
+            (только для FASTQ). Для FASTA — None.
+    """
+
+    __slots__ = ()
+
+    def quality_array(self) -> np.ndarray | None:
+        """
+        Возвращает Phred-оценки качества в виде массива NumPy.
+
+        Returns:
+            np.ndarray | None: Массив int64 с оценками или None, если качество отсутствует.
+        """
+        return None if self.quality is None else np.asarray(self.quality, dtype=np.int64)
+
+
+class SequenceRecord(BaseSequenceRecord):
     """
     Класс для представления последовательностей нуклеотидов или аминокислот.
 
@@ -41,6 +77,8 @@ class SequenceRecord(Record):
             (только для FASTQ). Для FASTA — None.
     """
 
+    __slots__ = ("id", "sequence", "quality")
+
     def __init__(self, id: str, sequence: str, quality: list[int] | None = None):
         """
         Инициализирует запись последовательности.
@@ -56,6 +94,87 @@ class SequenceRecord(Record):
         self.quality = quality
 
 
+class FastqRecord(BaseSequenceRecord):
+    """
+    Компактная запись FASTQ с ленивым разбором идентификатора и качества.
+
+    Хранит исходные байты заголовка и строки качества (1 байт на позицию вместо объекта int
+    в списке). Идентификатор и список Phred-оценок вычисляются при первом обращении
+    и запоминаются, поэтому код, использующий id и quality как у SequenceRecord
+    (общий интерфейс — BaseSequenceRecord), работает без изменений. Для численной
+    обработки без создания списка служит quality_array().
+
+    Attributes:
+        id (str): Идентификатор последовательности (первое слово заголовка).
+        sequence (str): Последовательность в верхнем регистре.
+        quality (list[int]): Список Phred-оценок качества.
+        header (bytes): Заголовок записи без '@'.
+        quality_bytes (bytes): Строка качества в кодировке Phred+33.
+    """
+
+    __slots__ = ("header", "sequence", "quality_bytes", "_id", "_quality")
+
+    def __init__(self, header: bytes, sequence: str, quality_bytes: bytes):
+        """
+        Инициализирует запись FASTQ без разбора заголовка и качества.
+
+        Args:
+            header (bytes): Заголовок записи без '@'.
+            sequence (str): Последовательность в верхнем регистре.
+            quality_bytes (bytes): Строка качества (ASCII, Phred+33).
+        """
+        self.header = header
+        self.sequence = sequence
+        self.quality_bytes = quality_bytes
+        self._id = None
+        self._quality = None
+
+    @property
+    def id(self) -> str:
+        """Идентификатор последовательности; разбирается из заголовка при первом обращении."""
+        if self._id is None:
+            parts = self.header.split(maxsplit=1)
+            self._id = parts[0].decode("ascii", "replace") if parts else "unknown"
+        return self._id
+
+    @id.setter
+    def id(self, value: str):
+        self._id = value
+
+    @property
+    def quality(self) -> list[int]:
+        """Список Phred-оценок; декодируется из quality_bytes при первом обращении."""
+        if self._quality is None:
+            self._quality = list(self.quality_bytes.translate(PHRED_TABLE))
+        return self._quality
+
+    @quality.setter
+    def quality(self, value: list[int]):
+        self._quality = list(value)
+        self.quality_bytes = bytes(q + 33 for q in self._quality)
+
+    def quality_array(self) -> np.ndarray:
+        """
+        Возвращает Phred-оценки качества в виде массива NumPy без создания списка.
+
+        Символы ниже '!' дают значения больше 93 (оценки берутся по модулю 256, см. PHRED_TABLE),
+        что позволяет обнаружить их той же проверкой диапазона, что и недопустимые оценки.
+
+        Returns:
+            np.ndarray: Массив int64 с Phred-оценками (тот же тип, что у SequenceRecord).
+        """
+        return np.frombuffer(self.quality_bytes.translate(PHRED_TABLE), dtype=np.uint8).astype(np.int64)
+
+    def __repr__(self) -> str:
+        """
+        Возвращает строковое представление записи FASTQ.
+
+        Returns:
+            str: Строка вида "<FastqRecord id=..., length=...>".
+        """
+        return f"<FastqRecord id={self.id}, length={len(self.sequence)}>"
+
+
 class AlignmentRecord(Record):
     """
     Класс для представления выравнивания рида на референсный геном (формат SAM/BAM).
@@ -0,0 +1,289 @@
+import hashlib
+import io
+import os
+import zipfile
+import zlib
+from pathlib import Path
+from typing import Callable
+import numpy as np
+from .gzip_index import AccessPoint, IndexedGzipReader
+from .gzip_parallel import is_gzip
+from .results_cache import default_cache_dir
+
+# Версия формата файла индекса
+INDEX_FORMAT_VERSION = 1
+# Расширение файла индекса рядом с FASTQ-файлом
+INDEX_SUFFIX = ".fqi"
+# Через сколько записей сохраняется смещение записи по умолчанию
+DEFAULT_INDEX_STEP = 1024
+# Расстояние между точками доступа gzip в распакованных байтах по умолчанию
+DEFAULT_POINT_SPACING = 8 * 1024 * 1024
+# Размер блока, читаемого при построении индекса
+READ_SIZE = 4 * 1024 * 1024
+
+
+def index_paths(file_path: str | Path) -> list[Path]:
+    """
+    Возвращает возможные пути файла индекса в порядке поиска.
+
+    Индекс хранится рядом с FASTQ-файлом (<имя>.fqi), а если каталог файла недоступен
+    для записи — в каталоге кэша (index/<хэш пути>.fqi).
+
+    Args:
+        file_path (str | Path): Путь к FASTQ-файлу.
+
+    Returns:
+        list[Path]: Путь рядом с файлом и путь в каталоге кэша.
+    """
+    file_path = Path(file_path).resolve()
+    key = hashlib.blake2b(str(file_path).encode(), digest_size=20).hexdigest()
+    return [file_path.with_name(file_path.name + INDEX_SUFFIX),
+            default_cache_dir() / "index" / f"{key}{INDEX_SUFFIX}"]
+
+
+class RecordIndex:
+    """
+    Индекс записей FASTQ-файла для произвольного доступа: смещения каждой step-й записи
+    в распакованных данных и, для gzip, точки доступа (см. AccessPoint), с которых можно
+    начать распаковку, не читая файл с начала.
+
+    Индекс строится за один последовательный проход (build) и хранится в отдельном файле
+    (см. index_paths) вместе с размером и временем изменения FASTQ-файла: после изменения
+    файла индекс не используется. Окна точек доступа хранятся сжатыми и распаковываются
+    при обращении к точке.
+
+    Записи считаются по строкам (четыре строки на запись); структура записей при
+    построении не проверяется — это делает ридер при чтении.
+
+    Attributes:
+        step (int): Через сколько записей сохраняется смещение.
+        offsets (np.ndarray): Смещения записей с номерами 0, step, 2 × step, ...
+        total_records (int): Количество записей в файле.
+        uncompressed_size (int): Размер распакованных данных в байтах.
+        compressed (bool): Файл сжат gzip.
+    """
+
+    def __init__(self, step: int, offsets: np.ndarray, total_records: int, uncompressed_size: int,
+                 compressed: bool, points: np.ndarray, windows: list[bytes]):
+        """
+        Инициализирует индекс (обычно создаётся через build или load).
+
+        Args:
+            step (int): Через сколько записей сохраняется смещение.
+            offsets (np.ndarray): Смещения каждой step-й записи.
+            total_records (int): Количество записей.
+            uncompressed_size (int): Размер распакованных данных.
+            compressed (bool): Файл сжат gzip.
+            points (np.ndarray): Точки доступа gzip: строки (смещение в распакованных данных,
+                смещение в сжатом файле, количество битов).
+            windows (list[bytes]): Сжатые zlib окна точек доступа.
+        """
+        self.step = step
+        self.offsets = offsets
+        self.total_records = total_records
+        self.uncompressed_size = uncompressed_size
+        self.compressed = compressed
+        self._points = points
+        self._windows = windows
+
+    @classmethod
+    def build(cls, file_path: str | Path, step: int = DEFAULT_INDEX_STEP,
+              spacing: int = DEFAULT_POINT_SPACING,
+              progress_callback: Callable[[int, int], None] | None = None) -> "RecordIndex":
+        """
+        Строит индекс за один последовательный проход по файлу.
+
+        Args:
+            file_path (str | Path): Путь к FASTQ-файлу (несжатому или gzip).
+            step (int): Через сколько записей сохранять смещение.
+            spacing (int): Расстояние между точками доступа gzip в распакованных байтах.
+            progress_callback (Callable | None): Вызывается после каждого блока с аргументами
+                (обработано байтов файла, размер файла). Для gzip учитываются сжатые байты.
+
+        Returns:
+            RecordIndex: Построенный индекс.
+        """
+        file_path = Path(file_path)
+        total_bytes = file_path.stat().st_size
+        compressed = is_gzip(file_path)
+        raw = IndexedGzipReader(file_path, spacing=spacing) if compressed else None
+        points = []
+        windows = []
+
+        def take_points(keep_last: bool):
+            # Последняя точка нужна распаковщику для отсчёта расстояния до следующей
+            while len(raw.points) > int(keep_last):
+                point = raw.points.popleft()
+                points.append((point.uncompressed, point.compressed, point.bits))
+                windows.append(zlib.compress(point.window))
+
+        offsets = [np.zeros(1, dtype=np.int64)]
+        lines_per_step = 4 * step
+        lines = 0
+        position = 0
+        last_byte = 10
+        with io.BufferedReader(raw, buffer_size=READ_SIZE) if compressed else open(file_path, "rb") as stream:
+            while True:
+                chunk = stream.read(READ_SIZE)
+                if not chunk:
+                    break
+                newlines = np.flatnonzero(np.frombuffer(chunk, dtype=np.uint8) == 10)
+                # Запись с номером k × step начинается за (4 × k × step)-м переводом строки
+                first = (-(lines + 1)) % lines_per_step
+                offsets.append(newlines[first::lines_per_step] + position + 1)
+                lines += len(newlines)
+                position += len(chunk)
+                last_byte = chunk[-1]
+                if compressed:
+                    take_points(keep_last=True)
+                if progress_callback:
+                    progress_callback(raw.compressed_position if compressed else position, total_bytes)
+            if compressed:
+                take_points(keep_last=False)
+
+        if last_byte != 10:
+            lines += 1  # последняя строка без перевода строки
+        total_records = (lines + 3) // 4
+        offsets = np.concatenate(offsets)
+        offsets = offsets[offsets < position] if total_records else offsets[:0]
+        return cls(step, offsets, total_records, position, compressed,
+                   np.array(points, dtype=np.int64).reshape(-1, 3), windows)
+
+    @classmethod
+    def load(cls, file_path: str | Path) -> "RecordIndex | None":
+        """
+        Загружает сохранённый индекс файла.
+
+        Args:
+            file_path (str | Path): Путь к FASTQ-файлу.
+
+        Returns:
+            RecordIndex | None: Индекс или None, если его нет, он повреждён или файл
+                изменился после построения индекса.
+        """
+        try:
+            stat = Path(file_path).stat()
+        except OSError:
+            return None
+        for path in index_paths(file_path):
+            try:
+                with np.load(path) as data:
+                    state = dict(data)
+                if (int(state['version']) != INDEX_FORMAT_VERSION or int(state['source_size']) != stat.st_size
+                        or int(state['source_mtime_ns']) != stat.st_mtime_ns):
+                    continue
+                ends = state['window_ends'].tolist()
+                blob = state['windows'].tobytes()
+                windows = [blob[start:end] for start, end in zip([0] + ends[:-1], ends)]
+                return cls(int(state['step']), state['offsets'], int(state['total_records']),
+                           int(state['uncompressed_size']), bool(state['compressed']),
+                           state['points'], windows)
+            except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+                continue
+        return None
+
+    @classmethod
+    def load_or_build(cls, file_path: str | Path, step: int = DEFAULT_INDEX_STEP,
+                      progress_callback: Callable[[int, int], None] | None = None) -> "RecordIndex":
+        """
+        Загружает индекс файла, а если его нет или он устарел — строит и сохраняет.
+
+        Args:
+            file_path (str | Path): Путь к FASTQ-файлу.
+            step (int): Через сколько записей сохранять смещение при построении.
+            progress_callback (Callable | None): Прогресс построения (см. build).
+
+        Returns:
+            RecordIndex: Индекс файла.
+        """
+        index = cls.load(file_path)
+        if index is None:
+            index = cls.build(file_path, step, progress_callback=progress_callback)
+            index.save(file_path)
+        return index
+
+    def save(self, file_path: str | Path) -> Path | None:
+        """
+        Сохраняет индекс рядом с FASTQ-файлом или, если это невозможно, в каталоге кэша.
+
+        Args:
+            file_path (str | Path): Путь к FASTQ-файлу, для которого построен индекс.
+
+        Returns:
+            Path | None: Путь к файлу индекса или None, если сохранить его не удалось.
+        """
+        stat = Path(file_path).stat()
+        state = {
+            'version': np.array(INDEX_FORMAT_VERSION),
+            'source_size': np.array(stat.st_size, dtype=np.int64),
+            'source_mtime_ns': np.array(stat.st_mtime_ns, dtype=np.int64),
+            'step': np.array(self.step, dtype=np.int64),
+            'offsets': self.offsets,
+            'total_records': np.array(self.total_records, dtype=np.int64),
+            'uncompressed_size': np.array(self.uncompressed_size, dtype=np.int64),
+            'compressed': np.array(self.compressed),
+            'points': self._points,
+            'window_ends': np.cumsum([len(window) for window in self._windows], dtype=np.int64),
+            'windows': np.frombuffer(b"".join(self._windows), dtype=np.uint8),
+        }
+        for path in index_paths(file_path):
+            # Пишем во временный файл и переименовываем, чтобы не оставить повреждённый индекс
+            temporary = path.with_suffix(f".{os.getpid()}.tmp")
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                with open(temporary, "wb") as f:
+                    np.savez(f, **state)
+                os.replace(temporary, path)
+                return path
+            except OSError:
+                temporary.unlink(missing_ok=True)
+        return None
+
+    def record_offset(self, record: int) -> tuple[int, int]:
+        """
+        Находит ближайшую сохранённую запись, не превышающую record.
+
+        Args:
+            record (int): Номер записи (с нуля).
+
+        Returns:
+            tuple[int, int]: Смещение сохранённой записи в распакованных данных и её номер.
+
+        Raises:
+            IndexError: Если записи с таким номером в файле нет.
+        """
+        if not 0 <= record < self.total_records:
+            raise IndexError(f"Рид {record} вне файла ({self.total_records} ридов)")
+        entry = record // self.step
+        return int(self.offsets[entry]), entry * self.step
+
+    def record_ranges(self, n_ranges: int) -> list[tuple[int, int]]:
+        """
+        Делит файл на диапазоны байтов распакованных данных с примерно равным числом записей.
+
+        Args:
+            n_ranges (int): Желаемое количество диапазонов.
+
+        Returns:
+            list[tuple[int, int]]: Непустые диапазоны [start, end), каждый начинается с записи.
+        """
+        n_ranges = max(1, min(n_ranges, len(self.offsets)))
+        entries = sorted({len(self.offsets) * i // n_ranges for i in range(n_ranges)})
+        boundaries = [int(self.offsets[entry]) for entry in entries] + [self.uncompressed_size]
+        return list(zip(boundaries, boundaries[1:]))
+
+    def point_before(self, offset: int) -> AccessPoint | None:
+        """
+        Возвращает последнюю точку доступа gzip, не превышающую offset.
+
+        Args:
+            offset (int): Смещение в распакованных данных.
+
+        Returns:
+            AccessPoint | None: Точка доступа или None для несжатого файла.
+        """
+        if not len(self._points):
+            return None
+        i = max(int(np.searchsorted(self._points[:, 0], offset, side='right')) - 1, 0)
+        uncompressed, compressed, bits = self._points[i].tolist()
+        return AccessPoint(uncompressed, compressed, bits, zlib.decompress(self._windows[i]))
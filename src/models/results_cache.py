@@ -0,0 +1,148 @@
+import hashlib
+import os
+import zipfile
+from pathlib import Path
+import numpy as np
+from .metric_module import registered_metrics
+from .stats_accumulator import StatsAccumulator
+
+# Версия формата записей кэша; увеличивается при изменении формата состояния модулей метрик
+CACHE_FORMAT_VERSION = 3
+# Размер фрагментов файла (начало, середина, конец), по которым считается быстрый хэш
+SAMPLE_SIZE = 64 * 1024
+# Ограничение суммарного размера кэша по умолчанию
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def default_cache_dir() -> Path:
+    """Возвращает каталог кэша по умолчанию (~/.cache/fastqclite или $XDG_CACHE_HOME/fastqclite)."""
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "fastqclite"
+
+
+def file_fingerprint(file_path: str | Path) -> str:
+    """
+    Вычисляет ключ кэша для файла.
+
+    Ключ включает абсолютный путь, размер, время изменения и хэш трёх фрагментов
+    содержимого (начало, середина, конец), поэтому не требует чтения всего файла.
+    В ключ входят и набор зарегистрированных модулей метрик с их настройками
+    (см. MetricModule.settings): при добавлении модуля или изменении настроек старые
+    записи не используются.
+
+    Args:
+        file_path (str | Path): Путь к файлу.
+
+    Returns:
+        str: Шестнадцатеричный ключ.
+    """
+    file_path = Path(file_path).resolve()
+    stat = file_path.stat()
+
+    digest = hashlib.blake2b(digest_size=20)
+    modules = ",".join(f"{metric.name}[{metric.settings()}]" for metric in registered_metrics())
+    digest.update(f"{CACHE_FORMAT_VERSION}|{modules}|{file_path}|{stat.st_size}|{stat.st_mtime_ns}".encode())
+    with open(file_path, "rb") as f:
+        for offset in (0, max(0, stat.st_size // 2 - SAMPLE_SIZE // 2), max(0, stat.st_size - SAMPLE_SIZE)):
+            f.seek(offset)
+            digest.update(f.read(SAMPLE_SIZE))
+    return digest.hexdigest()
+
+
+class ResultsCache:
+    """
+    Постоянный кэш результатов анализа на диске с вытеснением по принципу LRU.
+
+    Хранит состояние накопителя статистики (компактные гистограммы) в сжатом формате .npz.
+    Время последнего обращения к записи отмечается временем изменения файла, и при
+    превышении лимита размера удаляются записи, к которым дольше всего не обращались.
+
+    Attributes:
+        directory (Path): Каталог кэша.
+        max_bytes (int): Максимальный суммарный размер записей в байтах.
+    """
+
+    def __init__(self, directory: str | Path | None = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Инициализирует кэш.
+
+        Args:
+            directory (str | Path | None): Каталог кэша. None — каталог по умолчанию.
+            max_bytes (int): Максимальный суммарный размер записей в байтах.
+        """
+        self.directory = Path(directory) if directory else default_cache_dir()
+        self.max_bytes = max_bytes
+
+    def _entry_path(self, key: str) -> Path:
+        """Возвращает путь к файлу записи."""
+        return self.directory / f"{key}.npz"
+
+    def get(self, file_path: str | Path) -> StatsAccumulator | None:
+        """
+        Ищет в кэше результаты для файла.
+
+        Args:
+            file_path (str | Path): Путь к FASTQ-файлу.
+
+        Returns:
+            StatsAccumulator | None: Восстановленный накопитель или None, если записи нет
+                (или она повреждена).
+        """
+        entry = self._entry_path(file_fingerprint(file_path))
+        try:
+            with np.load(entry) as state:
+                accumulator = StatsAccumulator.from_state(dict(state))
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            return None
+
+        # Отмечаем обращение для LRU (запись может быть уже вытеснена другим процессом)
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        return accumulator
+
+    def put(self, file_path: str | Path, accumulator: StatsAccumulator):
+        """
+        Сохраняет результаты для файла и при необходимости вытесняет старые записи.
+
+        Кэш не обязателен для работы: ошибки записи (например, нет прав на каталог)
+        игнорируются.
+
+        Args:
+            file_path (str | Path): Путь к FASTQ-файлу.
+            accumulator (StatsAccumulator): Накопитель с результатами анализа.
+        """
+        entry = self._entry_path(file_fingerprint(file_path))
+        # Пишем во временный файл и переименовываем, чтобы не оставить повреждённую запись
+        temporary = entry.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(temporary, "wb") as f:
+                np.savez_compressed(f, **accumulator.get_state())
+            os.replace(temporary, entry)
+        except OSError:
+            temporary.unlink(missing_ok=True)
+            return
+
+        self._evict()
+
+    def _evict(self):
+        """Удаляет записи, к которым дольше всего не обращались, пока кэш превышает лимит."""
+        entries = []
+        for entry in self.directory.glob("*.npz"):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                entry.unlink()
+                total -= size
+            except OSError:
+                pass
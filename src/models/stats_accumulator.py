@@ -0,0 +1,168 @@
+from typing import Dict, Any, Iterable
+import numpy as np
+from .fastq_reader import FastqBatch
+from .metric_module import MetricModule, registered_metrics, get_metric
+from .record import BaseSequenceRecord
+# Модули метрик регистрируются при импорте; порядок импорта задаёт порядок графиков
+from . import basic_metrics, qc_metrics, duplication, contamination  # noqa: F401
+
+
+def metric_settings() -> Dict[str, Dict[str, Any]]:
+    """
+    Возвращает текущие настройки зарегистрированных модулей для передачи в процессы-обработчики.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Имя модуля -> {атрибут класса: значение}
+            (см. MetricModule.setting_attributes).
+    """
+    return {metric.name: {attribute: getattr(metric, attribute) for attribute in metric.setting_attributes}
+            for metric in registered_metrics() if metric.setting_attributes}
+
+
+def apply_metric_settings(settings: Dict[str, Dict[str, Any]]):
+    """
+    Устанавливает настройки модулей, полученные через metric_settings().
+
+    Используется как инициализатор пулов процессов, чтобы обработчики считали статистику
+    с теми же настройками, что и основной процесс. Функция находится в этом модуле, так как
+    его импорт в процессе-обработчике регистрирует все модули метрик.
+
+    Args:
+        settings (Dict[str, Dict[str, Any]]): Настройки модулей.
+    """
+    for name, attributes in settings.items():
+        for attribute, value in attributes.items():
+            setattr(get_metric(name), attribute, value)
+
+
+class StatsAccumulator:
+    """
+    Потоковый накопитель статистики FASTQ с ограниченным потреблением памяти.
+
+    Объединяет модули метрик (см. MetricModule): каждый пакет ридов передаётся всем
+    модулям, поэтому любое их количество вычисляется за один проход по файлу.
+    Модули держат гистограммы фиксированного размера, поэтому объём памяти зависит
+    только от максимальной длины рида, но не от количества ридов в файле.
+
+    Attributes:
+        modules (Dict[str, MetricModule]): Модули метрик по именам.
+        total_sequences (int): Количество учтённых ридов.
+        max_length (int): Максимальная длина учтённого рида.
+    """
+
+    def __init__(self, modules: Iterable[str] | None = None):
+        """
+        Инициализирует пустой накопитель.
+
+        Args:
+            modules (Iterable[str] | None): Имена модулей метрик. None — все зарегистрированные.
+
+        Raises:
+            KeyError: Если модуль с указанным именем не зарегистрирован.
+        """
+        names = [cls.name for cls in registered_metrics()] if modules is None else list(modules)
+        self.modules: Dict[str, MetricModule] = {name: get_metric(name)() for name in names}
+        self.total_sequences = 0
+        self.max_length = 0
+
+    def update(self, record: BaseSequenceRecord):
+        """
+        Добавляет в статистику одну запись FASTQ.
+
+        Args:
+            record (BaseSequenceRecord): Запись с последовательностью и списком Phred-оценок.
+
+        Raises:
+            ValueError: Если оценка качества выходит за пределы диапазона Phred+33 (0–93).
+        """
+        self.update_batch(FastqBatch.from_records([record]))
+
+    def update_batch(self, batch: FastqBatch):
+        """
+        Добавляет в статистику пакет ридов (см. FastqReader.read_batches).
+
+        Args:
+            batch (FastqBatch): Пакет ридов с матрицами последовательностей и качеств.
+        """
+        if len(batch) == 0:
+            return
+
+        for module in self.modules.values():
+            module.update_batch(batch)
+        self.total_sequences += len(batch)
+        self.max_length = max(self.max_length, int(batch.lengths.max()))
+
+    def merge(self, other: "StatsAccumulator"):
+        """
+        Добавляет к текущей статистике статистику другого накопителя.
+
+        Счётчики модулей целочисленные, поэтому результат слияния не зависит от того,
+        как риды были распределены между накопителями. Исключение — сводка частых
+        последовательностей (OverrepresentedSequences): её оценки и граница погрешности
+        зависят от разбиения ридов и порядка слияния, но остаются в пределах этой границы.
+
+        Args:
+            other (StatsAccumulator): Накопитель с тем же набором модулей, например,
+                с результатами другого фрагмента файла.
+        """
+        for name, module in self.modules.items():
+            module.merge(other.modules[name])
+        self.total_sequences += other.total_sequences
+        self.max_length = max(self.max_length, other.max_length)
+
+    def get_state(self) -> Dict[str, np.ndarray]:
+        """
+        Возвращает состояние накопителя в виде набора массивов (для сохранения на диск).
+
+        Returns:
+            Dict[str, np.ndarray]: Счётчики накопителя и массивы модулей с ключами
+                вида '<модуль>.<массив>'.
+        """
+        state = {
+            'total_sequences': np.array(self.total_sequences, dtype=np.int64),
+            'max_length': np.array(self.max_length, dtype=np.int64),
+        }
+        for name, module in self.modules.items():
+            for key, value in module.get_state().items():
+                state[f"{name}.{key}"] = value
+        return state
+
+    @classmethod
+    def from_state(cls, state: Dict[str, np.ndarray]) -> "StatsAccumulator":
+        """
+        Восстанавливает накопитель из состояния, полученного через get_state().
+
+        Args:
+            state (Dict[str, np.ndarray]): Массивы состояния.
+
+        Returns:
+            StatsAccumulator: Накопитель с теми же модулями и счётчиками.
+
+        Raises:
+            KeyError: Если состояние содержит незарегистрированный модуль или неполно.
+        """
+        module_states: Dict[str, Dict[str, np.ndarray]] = {}
+        for key, value in state.items():
+            if "." in key:
+                name, array = key.split(".", 1)
+                module_states.setdefault(name, {})[array] = value
+
+        accumulator = cls(module_states)
+        for name, module_state in module_states.items():
+            accumulator.modules[name].set_state(module_state)
+        accumulator.total_sequences = int(state['total_sequences'])
+        accumulator.max_length = int(state['max_length'])
+        return accumulator
+
+    def to_result(self) -> Dict[str, Any]:
+        """
+        Формирует словарь с данными для построения графиков.
+
+        Returns:
+            Dict[str, Any]: Количество ридов и записи, сформированные модулями
+                (см. MetricModule.finalize).
+        """
+        result: Dict[str, Any] = {'total_sequences': self.total_sequences}
+        for module in self.modules.values():
+            result.update(module.finalize())
+        return result
@@ -1,7 +1,7 @@
 import tkinter as tk
+from pathlib import Path
 from tkinter import filedialog, font, messagebox
 from tkinterdnd2 import DND_FILES, TkinterDnD
-from .stats_window import StatsWindow
 from PIL import Image, ImageTk
 
 APP_ICON_FILENAME = "icon.png"
@@ -40,7 +40,7 @@ class FileSelection(TkinterDnD.Tk):
         self.iconphoto(True, self.app_icon_photo)
 
         self.title("FastQClite - Выбор файла")
-        self.geometry("600x400")
+        self.geometry("600x500")
         self.config(bg=self.bg_color)
 
         # Установка шрифтов
@@ -71,7 +71,7 @@ class FileSelection(TkinterDnD.Tk):
         main_frame.pack(expand=True, padx=20, pady=50)
 
         label = tk.Label(main_frame,
-                         text="Выберите файл FastQ",
+                         text="Выберите файл FastQ или пару R1/R2",
                          font=self.header_font,
                          bg=self.bg_color,
                          fg="#333333")
@@ -90,20 +90,44 @@ class FileSelection(TkinterDnD.Tk):
                                   pady=10)
         select_button.pack(pady=10)
 
+        folder_button = tk.Button(main_frame,
+                                  text="Выбрать папку",
+                                  font=self.text_font,
+                                  command=self._open_folder_dialog,
+                                  bg=self.accent_color,
+                                  fg="white",
+                                  activebackground=self.accent_color,
+                                  activeforeground="white",
+                                  bd=0,
+                                  padx=20,
+                                  pady=10)
+        folder_button.pack(pady=10)
+
+        # Режим слежения для одного несжатого файла, который ещё дописывается
+        self.follow_var = tk.BooleanVar(value=False)
+        follow_check = tk.Checkbutton(main_frame,
+                                      text="Следить за дописываемым файлом",
+                                      variable=self.follow_var,
+                                      font=("Montserrat", 10),
+                                      bg=self.bg_color,
+                                      activebackground=self.bg_color,
+                                      fg="#333333")
+        follow_check.pack(pady=(5, 0))
+
         self.drop_target_register(DND_FILES)
         self.dnd_bind('<<Drop>>', self._handle_drop)
 
         dnd_label = tk.Label(main_frame,
-                             text="(Поддерживается .fastq, .fq, .gz)",
+                             text="(Поддерживается .fastq, .fq, .gz; несколько файлов или папка — сводка)",
                              font=("Montserrat", 10),
                              bg=self.bg_color,
                              fg="#666666")
         dnd_label.pack(pady=(5, 0))
 
     def _open_file_dialog(self):
-        """Открывает стандартное диалоговое окно выбора файла."""
-        filepath = filedialog.askopenfilename(
-            title="Выберите файл FastQ",
+        """Открывает стандартное диалоговое окно выбора файла, пары R1/R2 или нескольких файлов."""
+        filepaths = filedialog.askopenfilenames(
+            title="Выберите файл FastQ, пару файлов R1/R2 или несколько файлов",
             filetypes=[
                 ("FASTQ files", "*.fastq"),
                 ("Compressed FASTQ files", "*.fastq.gz"),
@@ -111,27 +135,65 @@ class FileSelection(TkinterDnD.Tk):
                 ("All files", "*.*")
             ]
         )
-        if filepath:
-            self._process_file_selection(filepath)
-
-    def _handle_drop(self, event):
-        """Обрабатывает событие перетаскивания (Drop)."""
-        filepath = event.data.strip('{}')
+        self._process_selected_paths(list(filepaths))
 
-        # Обработка случая, когда путь содержит пробелы, но не заключен в скобки
-        if ' ' in filepath and '{' not in filepath:
-            filepath = filepath.split(' ')[0]
+    def _open_folder_dialog(self):
+        """Открывает диалог выбора папки: все FASTQ-файлы в ней показываются в сводке."""
+        folder = filedialog.askdirectory(title="Выберите папку с файлами FastQ")
+        if folder:
+            self._process_selected_paths([folder])
 
-        if filepath:
-            self._process_file_selection(filepath)
+    def _handle_drop(self, event):
+        """Обрабатывает событие перетаскивания (Drop) файлов или папок."""
+        # Список путей в формате Tcl: пути с пробелами заключены в фигурные скобки
+        self._process_selected_paths(list(self.tk.splitlist(event.data)))
+
+    def _process_selected_paths(self, filepaths):
+        """
+        Открывает окно анализа для выбранных путей.
+
+        Один файл открывается в окне статистики (с отмеченным флажком — в режиме слежения),
+        два файла с именами пары (см. are_mates) — в окне статистики пары R1/R2, а несколько
+        файлов или папки — в окне сводки.
+        """
+        # Модули анализа (NumPy) загружаются только при первом выборе файлов
+        from ..models.batch_analysis import collect_fastq_files
+        from ..models.paired_analysis import are_mates, order_mates
+
+        filepaths = [path for path in filepaths if path]
+        if not filepaths:
+            return
+        has_folders = any(Path(path).is_dir() for path in filepaths)
+        if not has_folders and len(filepaths) == 1:
+            self._process_file_selection(filepaths[0])
+        elif not has_folders and len(filepaths) == 2 and are_mates(*filepaths):
+            r1, r2 = order_mates(*filepaths)
+            self._process_file_selection((str(r1), str(r2)))
+        else:
+            files = collect_fastq_files(filepaths)
+            if not files:
+                messagebox.showerror("Файлы не найдены", "В выбранных папках нет файлов FastQ (.fastq, .fq, .gz).")
+                return
+            self._open_dashboard(files)
+
+    def _open_dashboard(self, filepaths):
+        """Открывает окно сводки по набору файлов."""
+        from .run_dashboard import RunDashboard
+
+        self.withdraw()
+        RunDashboard(self, filepaths, self.app_icon_photo)
+        print(f"Выбрано файлов для сводки: {len(filepaths)}")
 
     def _process_file_selection(self, filepath):
-        """Вызывает класс StatsWindow с выбранным путем к файлу."""
+        """Вызывает класс StatsWindow с выбранным путем к файлу или парой путей R1/R2."""
+        # Модуль окна статистики (NumPy, анализ) загружается только при первом выборе файла
+        from .stats_window import StatsWindow
+
         if filepath:
             # Скрываем главное окно перед открытием StatsWindow
             self.withdraw()
 
             # Вызываем класс StatsWindow из модуля stats_window
-            StatsWindow(self, filepath, self.app_icon_photo)
+            StatsWindow(self, filepath, self.app_icon_photo, follow=self.follow_var.get())
 
             print(f"Файл выбран/перетащен: {filepath}")
\ No newline at end of file
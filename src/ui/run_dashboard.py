@@ -0,0 +1,350 @@
+import queue
+import threading
+import time
+import tkinter as tk
+from tkinter import font, messagebox, ttk
+from pathlib import Path
+from typing import Any
+from ..models.batch_analysis import run_batch_analysis
+from ..models.fastq_plots import AnalysisCancelled, add_run_curves, create_figure_run_overview
+from ..models.parallel_analysis import default_workers
+
+# Период опроса очереди сообщений от потока анализа (мс)
+POLL_INTERVAL_MS = 100
+
+# Состояния файлов в таблице
+STATUS_QUEUED = "в очереди"
+STATUS_RUNNING = "анализ..."
+STATUS_DONE = "готово"
+STATUS_CANCELLED = "отменён"
+
+# Столбцы таблицы: ключ сводки (см. summarize_result) -> (заголовок, ширина, формат)
+SUMMARY_COLUMNS = {
+    'total_sequences': ("Ридов", 90, lambda value: f"{value:,}".replace(",", " ")),
+    'mean_length': ("Ср. длина", 75, "{:.1f}".format),
+    'mean_quality': ("Ср. качество", 85, "{:.1f}".format),
+    'q30_percent': ("Q30, %", 65, "{:.1f}".format),
+    'gc_percent': ("GC, %", 60, "{:.1f}".format),
+    'percent_unique': ("Уникальных, %", 95, "{:.1f}".format),
+    'max_adapter_percent': ("Адаптеры, %", 85, "{:.2f}".format),
+}
+
+# Цвета кривых файлов и цвет невыделенных кривых при выделенном файле
+CURVE_COLORS = ["#3E5F8A", "#E07B39", "#44944A", "#B8436A", "#7A5BA8", "#2A9D9D", "#C9A227", "#8C564B"]
+DIMMED_COLOR = "#C8C8C8"
+
+
+class RunDashboard(tk.Toplevel):
+    """
+    Окно сводки по набору FASTQ-файлов (например, всем файлам запуска секвенатора).
+
+    Файлы анализируются в пуле процессов (см. run_batch_analysis) в фоновом потоке.
+    По мере готовности каждого файла в таблицу добавляется строка с его показателями,
+    а на общие графики — его кривые качества и GC-состава. Готовые файлы можно открыть
+    в окне статистики (двойной щелчок по строке), не дожидаясь остальных: полные
+    результаты берутся из кэша.
+    """
+
+    def __init__(self, master, filepaths: list[Path], app_icon_photo: tk.PhotoImage):
+        super().__init__(master)
+
+        self.iconphoto(True, app_icon_photo)
+        self.app_icon_photo = app_icon_photo
+
+        self.bg_color = "#F5F5F5"
+        self.accent_color = "#3E5F8A"
+        self.header_size = 18
+        self.text_size = 14
+        self.main_font = "Montserrat"
+        self.filepaths = list(filepaths)
+        self.summaries: dict[int, dict[str, Any]] = {}
+        self._curves: dict[int, list] = {}
+        self._messages: queue.Queue = queue.Queue()
+        self._cancel_event = threading.Event()
+        self._poll_job = None
+        self._started_at = 0.0
+        self._finished = 0
+        self._failed = 0
+        self._sort_column = None
+        self._sort_descending = False
+
+        self.title("FastQClite - Сводка по файлам")
+        self.geometry("1400x850")
+        self.config(bg=self.bg_color)
+
+        # Установка шрифтов
+        try:
+            self.header_font = font.Font(family=self.main_font, size=self.header_size, weight="bold")
+            self.text_font = font.Font(family=self.main_font, size=self.text_size)
+        except tk.TclError:
+            self.main_font = "Helvetica"
+            self.header_font = font.Font(family=self.main_font, size=self.header_size, weight="bold")
+            self.text_font = font.Font(family=self.main_font, size=self.text_size)
+
+        self.protocol("WM_DELETE_WINDOW", self._on_closing)
+
+        self.grid_rowconfigure(1, weight=1)
+        self.grid_columnconfigure(0, weight=3)
+        self.grid_columnconfigure(1, weight=2)
+        self._create_header()
+        self._create_table()
+        self._create_plots()
+        self._center_window()
+        self._load_data()
+
+    def _load_data(self):
+        """Запускает анализ набора в фоновом потоке и начинает опрос очереди сообщений."""
+        self._started_at = time.monotonic()
+        worker = threading.Thread(target=self._analysis_worker, daemon=True)
+        worker.start()
+        self._poll_job = self.after(POLL_INTERVAL_MS, self._poll_messages)
+
+    def _analysis_worker(self):
+        """Выполняет анализ набора в фоновом потоке. Взаимодействует с окном только через очередь."""
+        try:
+            run_batch_analysis(self.filepaths,
+                               result_callback=lambda index, summary, error:
+                               self._messages.put(("result", index, summary, error)),
+                               started_callback=lambda index: self._messages.put(("started", index)),
+                               cancel_event=self._cancel_event,
+                               workers=default_workers())
+            self._messages.put(("done",))
+        except AnalysisCancelled:
+            self._messages.put(("cancelled",))
+        except Exception as e:
+            self._messages.put(("error", e))
+
+    def _poll_messages(self):
+        """Обрабатывает накопившиеся сообщения потока анализа (вызывается из цикла Tk)."""
+        self._poll_job = None
+        finished = False
+        try:
+            while True:
+                message = self._messages.get_nowait()
+                kind = message[0]
+                if kind == "started":
+                    if self.table.set(str(message[1]), "status") == STATUS_QUEUED:
+                        self.table.set(str(message[1]), "status", STATUS_RUNNING)
+                elif kind == "result":
+                    self._show_file_result(*message[1:])
+                elif kind == "done":
+                    self._finish_progress("Анализ завершён")
+                    finished = True
+                elif kind == "cancelled":
+                    self._mark_unfinished(STATUS_CANCELLED)
+                    self._finish_progress("Анализ остановлен")
+                    finished = True
+                elif kind == "error":
+                    self._mark_unfinished(STATUS_CANCELLED)
+                    self._finish_progress("Анализ прерван из-за ошибки")
+                    messagebox.showerror("Ошибка анализа", f"Не удалось проанализировать набор файлов: {message[1]}",
+                                         parent=self)
+                    finished = True
+        except queue.Empty:
+            pass
+        if not finished:
+            self._poll_job = self.after(POLL_INTERVAL_MS, self._poll_messages)
+
+    def _create_header(self):
+        """Создает заголовок с индикатором прогресса и кнопкой отмены."""
+        header = tk.Frame(self, bg=self.bg_color)
+        header.grid(row=0, column=0, columnspan=2, sticky="we", padx=10, pady=(10, 5))
+
+        tk.Label(header,
+                 text=f"Сводка по файлам: {len(self.filepaths)}",
+                 font=self.header_font,
+                 bg=self.bg_color,
+                 fg="#333333").pack(side=tk.LEFT)
+
+        self.cancel_button = tk.Button(header,
+                                       text="Отмена",
+                                       font=self.text_font,
+                                       command=self._cancel_analysis,
+                                       bg=self.accent_color,
+                                       fg="white",
+                                       activebackground=self.accent_color,
+                                       activeforeground="white",
+                                       bd=0,
+                                       padx=20,
+                                       pady=5)
+        self.cancel_button.pack(side=tk.RIGHT)
+
+        self.progress_label = tk.Label(header,
+                                       text="Подготовка...",
+                                       font=("Montserrat", 10),
+                                       bg=self.bg_color,
+                                       fg="#666666")
+        self.progress_label.pack(side=tk.RIGHT, padx=10)
+
+        self.progress_bar = ttk.Progressbar(header,
+                                            orient=tk.HORIZONTAL,
+                                            length=300,
+                                            mode="determinate",
+                                            maximum=len(self.filepaths))
+        self.progress_bar.pack(side=tk.RIGHT, padx=10)
+
+    def _create_table(self):
+        """Создает таблицу файлов: имя, состояние и сводные показатели."""
+        table_frame = tk.Frame(self, bg=self.bg_color)
+        table_frame.grid(row=1, column=0, sticky="nswe", padx=(10, 5), pady=(5, 0))
+
+        columns = ["file", "status", *SUMMARY_COLUMNS]
+        self.table = ttk.Treeview(table_frame, columns=columns, show="headings", selectmode="browse")
+        self.table.heading("file", text="Файл", command=lambda: self._sort_by("file"))
+        self.table.column("file", width=260, anchor="w")
+        self.table.heading("status", text="Состояние", command=lambda: self._sort_by("status"))
+        self.table.column("status", width=90, anchor="w")
+        for key, (heading, width, _) in SUMMARY_COLUMNS.items():
+            self.table.heading(key, text=heading, command=lambda column=key: self._sort_by(column))
+            self.table.column(key, width=width, anchor="e")
+
+        scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.table.yview)
+        self.table.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.table.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        # Номер файла в self.filepaths служит идентификатором строки
+        for index, path in enumerate(self.filepaths):
+            self.table.insert("", tk.END, iid=str(index),
+                              values=(path.name, STATUS_QUEUED, *([""] * len(SUMMARY_COLUMNS))))
+
+        self.table.tag_configure("error", foreground="#C62828")
+        self.table.bind("<<TreeviewSelect>>", lambda event: self._highlight_selected())
+        self.table.bind("<Double-1>", lambda event: self._open_selected())
+
+        tk.Label(self,
+                 text="Двойной щелчок по готовому файлу открывает его полную статистику",
+                 font=("Montserrat", 10),
+                 bg=self.bg_color,
+                 fg="#666666").grid(row=2, column=0, sticky="w", padx=10, pady=(5, 10))
+
+    def _create_plots(self):
+        """Создает холст с общими графиками качества и GC-состава."""
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+        plot_frame = tk.Frame(self, bg=self.bg_color)
+        plot_frame.grid(row=1, column=1, rowspan=2, sticky="nswe", padx=(5, 10), pady=(5, 10))
+
+        self.figure = create_figure_run_overview()
+        self.canvas = FigureCanvasTkAgg(self.figure, master=plot_frame)
+        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.canvas.draw()
+
+    def _show_file_result(self, index: int, summary: dict | None, error: Exception | None):
+        """Заполняет строку готового файла и добавляет его кривые на графики."""
+        self._finished += 1
+        row = str(index)
+        if error is not None:
+            self._failed += 1
+            self.table.set(row, "status", "ошибка")
+            self.table.item(row, tags=("error",))
+            # Текст ошибки показывается в строке состояния при выделении строки
+            self.summaries[index] = {'error': str(error)}
+        elif summary is not None:
+            self.summaries[index] = summary
+            self.table.set(row, "status", STATUS_DONE)
+            for key, (_, _, formatter) in SUMMARY_COLUMNS.items():
+                value = summary[key]
+                self.table.set(row, key, formatter(value) if value is not None else "—")
+            color = CURVE_COLORS[index % len(CURVE_COLORS)]
+            self._curves[index] = add_run_curves(self.figure, summary, color)
+            self._highlight_selected()
+
+        self.progress_bar["value"] = self._finished
+        elapsed = time.monotonic() - self._started_at
+        text = f"{self._finished} из {len(self.filepaths)}"
+        if self._failed:
+            text += f" · ошибок: {self._failed}"
+        if self._finished < len(self.filepaths):
+            remaining = int(elapsed * (len(self.filepaths) - self._finished) / self._finished)
+            text += f" · осталось ~{remaining // 60}:{remaining % 60:02d}"
+        self.progress_label.config(text=text)
+
+    def _mark_unfinished(self, status: str):
+        """Отмечает файлы, анализ которых не завершён."""
+        for index in range(len(self.filepaths)):
+            if index not in self.summaries:
+                self.table.set(str(index), "status", status)
+
+    def _selected_index(self) -> int | None:
+        """Возвращает номер выделенного файла или None."""
+        selection = self.table.selection()
+        return int(selection[0]) if selection else None
+
+    def _highlight_selected(self):
+        """Выделяет кривые выбранного файла; без выделения все кривые показываются в своих цветах."""
+        selected = self._selected_index()
+        for index, lines in self._curves.items():
+            for line in lines:
+                if selected is None or selected not in self._curves:
+                    line.set(color=CURVE_COLORS[index % len(CURVE_COLORS)], linewidth=1, alpha=0.6, zorder=2)
+                elif index == selected:
+                    line.set(color=self.accent_color, linewidth=2.5, alpha=1.0, zorder=3)
+                else:
+                    line.set(color=DIMMED_COLOR, linewidth=1, alpha=0.6, zorder=2)
+        # Перерисовка откладывается до простоя Tk: несколько готовых файлов подряд рисуются один раз
+        self.canvas.draw_idle()
+
+        if selected is not None and 'error' in self.summaries.get(selected, {}):
+            self.progress_label.config(text=f"{self.filepaths[selected].name}: {self.summaries[selected]['error']}")
+
+    def _open_selected(self):
+        """Открывает полную статистику выделенного готового файла (результаты берутся из кэша)."""
+        from .stats_window import StatsWindow
+
+        selected = self._selected_index()
+        if selected is None or 'total_sequences' not in self.summaries.get(selected, {}):
+            return
+        StatsWindow(self, str(self.filepaths[selected]), self.app_icon_photo)
+
+    def _sort_by(self, column: str):
+        """Сортирует строки таблицы по столбцу; повторный щелчок меняет направление."""
+        self._sort_descending = not self._sort_descending if self._sort_column == column else False
+        self._sort_column = column
+
+        def key(row: str):
+            index = int(row)
+            if column == "file":
+                return 0, self.filepaths[index].name
+            if column == "status":
+                return 0, self.table.set(row, "status")
+            value = self.summaries.get(index, {}).get(column)
+            # Файлы без значения всегда внизу
+            return (1, 0) if value is None else (0, -value if self._sort_descending else value)
+
+        rows = sorted(self.table.get_children(), key=key,
+                      reverse=self._sort_descending and column in ("file", "status"))
+        for position, row in enumerate(rows):
+            self.table.move(row, "", position)
+
+    def _finish_progress(self, status: str):
+        """Убирает кнопку отмены и показывает итог анализа набора."""
+        self.cancel_button.pack_forget()
+        text = f"{status}: {self._finished - self._failed} из {len(self.filepaths)} файлов"
+        if self._failed:
+            text += f", ошибок: {self._failed}"
+        self.progress_label.config(text=text)
+
+    def _cancel_analysis(self):
+        """Запрашивает остановку анализа; результаты готовых файлов остаются в таблице."""
+        self._cancel_event.set()
+        self.cancel_button.config(state=tk.DISABLED)
+        self.progress_label.config(text="Отмена...")
+
+    def _center_window(self):
+        """Центрирует окно сводки."""
+        self.update_idletasks()
+        width = self.winfo_width()
+        height = self.winfo_height()
+        x = (self.winfo_screenwidth() // 2) - (width // 2)
+        y = (self.winfo_screenheight() // 2) - (height // 2)
+        self.geometry(f'{width}x{height}+{x}+{y}')
+
+    def _on_closing(self):
+        """Останавливает анализ, закрывает окно сводки и возвращает окно выбора файла."""
+        self._cancel_event.set()
+        if self._poll_job is not None:
+            self.after_cancel(self._poll_job)
+            self._poll_job = None
+        self.master.deiconify()
+        self.destroy()
@@ -1,18 +1,141 @@
+import queue
+import threading
+import time
 import tkinter as tk
-from tkinter import font, messagebox
+from tkinter import font, messagebox, ttk
 from pathlib import Path
-from typing import Any
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
-from ..models.fastq_plots import run_analysis, create_figure_length, create_figure_quality, create_figure_content
+from typing import Any, TYPE_CHECKING
+from ..models.fastq_plots import run_analysis, run_preview_analysis, AnalysisCancelled
+from ..models.fastq_reader import is_stream
+from ..models.follow_analysis import run_follow_analysis
+from ..models.metric_module import MetricModule, registered_metrics
+from ..models.basic_metrics import LengthDistribution, PerBaseQuality, PerBaseContent
+from ..models.paired_analysis import MATE_LABELS, run_paired_analysis, run_paired_preview
+from ..models.parallel_analysis import default_workers
+from ..models.profiler import Profiler, NULL_PROFILER
+from ..models.results_cache import ResultsCache
+from ..models.checkpoint import CheckpointStore
+
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+
+
+# Период опроса очереди сообщений от потока анализа (мс)
+POLL_INTERVAL_MS = 100
+
+PLOT_LENGTH = LengthDistribution.title
+PLOT_QUALITY = PerBaseQuality.title
+PLOT_CONTENT = PerBaseContent.title
+DIAGNOSTICS = "Диагностика"
+
+# Заголовок кнопки -> модуль метрики; кнопки боковой панели создаются в этом порядке
+PLOT_BUILDERS: dict[str, type[MetricModule]] = {metric.title: metric for metric in registered_metrics()}
+
+# Названия этапов обработки в панели диагностики
+STAGE_LABELS = {
+    "cache": "Кэш результатов",
+    "checkpoint": "Контрольные точки",
+    "index": "Индекс записей",
+    "decompress": "Чтение и распаковка gzip",
+    "parse": "Разбор записей",
+    "quality": "Преобразование качества",
+    "accumulate": "Накопление статистики",
+    "mate_ids": "Сверка идентификаторов пары",
+    "shards": "Параллельный анализ (всего)",
+    "mates": "Анализ пары R1/R2 (всего)",
+    "aggregate": "Расчёт метрик по позициям",
+    "figure.length": "Построение: длины",
+    "figure.quality": "Построение: качество",
+    "figure.content": "Построение: состав",
+    "figure.per_sequence_quality": "Построение: качество ридов",
+    "figure.gc_content": "Построение: GC-состав",
+    "figure.n_content": "Построение: доля N",
+    "figure.q30": "Построение: Q30",
+    "figure.duplication": "Построение: дупликация",
+    "figure.adapter_content": "Построение: адаптеры",
+    "render": "Отрисовка холста",
+    "show_plot": "Переключение графика",
+}
+
+
+def build_figure(title: str, analysis_data: dict, accent_color: str,
+                 profiler: Profiler = NULL_PROFILER) -> "Figure":
+    """Строит фигуру для графика с заданным заголовком кнопки."""
+    metric = PLOT_BUILDERS[title]
+    return metric.create_figure(analysis_data.get(metric.result_key), accent_color,
+                                partial=analysis_data.get('partial', False), profiler=profiler)
+
+
+def build_figures(analysis_data: dict, accent_color: str,
+                  profiler: Profiler = NULL_PROFILER) -> dict[str, "Figure"]:
+    """Строит фигуры для всех графиков окна (модули с таблицами пропускаются)."""
+    return {title: build_figure(title, analysis_data, accent_color, profiler)
+            for title, metric in PLOT_BUILDERS.items() if metric.view == "figure"}
+
+
+def analysis_files(analysis_data: dict) -> list[dict]:
+    """Возвращает результаты по файлам: один для одиночного файла, два для пары."""
+    return analysis_data['mates'] if 'mates' in analysis_data else [analysis_data]
+
+
+def build_window_figures(analysis_data: dict, accent_color: str,
+                         profiler: Profiler = NULL_PROFILER) -> dict[str, list["Figure"]]:
+    """Строит фигуры окна: по одной на каждый файл (для пары — R1 и R2)."""
+    per_file = [build_figures(data, accent_color, profiler) for data in analysis_files(analysis_data)]
+    return {title: [figures[title] for figures in per_file] for title in per_file[0]}
+
+
+def format_pairing(pairing: dict) -> str:
+    """Форматирует результат проверки синхронности пары R1/R2."""
+    reads1, reads2 = (f"{reads:,}".replace(",", " ") for reads in pairing['reads'])
+    if pairing['in_sync']:
+        return f"Пара синхронна: {reads1} ридов в каждом файле"
+    text = f"Пара рассинхронизирована: R1 {reads1}, R2 {reads2} ридов"
+    mismatch = pairing['first_mismatch']
+    if mismatch is not None:
+        read = f"{mismatch['read'] + 1:,}".replace(",", " ")
+        text += (f". Первое расхождение — рид №{read}: "
+                 f"R1 '{mismatch['r1'] or 'нет рида'}', R2 '{mismatch['r2'] or 'нет рида'}'")
+    return text
+
+
+def format_stage_volume(stats: dict) -> str:
+    """Форматирует счётчики этапа (байты, риды, нуклеотиды) и пропускную способность."""
+    parts = []
+    seconds = stats["wall_seconds"]
+    if stats.get("bytes"):
+        megabytes = stats["bytes"] / 1024 / 1024
+        parts.append(f"{megabytes:,.1f} МБ" + (f" ({megabytes / seconds:,.0f} МБ/с)" if seconds > 0 else ""))
+    if stats.get("reads"):
+        parts.append(f"{stats['reads']:,} ридов" + (f" ({stats['reads'] / seconds:,.0f}/с)" if seconds > 0 else ""))
+    if stats.get("bases"):
+        parts.append(f"{stats['bases']:,} п.н.")
+    return " · ".join(parts).replace(",", " ")
 
 
 class StatsWindow(tk.Toplevel):
     """
     Окно для отображения статистического анализа FASTQ-файла с графиками Matplotlib.
+
+    Анализ выполняется в фоновом потоке, чтобы не блокировать главный цикл Tk.
+    Поток передаёт прогресс через очередь, которую окно опрашивает методом after().
+
+    Сначала показываются результаты быстрого анализа выборки ридов, затем они
+    периодически уточняются по мере полного прохода по файлу. Полный анализ сохраняет
+    контрольные точки (см. CheckpointStore): если окно закрыть посреди анализа, при
+    следующем открытии того же файла анализ продолжится с последней из них.
+
+    Для пары файлов R1/R2 оба файла анализируются одновременно (см. run_paired_analysis),
+    графики и таблицы показываются рядом, а на боковой панели — результат сверки
+    идентификаторов ридов.
+
+    В режиме слежения (follow) окно следит за файлом, который ещё дописывается
+    (см. run_follow_analysis): графики обновляются по мере появления новых записей,
+    пока пользователь не остановит слежение.
     """
 
-    def __init__(self, master, filepath: str, app_icon_photo: tk.PhotoImage):
+    def __init__(self, master, filepath: str | tuple[str, str], app_icon_photo: tk.PhotoImage,
+                 follow: bool = False):
         super().__init__(master)
 
         self.iconphoto(True, app_icon_photo)
@@ -22,8 +145,22 @@ class StatsWindow(tk.Toplevel):
         self.header_size = 18
         self.text_size = 14
         self.main_font = "Montserrat"
-        self.filepath = filepath
+        self.filepaths = (filepath,) if isinstance(filepath, str) else tuple(filepath)
+        self.filepath = self.filepaths[0]
+        self.paired = len(self.filepaths) == 2
+        self.follow = follow and not self.paired
         self.analysis_data: Any = None
+        self._messages: queue.Queue = queue.Queue()
+        self._cancel_event = threading.Event()
+        self._poll_job = None
+        self._prerender_job = None
+        self._started_at = 0.0
+        self._figures: dict[str, list["Figure"]] = {}
+        self._plot_views: dict[str, tuple] = {}
+        self._active_plot = None
+        self.profiler = Profiler()
+        self._diagnostics_panel = None
+        self._diagnostics_visible = False
 
         self.title("FastQClite - Статистика")
         self.geometry("1200x800")
@@ -41,31 +178,292 @@ class StatsWindow(tk.Toplevel):
         # Перехватываем закрытие окна, чтобы восстановить главное окно
         self.protocol("WM_DELETE_WINDOW", self._on_closing)
 
-        if not self._load_data():
+        self._create_progress_frame()
+        self._center_window()
+        self._load_data()
+
+    def _load_data(self):
+        """Запускает анализ в фоновом потоке и начинает опрос очереди сообщений."""
+        self._started_at = time.monotonic()
+        worker = threading.Thread(target=self._analysis_worker, daemon=True)
+        worker.start()
+        self._poll_job = self.after(POLL_INTERVAL_MS, self._poll_messages)
+
+    def _analysis_worker(self):
+        """Выполняет анализ в фоновом потоке. Взаимодействует с окном только через очередь."""
+        def report_progress(done_bytes: int, total_bytes: int, reads: int):
+            self._messages.put(("progress", done_bytes, total_bytes, reads))
+
+        def report_snapshot(result: dict):
+            self._messages.put(("results", result,
+                                build_window_figures(result, self.accent_color, self.profiler)))
+
+        if self.paired:
+            self._paired_worker(report_progress, report_snapshot)
+            return
+        if self.follow:
+            self._follow_worker(report_progress, report_snapshot)
             return
 
-        self.grid_rowconfigure(0, weight=1)
-        self.grid_columnconfigure(0, weight=0)
-        self.grid_columnconfigure(1, weight=1)
+        try:
+            # Канал читается один раз: ни отпечаток для кэша, ни выборку из него не получить
+            cache = None if is_stream(self.filepath) else ResultsCache()
+            # Если окно закроют посреди долгого анализа, следующий запуск продолжит его
+            # (BGZF и многочленные gzip run_analysis распаковывает параллельно, без контрольных точек)
+            checkpoints = None if cache is None else CheckpointStore()
+            if cache is not None and cache.get(self.filepath) is None:
+                report_snapshot(run_preview_analysis(self.filepath, profiler=self.profiler))
+
+            result = run_analysis(self.filepath, workers=default_workers(),
+                                  progress_callback=report_progress,
+                                  cancel_event=self._cancel_event,
+                                  cache=cache,
+                                  snapshot_callback=report_snapshot,
+                                  profiler=self.profiler,
+                                  checkpoints=checkpoints)
+            # Фигуры строятся здесь же, в фоне: окну останется только их показать
+            figures = build_window_figures(result, self.accent_color, self.profiler)
+            result['diagnostics'] = self.profiler.report()
+            self._messages.put(("done", result, figures))
+        except AnalysisCancelled:
+            self._messages.put(("cancelled",))
+        except Exception as e:
+            self._messages.put(("error", e))
 
-        self._create_left_frame()
-        self._create_right_frame()
+    def _paired_worker(self, report_progress, report_snapshot):
+        """
+        Анализирует пару файлов R1/R2 в фоновом потоке.
 
-        self.show_length_distribution()
+        Кэш результатов не используется: сверка идентификаторов ридов всё равно
+        требует полного чтения обоих файлов.
+        """
+        try:
+            report_snapshot(run_paired_preview(*self.filepaths, profiler=self.profiler))
+            result = run_paired_analysis(*self.filepaths,
+                                         progress_callback=report_progress,
+                                         cancel_event=self._cancel_event,
+                                         profiler=self.profiler)
+            figures = build_window_figures(result, self.accent_color, self.profiler)
+            result['diagnostics'] = self.profiler.report()
+            self._messages.put(("done", result, figures))
+        except AnalysisCancelled:
+            self._messages.put(("cancelled",))
+        except Exception as e:
+            self._messages.put(("error", e))
 
-        self._center_window()
+    def _follow_worker(self, report_progress, report_snapshot):
+        """
+        Следит за дописываемым файлом в фоновом потоке.
 
-    def _load_data(self) -> bool:
-        """Запускает анализ и обрабатывает возможные ошибки."""
+        Кнопка остановки завершает слежение: итоговыми считаются уже учтённые записи.
+        """
         try:
-            self.analysis_data = run_analysis(self.filepath)
-            return True
+            result = run_follow_analysis(self.filepath,
+                                         progress_callback=report_progress,
+                                         snapshot_callback=report_snapshot,
+                                         stop_event=self._cancel_event,
+                                         profiler=self.profiler)
+            figures = build_window_figures(result, self.accent_color, self.profiler)
+            result['diagnostics'] = self.profiler.report()
+            self._messages.put(("done", result, figures))
+        except AnalysisCancelled:
+            self._messages.put(("cancelled",))
         except Exception as e:
-            messagebox.showerror("Ошибка анализа",
-                                 f"Не удалось проанализировать файл '{Path(self.filepath).name}': {e}")
-            self.master.deiconify()
-            self.destroy()
-            return False
+            self._messages.put(("error", e))
+
+    def _poll_messages(self):
+        """Обрабатывает накопившиеся сообщения потока анализа (вызывается из цикла Tk)."""
+        self._poll_job = None
+        try:
+            while True:
+                message = self._messages.get_nowait()
+                kind = message[0]
+                if kind == "progress":
+                    self._update_progress(*message[1:])
+                elif kind == "results":
+                    self._show_results(message[1], message[2])
+                elif kind == "done":
+                    self._show_results(message[1], message[2])
+                    self._finish_progress(self._done_status(message[1]))
+                    if self.paired:
+                        self._show_pairing(message[1]['pairing'])
+                    return
+                elif kind == "cancelled":
+                    if self.analysis_data is None:
+                        self._return_to_selection()
+                    else:
+                        self._finish_progress("Анализ остановлен, показаны предварительные данные")
+                    return
+                elif kind == "error":
+                    messagebox.showerror("Ошибка анализа",
+                                         f"Не удалось проанализировать {self._files_caption()}: "
+                                         f"{message[1]}")
+                    self._return_to_selection()
+                    return
+        except queue.Empty:
+            pass
+        self._poll_job = self.after(POLL_INTERVAL_MS, self._poll_messages)
+
+    def _files_caption(self) -> str:
+        """Возвращает подпись анализируемого файла или пары файлов для сообщений."""
+        names = [Path(path).name for path in self.filepaths]
+        if self.paired:
+            return f"пару файлов '{names[0]}' и '{names[1]}'"
+        return f"файл '{names[0]}'"
+
+    def _done_status(self, result: dict) -> str:
+        """Возвращает строку состояния по завершении анализа."""
+        if self.paired:
+            reads1, reads2 = (f"{data['total_sequences']:,}".replace(",", " ") for data in result['mates'])
+            return f"Анализ завершён: R1 {reads1}, R2 {reads2} ридов"
+        if self.follow:
+            status = f"Слежение остановлено: {result['total_sequences']:,} ридов".replace(",", " ")
+            if result['follow']['incomplete_tail']:
+                status += ", последняя запись оборвана и не учтена"
+            return status
+        return f"Анализ завершён: {result['total_sequences']:,} ридов".replace(",", " ")
+
+    def _show_pairing(self, pairing: dict):
+        """Показывает результат сверки пары R1/R2 и предупреждает о рассинхронизации."""
+        text = format_pairing(pairing)
+        self.pairing_label.config(text=text, fg="#2E7D32" if pairing['in_sync'] else "#C62828")
+        if not pairing['in_sync']:
+            messagebox.showwarning("Пара рассинхронизирована",
+                                   f"{text}.\n\nРиды R1 и R2 идут в разном порядке или в разном "
+                                   f"количестве: файлы повреждены, обрезаны или не являются парой.",
+                                   parent=self)
+
+    def _create_progress_frame(self):
+        """Создает фрейм с индикатором прогресса, показываемый до первых результатов."""
+        self.progress_frame = tk.Frame(self, bg=self.bg_color)
+        self.progress_frame.pack(expand=True)
+
+        tk.Label(self.progress_frame,
+                 text=f"{'Слежение' if self.follow else 'Анализ'}: {self._files_caption()}",
+                 font=self.header_font,
+                 bg=self.bg_color,
+                 fg="#333333").pack(pady=(0, 20))
+
+        self._create_progress_widgets(self.progress_frame, self.bg_color, bar_length=500)
+
+    def _create_progress_widgets(self, parent: tk.Widget, bg: str, bar_length: int):
+        """Создает индикатор прогресса, строку состояния и кнопку отмены в parent."""
+        self.progress_bar = ttk.Progressbar(parent,
+                                            orient=tk.HORIZONTAL,
+                                            length=bar_length,
+                                            mode="determinate",
+                                            maximum=1000)
+        self.progress_bar.pack(pady=10)
+
+        self.progress_label = tk.Label(parent,
+                                       text="Подготовка...",
+                                       font=("Montserrat", 10),
+                                       bg=bg,
+                                       fg="#666666",
+                                       wraplength=max(bar_length, 260),
+                                       justify=tk.LEFT)
+        self.progress_label.pack(pady=(0, 10))
+
+        self.cancel_button = tk.Button(parent,
+                                       text="Остановить слежение" if self.follow else "Отмена",
+                                       font=self.text_font,
+                                       command=self._cancel_analysis,
+                                       bg=self.accent_color,
+                                       fg="white",
+                                       activebackground=self.accent_color,
+                                       activeforeground="white",
+                                       bd=0,
+                                       padx=20,
+                                       pady=10)
+        self.cancel_button.pack()
+
+    def _update_progress(self, done_bytes: int, total_bytes: int, reads: int):
+        """Обновляет индикатор прогресса, скорость и оценку оставшегося времени."""
+        fraction = min(done_bytes / total_bytes, 1.0) if total_bytes else 0.0
+        self.progress_bar["value"] = fraction * 1000
+
+        elapsed = time.monotonic() - self._started_at
+        speed = reads / elapsed if elapsed > 0 else 0.0
+        text = f"{fraction:.0%} · {reads:,} ридов · {speed:,.0f} ридов/с".replace(",", " ")
+        # При слежении размер файла растёт, и оценка оставшегося времени не имеет смысла
+        if 0 < fraction < 1 and not self.follow:
+            remaining = int(elapsed * (1 - fraction) / fraction)
+            text += f" · осталось ~{remaining // 60}:{remaining % 60:02d}"
+        self.progress_label.config(text=text)
+
+    def _cancel_analysis(self):
+        """
+        Запрашивает остановку потока анализа.
+
+        До появления первых результатов окно закроется, когда поток завершится;
+        после — останутся предварительные результаты. В режиме слежения учтённые
+        записи становятся итоговыми результатами.
+        """
+        self._cancel_event.set()
+        self.cancel_button.config(state=tk.DISABLED)
+        self.progress_label.config(text="Остановка..." if self.follow else "Отмена...")
+
+    def _show_results(self, result: Any, figures: dict[str, list["Figure"]]):
+        """
+        Показывает предварительные или итоговые результаты.
+
+        При первом вызове строит интерфейс с графиками; при последующих заменяет
+        фигуры, сохраняя выбранный график.
+        """
+        first_results = self.analysis_data is None
+        self.analysis_data = result
+
+        if first_results:
+            self._figures = figures
+            self.progress_frame.destroy()
+
+            self.grid_rowconfigure(0, weight=1)
+            self.grid_columnconfigure(0, weight=0)
+            self.grid_columnconfigure(1, weight=1)
+
+            self._create_left_frame()
+            self._create_right_frame()
+
+            self.show_length_distribution()
+        else:
+            active_plot = self._active_plot
+            self._discard_plot_views()
+            self._figures = figures
+            if self._diagnostics_visible:
+                self._refresh_diagnostics()
+            else:
+                self._update_plot_frame(active_plot or PLOT_LENGTH)
+
+        if self._prerender_job is not None:
+            self.after_cancel(self._prerender_job)
+        self._prerender_job = self.after_idle(self._prerender_next)
+
+    def _discard_plot_views(self):
+        """Удаляет холсты, таблицы и панели инструментов всех графиков."""
+        for widget, toolbar in self._plot_views.values():
+            widget.destroy()
+            if toolbar is not None:
+                toolbar.destroy()
+        self._plot_views.clear()
+        self._active_plot = None
+
+    def _finish_progress(self, status: str):
+        """Убирает индикатор прогресса и кнопку отмены, оставляя строку состояния."""
+        self.progress_bar.pack_forget()
+        self.cancel_button.pack_forget()
+        self.progress_label.config(text=status)
+
+    def _return_to_selection(self):
+        """Закрывает окно статистики и возвращает окно выбора файла."""
+        for job in (self._poll_job, self._prerender_job):
+            if job is not None:
+                self.after_cancel(job)
+        self._poll_job = None
+        self._prerender_job = None
+        self._plot_views.clear()
+        self._figures.clear()
+        self.master.deiconify()
+        self.destroy()
 
     def _center_window(self):
         """Центрирует окно статистики."""
@@ -77,9 +475,9 @@ class StatsWindow(tk.Toplevel):
         self.geometry(f'{width}x{height}+{x}+{y}')
 
     def _on_closing(self):
-        """Обрабатывает закрытие окна статистики."""
-        self.master.deiconify()
-        self.destroy()
+        """Обрабатывает закрытие окна статистики (в том числе во время анализа)."""
+        self._cancel_event.set()
+        self._return_to_selection()
 
     def _create_left_frame(self):
         """Создает левый фрейм с навигационными кнопками."""
@@ -103,33 +501,63 @@ class StatsWindow(tk.Toplevel):
         # Разделитель
         tk.Frame(self.left_frame, height=2, bg=self.accent_color).pack(fill='x', padx=10, pady=5)
 
-        # Кнопки для графиков
-        self.buttons_config = [
-            ("Распределение длин последовательностей", self.show_length_distribution),
-            ("Среднее качество по каждой позиции в риде", self.show_quality_distribution),
-            ("Процентное содержание каждого нуклеотида по позициям", self.show_base_content)
-        ]
-
+        # Кнопки для графиков: по одной на каждый зарегистрированный модуль метрик
         self.button_widgets = {}
-        for text, command in self.buttons_config:
+        for text in PLOT_BUILDERS:
             btn = tk.Button(self.left_frame,
                             text=text,
-                            command=command,
-                            font=self.text_font,
+                            command=lambda title=text: self._update_plot_frame(title),
+                            font=("Montserrat", 11),
                             bg="white",
                             fg="#333333",
                             activebackground=self.accent_color,
                             activeforeground="white",
                             bd=0,
                             anchor="w",
+                            justify=tk.LEFT,
+                            wraplength=260,
                             padx=15,
-                            pady=10)
-            btn.pack(fill='x', padx=10, pady=5)
+                            pady=6)
+            btn.pack(fill='x', padx=10, pady=2)
             self.button_widgets[text] = btn
 
-        filename = Path(self.filepath).name
+        diagnostics_button = tk.Button(self.left_frame,
+                                       text=DIAGNOSTICS,
+                                       command=self.show_diagnostics,
+                                       font=("Montserrat", 10),
+                                       bg="white",
+                                       fg="#333333",
+                                       activebackground=self.accent_color,
+                                       activeforeground="white",
+                                       bd=0,
+                                       anchor="w",
+                                       padx=15,
+                                       pady=5)
+        diagnostics_button.pack(fill='x', padx=10, pady=(15, 5))
+        self.button_widgets[DIAGNOSTICS] = diagnostics_button
+
+        # Прогресс уточнения результатов (анализ продолжается в фоне)
+        progress_panel = tk.Frame(self.left_frame, bg="white")
+        progress_panel.pack(side=tk.BOTTOM, fill='x', padx=15, pady=(0, 10))
+        self._create_progress_widgets(progress_panel, "white", bar_length=260)
+
+        # Результат сверки пары появляется по завершении анализа
+        self.pairing_label = tk.Label(self.left_frame,
+                                      text="Сверка пары R1/R2..." if self.paired else "",
+                                      font=("Montserrat", 10),
+                                      bg="white",
+                                      fg="#666666",
+                                      wraplength=280,
+                                      justify=tk.LEFT)
+        if self.paired:
+            self.pairing_label.pack(side=tk.BOTTOM, fill='x', padx=15)
+
+        if self.paired:
+            file_text = "\n".join(f"{label}: {Path(path).name}" for label, path in zip(MATE_LABELS, self.filepaths))
+        else:
+            file_text = f"Файл: {Path(self.filepath).name}"
         file_label = tk.Label(self.left_frame,
-                              text=f"Файл: {filename}",
+                              text=file_text,
                               font=("Montserrat", 10),
                               bg="white",
                               fg="#666666",
@@ -149,29 +577,235 @@ class StatsWindow(tk.Toplevel):
         self.plot_container.grid_rowconfigure(0, weight=1)
         self.plot_container.grid_columnconfigure(0, weight=1)
 
-        self.canvas_widget = None
-        self.toolbar = None
 
-    def _update_plot_frame(self, new_figure: plt.Figure, active_button_text: str):
-        """Обновляет правый фрейм новым графиком Matplotlib."""
+    def _create_plot_view(self, title: str) -> tuple:
+        """
+        Создает холст и панель инструментов для графика и отрисовывает его.
+
+        Фигура берётся из кэша (построенного в фоновом потоке) или строится на месте.
+        Бэкенд TkAgg загружается только при создании первого холста. Для модулей
+        с таблицей (view = "table") вместо холста создается таблица. Для пары R1/R2
+        холсты обоих файлов размещаются рядом, каждый со своей панелью инструментов.
 
-        if self.canvas_widget:
-            self.canvas_widget.destroy()
-        if self.toolbar:
-            self.toolbar.destroy()
+        Returns:
+            tuple: Виджет для размещения и панель инструментов (None для таблиц и пары файлов).
+        """
+        if PLOT_BUILDERS[title].view == "table":
+            view = (self._create_table_view(title), None)
+            self._plot_views[title] = view
+            return view
 
-        canvas = FigureCanvasTkAgg(new_figure, master=self.plot_container)
-        self.canvas_widget = canvas.get_tk_widget()
-        self.canvas_widget.pack(fill=tk.BOTH, expand=True)
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 
-        # Добавление панели инструментов Matplotlib (навигация)
-        self.toolbar = NavigationToolbar2Tk(canvas, self.plot_container, pack_toolbar=False)
-        self.toolbar.update()
-        self.toolbar.pack(side=tk.BOTTOM, fill=tk.X)
+        figures = self._figures.get(title)
+        if figures is None:
+            figures = [build_figure(title, data, self.accent_color) for data in analysis_files(self.analysis_data)]
+            self._figures[title] = figures
 
-        canvas.draw()
+        with self.profiler.stage("render"):
+            if not self.paired:
+                canvas = FigureCanvasTkAgg(figures[0], master=self.plot_container)
 
-        self._update_button_state(active_button_text)
+                # Добавление панели инструментов Matplotlib (навигация)
+                toolbar = NavigationToolbar2Tk(canvas, self.plot_container, pack_toolbar=False)
+                toolbar.update()
+
+                canvas.draw()
+                view = (canvas.get_tk_widget(), toolbar)
+            else:
+                panel = tk.Frame(self.plot_container, bg=self.bg_color)
+                panel.grid_rowconfigure(1, weight=1)
+                for column, figure in enumerate(figures):
+                    panel.grid_columnconfigure(column, weight=1, uniform="mates")
+                    self._create_mate_label(panel, column).grid(row=0, column=column, sticky="w")
+
+                    canvas = FigureCanvasTkAgg(figure, master=panel)
+                    canvas.get_tk_widget().grid(row=1, column=column, sticky="nswe", padx=2)
+                    toolbar = NavigationToolbar2Tk(canvas, panel, pack_toolbar=False)
+                    toolbar.update()
+                    toolbar.grid(row=2, column=column, sticky="we")
+
+                    canvas.draw()
+                view = (panel, None)
+
+        self._plot_views[title] = view
+        return view
+
+    def _create_mate_label(self, parent: tk.Widget, mate: int) -> tk.Label:
+        """Создает подпись файла пары ('R1: имя файла') над его графиком или таблицей."""
+        return tk.Label(parent,
+                        text=f"{MATE_LABELS[mate]}: {Path(self.filepaths[mate]).name}",
+                        font=("Montserrat", 11, "bold"),
+                        bg=self.bg_color,
+                        fg=self.accent_color)
+
+    def _create_table_view(self, title: str) -> tk.Frame:
+        """Создает панель с таблицей результатов модуля метрики (для пары — две таблицы рядом)."""
+        panel = tk.Frame(self.plot_container, bg=self.bg_color)
+        header = title
+        if self.analysis_data.get('partial'):
+            header += " (предварительные данные)"
+        tk.Label(panel,
+                 text=header,
+                 font=self.header_font,
+                 bg=self.bg_color,
+                 fg="#333333").pack(anchor="w", pady=(0, 10))
+
+        tables = tk.Frame(panel, bg=self.bg_color)
+        tables.pack(fill=tk.BOTH, expand=True)
+        tables.grid_rowconfigure(0, weight=1)
+        for column, data in enumerate(analysis_files(self.analysis_data)):
+            tables.grid_columnconfigure(column, weight=1, uniform="mates")
+            mate_frame = tk.Frame(tables, bg=self.bg_color)
+            mate_frame.grid(row=0, column=column, sticky="nswe", padx=2)
+            if self.paired:
+                self._create_mate_label(mate_frame, column).pack(anchor="w")
+            self._create_table(mate_frame, PLOT_BUILDERS[title], data)
+        return panel
+
+    def _create_table(self, parent: tk.Widget, metric: type[MetricModule], analysis_data: dict):
+        """Создает в parent таблицу результатов модуля метрики одного файла с пояснением."""
+        data = analysis_data.get(metric.result_key)
+        headings, rows = metric.create_table(data)
+        # Для пары таблицы стоят рядом, поэтому столбцы уже
+        first_width, width = (250, 100) if self.paired else (420, 140)
+
+        table_frame = tk.Frame(parent, bg=self.bg_color)
+        table_frame.pack(fill=tk.BOTH, expand=True)
+        columns = [f"c{index}" for index in range(len(headings))]
+        table = ttk.Treeview(table_frame, columns=columns, show="headings")
+        for index, (column, heading) in enumerate(zip(columns, headings)):
+            table.heading(column, text=heading)
+            table.column(column, width=first_width if index == 0 else width, anchor="w" if index == 0 else "e")
+        scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=table.yview)
+        table.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        table.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        for row in rows:
+            table.insert("", tk.END, values=row)
+
+        if not rows:
+            note = "Сверхпредставленных последовательностей не найдено" if data is not None \
+                else "Данные отсутствуют"
+        elif data.get('max_error_percent'):
+            note = f"Доли занижены не более чем на {data['max_error_percent']:.3f}% (оценка в ограниченной памяти)"
+        else:
+            note = ""
+        if note:
+            tk.Label(parent,
+                     text=note,
+                     font=("Montserrat", 10),
+                     bg=self.bg_color,
+                     fg="#666666",
+                     wraplength=400 if self.paired else 800,
+                     justify=tk.LEFT).pack(anchor="w", pady=(10, 0))
+
+    def _update_plot_frame(self, active_button_text: str):
+        """
+        Показывает в правом фрейме график, соответствующий кнопке.
+
+        Холсты создаются один раз и при переключении только скрываются и показываются,
+        поэтому переключение мгновенное, а потребление памяти не растёт.
+        """
+        with self.profiler.stage("show_plot"):
+            if self._diagnostics_visible:
+                self._diagnostics_panel.pack_forget()
+                self._diagnostics_visible = False
+
+            if self._active_plot != active_button_text:
+                self._hide_active_plot()
+                widget, toolbar = self._plot_views.get(active_button_text) \
+                    or self._create_plot_view(active_button_text)
+                widget.pack(fill=tk.BOTH, expand=True)
+                if toolbar is not None:
+                    toolbar.pack(side=tk.BOTTOM, fill=tk.X)
+                self._active_plot = active_button_text
+
+            self._update_button_state(active_button_text)
+
+    def _hide_active_plot(self):
+        """Скрывает холст и панель инструментов показанного графика."""
+        if self._active_plot is not None:
+            widget, toolbar = self._plot_views[self._active_plot]
+            widget.pack_forget()
+            if toolbar is not None:
+                toolbar.pack_forget()
+            self._active_plot = None
+
+    def _create_diagnostics_panel(self):
+        """Создает панель с таблицей времени этапов обработки."""
+        self._diagnostics_panel = tk.Frame(self.plot_container, bg=self.bg_color)
+
+        tk.Label(self._diagnostics_panel,
+                 text="Время этапов обработки",
+                 font=self.header_font,
+                 bg=self.bg_color,
+                 fg="#333333").pack(anchor="w", pady=(0, 10))
+
+        columns = ("calls", "wall", "cpu", "volume")
+        self._diagnostics_table = ttk.Treeview(self._diagnostics_panel, columns=columns, height=14)
+        self._diagnostics_table.heading("#0", text="Этап")
+        self._diagnostics_table.heading("calls", text="Вызовы")
+        self._diagnostics_table.heading("wall", text="Время, с")
+        self._diagnostics_table.heading("cpu", text="CPU, с")
+        self._diagnostics_table.heading("volume", text="Объём")
+        self._diagnostics_table.column("#0", width=220)
+        for column in ("calls", "wall", "cpu"):
+            self._diagnostics_table.column(column, width=80, anchor="e")
+        self._diagnostics_table.column("volume", width=420)
+        self._diagnostics_table.pack(fill=tk.BOTH, expand=True)
+
+        tk.Label(self._diagnostics_panel,
+                 text="Этапы могут быть вложенными (переключение графика включает отрисовку холста). "
+                      "При параллельном анализе время процессов-обработчиков суммируется.",
+                 font=("Montserrat", 10),
+                 bg=self.bg_color,
+                 fg="#666666",
+                 wraplength=800,
+                 justify=tk.LEFT).pack(anchor="w", pady=(10, 5))
+
+        tk.Button(self._diagnostics_panel,
+                  text="Обновить",
+                  font=self.text_font,
+                  command=self._refresh_diagnostics,
+                  bg=self.accent_color,
+                  fg="white",
+                  activebackground=self.accent_color,
+                  activeforeground="white",
+                  bd=0,
+                  padx=20,
+                  pady=5).pack(anchor="w")
+
+    def _refresh_diagnostics(self):
+        """Заполняет таблицу диагностики текущими замерами."""
+        table = self._diagnostics_table
+        table.delete(*table.get_children())
+        for stage, stats in self.profiler.report().items():
+            table.insert("", tk.END, text=STAGE_LABELS.get(stage, stage),
+                         values=(stats["calls"],
+                                 f"{stats['wall_seconds']:.3f}",
+                                 f"{stats['cpu_seconds']:.3f}",
+                                 format_stage_volume(stats)))
+
+    def show_diagnostics(self):
+        """Показывает панель диагностики вместо графика."""
+        self._hide_active_plot()
+        if self._diagnostics_panel is None:
+            self._create_diagnostics_panel()
+        self._refresh_diagnostics()
+        if not self._diagnostics_visible:
+            self._diagnostics_panel.pack(fill=tk.BOTH, expand=True)
+            self._diagnostics_visible = True
+        self._update_button_state(DIAGNOSTICS)
+
+    def _prerender_next(self):
+        """Заранее создает холсты для ещё не показанных графиков, по одному за вызов."""
+        self._prerender_job = None
+        for title in PLOT_BUILDERS:
+            if title not in self._plot_views:
+                self._create_plot_view(title)
+                self._prerender_job = self.after_idle(self._prerender_next)
+                return
 
     def _update_button_state(self, active_button_text: str):
         """Подсвечивает активную кнопку."""
@@ -183,18 +817,12 @@ class StatsWindow(tk.Toplevel):
 
     def show_length_distribution(self):
         """Отображает Распределение длин последовательностей."""
-        data = self.analysis_data.get('sequence_lengths', [])
-        fig = create_figure_length(data, self.accent_color)
-        self._update_plot_frame(fig, "Распределение длин последовательностей")
+        self._update_plot_frame(PLOT_LENGTH)
 
     def show_quality_distribution(self):
         """Отображает Среднее качество по каждой позиции в риде."""
-        data = self.analysis_data.get('mean_qualities_data')
-        fig = create_figure_quality(data, self.accent_color)
-        self._update_plot_frame(fig, "Среднее качество по каждой позиции в риде")
+        self._update_plot_frame(PLOT_QUALITY)
 
     def show_base_content(self):
         """Отображает Процентное содержание каждого нуклеотида по позициям."""
-        data = self.analysis_data.get('base_content_data')
-        fig = create_figure_content(data, self.accent_color)
-        self._update_plot_frame(fig, "Процентное содержание каждого нуклеотида по позициям")
+        self._update_plot_frame(PLOT_CONTENT)